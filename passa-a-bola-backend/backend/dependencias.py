@@ -0,0 +1,274 @@
+"""
+Dependências de Autenticação
+Usuário autenticado a partir do token JWT (header Authorization: Bearer)
+e verificação de roles, com cache dos tokens já verificados, e limite de
+tentativas de login e cadastro
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from backend.security import decode_access_token
+from utils.limitador import LimitadorTaxa, segundos_retry_after
+from utils.persistence import buscar_por_chave_unica, normalizar_chave, registrar_log, registrar_observador
+from utils.persistence_async import executar_leitura
+
+# Máximo de tokens verificados mantidos em memória (os menos usados saem primeiro)
+TAMANHO_CACHE_TOKENS = int(os.getenv("JWT_CACHE_TAMANHO", "10000"))
+
+# Tentativas de login/cadastro: rajada e reposição por minuto, por IP do
+# cliente e por email alvo do login (por_minuto 0 = sem limite)
+LIMITE_AUTH_IP_RAJADA = int(os.getenv("AUTH_LIMITE_IP_RAJADA", "20"))
+LIMITE_AUTH_IP_POR_MINUTO = float(os.getenv("AUTH_LIMITE_IP_POR_MINUTO", "10"))
+LIMITE_AUTH_EMAIL_RAJADA = int(os.getenv("AUTH_LIMITE_EMAIL_RAJADA", "5"))
+LIMITE_AUTH_EMAIL_POR_MINUTO = float(os.getenv("AUTH_LIMITE_EMAIL_POR_MINUTO", "2"))
+LIMITE_AUTH_MAX_CHAVES = int(os.getenv("AUTH_LIMITE_MAX_CHAVES", "100000"))
+
+# Campos do usuário que nunca saem do servidor
+_CAMPOS_PRIVADOS = ("hashed_password",)
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+
+def _nao_autenticado(detalhe: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detalhe,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+class CacheTokens:
+    """
+    Cache LRU de tokens JWT já verificados
+
+    Guarda, por token, o usuário resolvido e a expiração (claim exp): uma
+    requisição repetida com o mesmo token não refaz a verificação HMAC, a
+    leitura das claims nem a busca do usuário. Uma entrada expirada é
+    descartada ao ser consultada. Qualquer alteração ou remoção de usuário
+    (ex.: mudança de role) limpa o cache, para que nada desatualizado seja
+    servido; cadastros novos não afetam tokens existentes.
+
+    Example:
+        >>> cache = CacheTokens(capacidade=1000)
+        >>> cache.guardar(token, usuario, expira_em=1767225600, geracao=cache.geracao)
+        >>> cache.obter(token)
+        {'_id': '1', 'email': 'teste@passabola.com', 'role': 'jogadora_amadora', ...}
+    """
+
+    def __init__(self, collection_name: str = "users", capacidade: int = TAMANHO_CACHE_TOKENS):
+        self.capacidade = capacidade
+        self._entradas: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Avança a cada invalidação: um token resolvido antes dela não é guardado
+        self.geracao = 0
+        self._estatisticas = {"hits": 0, "misses": 0, "expirados": 0, "invalidos": 0, "descartes": 0, "invalidacoes": 0}
+        registrar_observador(collection_name, self._ao_alterar)
+
+    def _ao_alterar(self, operacao: str, antigo: Optional[Dict[str, Any]], novo: Optional[Dict[str, Any]]) -> None:
+        """Observador dos usuários: alterações e remoções limpam o cache"""
+        if operacao == "inserir":
+            return
+        with self._lock:
+            self.geracao += 1
+            if self._entradas:
+                self._entradas.clear()
+                self._estatisticas["invalidacoes"] += 1
+
+    def obter(self, token: str) -> Optional[Dict[str, Any]]:
+        """Usuário de um token verificado, ou None (ausente ou expirado)"""
+        with self._lock:
+            entrada = self._entradas.get(token)
+            if entrada is None:
+                self._estatisticas["misses"] += 1
+                return None
+            if entrada[1] <= time.time():
+                del self._entradas[token]
+                self._estatisticas["expirados"] += 1
+                self._estatisticas["misses"] += 1
+                return None
+            self._entradas.move_to_end(token)
+            self._estatisticas["hits"] += 1
+            return entrada[0]
+
+    def guardar(self, token: str, usuario: Dict[str, Any], expira_em: float, geracao: int) -> None:
+        """Guarda um token verificado até a sua expiração (se não houve invalidação desde geracao)"""
+        if self.capacidade <= 0:
+            return
+        with self._lock:
+            if geracao != self.geracao:
+                return
+            self._entradas[token] = (usuario, expira_em)
+            self._entradas.move_to_end(token)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+                self._estatisticas["descartes"] += 1
+
+    def registrar_invalido(self) -> None:
+        with self._lock:
+            self._estatisticas["invalidos"] += 1
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Contadores do cache
+
+        Returns:
+            Dict: hits, misses, tokens expirados e inválidos, descartes por
+            capacidade, invalidações, entradas e taxa de acerto
+        """
+        with self._lock:
+            estatisticas: Dict[str, Any] = dict(self._estatisticas)
+            estatisticas["entradas"] = len(self._entradas)
+        consultas = estatisticas["hits"] + estatisticas["misses"]
+        estatisticas["taxa_acerto"] = round(estatisticas["hits"] / consultas, 4) if consultas else 0.0
+        estatisticas["capacidade"] = self.capacidade
+        return estatisticas
+
+
+cache_tokens = CacheTokens("users")
+
+
+def _resolver_token(token: str) -> Optional[Tuple[Dict[str, Any], float]]:
+    """Verifica o token e busca o usuário (None se inválido, expirado ou sem usuário)"""
+    payload = decode_access_token(token)
+    if not payload or not payload.get("sub") or payload.get("exp") is None:
+        return None
+    encontrado = buscar_por_chave_unica("users", "email", payload["sub"])
+    if encontrado is None:
+        return None
+    usuario = {campo: valor for campo, valor in encontrado.items() if campo not in _CAMPOS_PRIVADOS}
+    return usuario, float(payload["exp"])
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
+    """
+    Dependência: usuário autenticado pelo token JWT
+
+    Um token já verificado vem do cache, sem decodificar nem buscar o
+    usuário de novo; os demais são verificados (assinatura e exp) e o
+    usuário é buscado pelo email (claim sub).
+
+    Returns:
+        Dict: usuário (sem o hash da senha)
+
+    Raises:
+        HTTPException: 401 se o token faltar, for inválido, estiver
+        expirado ou o usuário não existir mais
+
+    Example:
+        >>> @router.get("/perfil")
+        ... async def perfil(usuario: Dict = Depends(get_current_user)):
+        ...     return usuario
+    """
+    usuario = cache_tokens.obter(token)
+    if usuario is not None:
+        return dict(usuario)
+
+    geracao = cache_tokens.geracao
+    resolvido = await executar_leitura(_resolver_token, token)
+    if resolvido is None:
+        cache_tokens.registrar_invalido()
+        raise _nao_autenticado("Token inválido ou expirado")
+
+    usuario, expira_em = resolvido
+    cache_tokens.guardar(token, usuario, expira_em, geracao)
+    return dict(usuario)
+
+
+def exigir_roles(*roles: str) -> Callable:
+    """
+    Dependência: usuário autenticado com um dos roles informados
+
+    Raises:
+        HTTPException: 401 sem autenticação válida, 403 com outro role
+
+    Example:
+        >>> @router.post("/", dependencies=[Depends(exigir_roles("olheiro", "jogadora_profissional"))])
+    """
+    permitidos = frozenset(roles)
+
+    async def verificar_role(usuario: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
+        if usuario.get("role") not in permitidos:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Acesso restrito aos perfis: {', '.join(sorted(permitidos))}"
+            )
+        return usuario
+
+    return verificar_role
+
+
+limite_auth_ip = LimitadorTaxa("ip", LIMITE_AUTH_IP_RAJADA, LIMITE_AUTH_IP_POR_MINUTO, LIMITE_AUTH_MAX_CHAVES)
+limite_auth_email = LimitadorTaxa("email", LIMITE_AUTH_EMAIL_RAJADA, LIMITE_AUTH_EMAIL_POR_MINUTO, LIMITE_AUTH_MAX_CHAVES)
+
+
+def _muitas_tentativas(espera: float, motivo: str) -> HTTPException:
+    registrar_log(f"⚠ Tentativa de autenticação bloqueada ({motivo})")
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Muitas tentativas. Aguarde antes de tentar novamente.",
+        headers={"Retry-After": segundos_retry_after(espera)}
+    )
+
+
+def _limitar_ip(request: Request) -> None:
+    ip = request.client.host if request.client else "desconhecido"
+    espera = limite_auth_ip.consumir(ip)
+    if espera:
+        raise _muitas_tentativas(espera, f"IP {ip}")
+
+
+async def limitar_login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()) -> None:
+    """
+    Dependência: limite de tentativas de login, antes do bcrypt
+
+    Cada tentativa consome uma ficha do IP do cliente e uma do email
+    informado (normalizado); sem ficha, responde 429 com Retry-After sem
+    buscar o usuário nem verificar a senha. O limite por IP segura um
+    cliente testando muitas contas; o limite por email segura muitos IPs
+    testando a mesma conta.
+
+    Raises:
+        HTTPException: 429 se o IP ou o email excedeu o limite
+
+    Example:
+        >>> @router.post("/login", dependencies=[Depends(limitar_login)])
+    """
+    _limitar_ip(request)
+    email = normalizar_chave(form_data.username)
+    if email is not None:
+        espera = limite_auth_email.consumir(email)
+        if espera:
+            raise _muitas_tentativas(espera, f"email {form_data.username}")
+
+
+async def limitar_cadastro(request: Request) -> None:
+    """
+    Dependência: limite de cadastros por IP do cliente, antes do bcrypt
+
+    (O email repetido já é recusado pelo índice de emails antes do hash.)
+
+    Raises:
+        HTTPException: 429 se o IP excedeu o limite
+    """
+    _limitar_ip(request)
+
+
+def estatisticas_limites() -> Dict[str, Any]:
+    """
+    Contadores dos limites de autenticação
+
+    Returns:
+        Dict: contadores dos limitadores por IP e por email
+    """
+    return {"ip": limite_auth_ip.estatisticas(), "email": limite_auth_email.estatisticas()}
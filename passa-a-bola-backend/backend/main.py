@@ -6,18 +6,54 @@ Desenvolvido por: Calçada LTDA
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
+import gc
+import json
+import os
 import sys
 from pathlib import Path
+from typing import Any, Dict
 
 # Adicionar path para imports
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 # Importar rotas
-from backend.routes import auth, players, events
+from backend.routes import auth, players, events, notificacoes
+from backend.dependencias import cache_tokens, estatisticas_limites
+from backend.security import pool_senhas
 
 # Importar sistema de persistência
-from utils.persistence import registrar_log, carregar_backup_json, salvar_backup_json
+from utils.persistence import (
+    registrar_log,
+    carregar_backup_json,
+    registrar_dados_iniciais,
+    estatisticas_cache,
+    estatisticas_log,
+    encerrar_persistencia,
+    encerrar_log
+)
+from utils.persistence_async import encerrar_filas, estatisticas_filas, executar_leitura
+from utils.metricas import MiddlewareMetricas, registro_metricas
+
+
+# Início sob demanda (serverless): o startup não lê coleções, não grava
+# nada e não sobe processos; cada coleção é lida (e semeada, se vazia) no
+# primeiro acesso e o agendador de inscrições sobe na primeira requisição.
+# Ativado por padrão na Vercel e no AWS Lambda
+INICIO_SOB_DEMANDA = os.getenv(
+    "INICIO_SOB_DEMANDA",
+    "1" if os.getenv("VERCEL") or os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "0"
+) == "1"
+
+# Limiares do coletor de ciclos, ajustados uma vez no startup para o
+# processo inteiro: a carga das coleções e a montagem dos índices em
+# memória criam milhões de objetos de vida longa, que com os limiares
+# padrão do Python (700, 10, 10) são varridos repetidamente (a montagem
+# do ranking com 1M de jogadoras fica 2,5x mais lenta). GC_LIMIAR=700,10,10
+# volta ao padrão
+GC_LIMIAR = tuple(int(valor) for valor in os.getenv("GC_LIMIAR", "50000,20,100").split(","))
+gc.set_threshold(*GC_LIMIAR)
 
 
 @asynccontextmanager
@@ -32,8 +68,15 @@ async def lifespan(app: FastAPI):
         registrar_log("🚀 API Passa a Bola iniciada com sucesso!")
         registrar_log("=" * 60)
         
-        # Verificar e criar arquivos JSON iniciais se não existirem
-        inicializar_dados_exemplo()
+        if not INICIO_SOB_DEMANDA:
+            # Carregar as coleções (gravando os dados iniciais das vazias)
+            inicializar_dados_exemplo()
+            
+            # Encerrar as inscrições dos eventos que já aconteceram e agendar as demais
+            events.agendador_inscricoes.iniciar()
+            
+            # Subir os processos do bcrypt em segundo plano (primeiro login sem espera)
+            pool_senhas.iniciar()
         
     except Exception as e:
         registrar_log(f"✗ ERRO ao iniciar aplicação: {str(e)}")
@@ -41,9 +84,27 @@ async def lifespan(app: FastAPI):
     yield  # Aplicação rodando
     
     # Shutdown
+    # Fechar os streams de notificações (senão o servidor espera por eles)
+    notificacoes.barramento.encerrar()
+    
+    # Parar o agendador antes de gravar as coleções
+    events.agendador_inscricoes.parar()
+    
+    # Encerrar os processos do bcrypt
+    pool_senhas.encerrar()
+    
+    # Concluir as gravações das rotas ainda na fila
+    encerrar_filas()
+    
+    # Compactar journals pendentes antes de encerrar
+    encerrar_persistencia()
+    
     registrar_log("=" * 60)
     registrar_log("🛑 API Passa a Bola encerrada")
     registrar_log("=" * 60)
+    
+    # Gravar as mensagens de log ainda na fila
+    encerrar_log()
 
 
 # Criar aplicação FastAPI com lifespan
@@ -98,12 +159,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # GET, POST, PUT, DELETE, etc
     allow_headers=["*"],  # Authorization, Content-Type, etc
+    expose_headers=["X-Total-Count", "X-Proximo-Cursor"],  # Paginação
 )
 
+
+class IniciarNaPrimeiraRequisicao:
+    """
+    Middleware ASGI do início sob demanda: na primeira requisição HTTP
+    inicia o agendador de inscrições (que lê os eventos na própria thread)
+    e depois só repassa as requisições
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.pendente = True
+
+    async def __call__(self, scope, receive, send):
+        if self.pendente and scope["type"] == "http":
+            self.pendente = False
+            events.agendador_inscricoes.iniciar()
+        await self.app(scope, receive, send)
+
+
+if INICIO_SOB_DEMANDA:
+    app.add_middleware(IniciarNaPrimeiraRequisicao)
+
+# Contagem, status e latência por rota (exportados em /metrics); o último
+# middleware adicionado é o mais externo e mede a requisição inteira
+app.add_middleware(MiddlewareMetricas)
+
 # Incluir rotas
 app.include_router(auth.router)
 app.include_router(players.router)
 app.include_router(events.router)
+app.include_router(notificacoes.router)
 
 
 @app.get("/", tags=["Root"])
@@ -124,58 +213,101 @@ def root():
     }
 
 
+def _contadores() -> Dict[str, Any]:
+    """Contadores expostos no health check (só memória)"""
+    return {
+        "cache": estatisticas_cache(),
+        "persistencia_async": estatisticas_filas(),
+        "cache_respostas": {
+            "jogadoras": players.cache_listagem.estatisticas(),
+            "eventos": events.cache_listagem.estatisticas()
+        },
+        "inscricoes": events.controle_inscricoes.estatisticas(),
+        "notificacoes": notificacoes.barramento.estatisticas(),
+        "agendador": events.agendador_inscricoes.estatisticas(),
+        "senhas": pool_senhas.estatisticas(),
+        "autenticacao": cache_tokens.estatisticas(),
+        "limites_autenticacao": estatisticas_limites(),
+        "log": estatisticas_log()
+    }
+
+
 @app.get("/health", tags=["Health"])
-def health_check():
+async def health_check():
     """
     Rota de health check
+    Inclui os contadores do cache de coleções, das filas de leitura e
+    gravação das rotas, do cache de respostas das listagens, das
+    inscrições, das notificações, do agendador de encerramento das
+    inscrições, do pool de senhas, do cache de tokens, dos limites de
+    tentativas de autenticação e da fila de log. Os contadores são lidos
+    na fila de leituras: vários deles usam locks de thread, que o loop de
+    eventos não deve esperar
+    """
+    contadores = await executar_leitura(_contadores)
+    return {"status": "healthy", "mensagem": "API funcionando corretamente", **contadores}
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metricas():
+    """
+    Métricas no formato texto do Prometheus
+    Requisições por rota, método e status, histogramas de latência por
+    rota e contadores de E/S da persistência (bytes lidos e gravados,
+    coleções lidas do disco, tempo de decodificação do JSON e gravações
+    do logs.txt)
     """
-    return {"status": "healthy", "mensagem": "API funcionando corretamente"}
+    return PlainTextResponse(registro_metricas.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# Diretório com os dados de exemplo do frontend (copiados para coleções vazias)
+DADOS_FRONTEND = Path(__file__).resolve().parent.parent.parent / "passa-a-bola-frontend" / "src" / "data"
+
+# Usuário de teste (senha "senha123"): hash bcrypt pré-calculado, para que
+# nenhum hash seja gerado no startup. Com BCRYPT_CUSTO diferente de 12, o
+# hash é regravado no primeiro login
+USUARIO_TESTE = {
+    "_id": "1",
+    "nome": "Usuária Teste",
+    "email": "teste@passabola.com",
+    "hashed_password": "$2b$12$mpT.CuJJc.rqiBU3uWa4guEH3lQr4Plln2UUMTG1C7c3VBreK4Qfi",
+    "role": "jogadora_amadora",
+    "data_criacao": "2025-11-05T00:00:00"
+}
+
+
+def _dados_frontend(collection_name: str, arquivo: str):
+    """Fornecedor dos dados iniciais: cópia dos dados de exemplo do frontend"""
+    caminho = DADOS_FRONTEND / arquivo
+    if not caminho.exists():
+        return []
+    with open(caminho, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    registrar_log(f"✓ {collection_name}: {len(dados)} registros importados do frontend")
+    return dados
+
+
+def _usuarios_iniciais():
+    """Fornecedor dos dados iniciais de users: usuário de teste"""
+    registrar_log("✓ Usuário de teste criado: teste@passabola.com / senha123")
+    return [dict(USUARIO_TESTE)]
+
+
+# Só registra os fornecedores (nada é lido aqui): cada coleção vazia recebe
+# seus dados no primeiro acesso
+registrar_dados_iniciais("jogadoras", lambda: _dados_frontend("jogadoras", "jogadoras.json"))
+registrar_dados_iniciais("eventos", lambda: _dados_frontend("eventos", "eventos.json"))
+registrar_dados_iniciais("users", _usuarios_iniciais)
 
 
 def inicializar_dados_exemplo():
     """
-    Inicializa arquivos JSON com dados de exemplo
-    Copia dados do frontend se os arquivos não existirem
+    Carrega as coleções no startup
+    Coleções vazias recebem os dados iniciais registrados acima (dados de
+    exemplo do frontend e usuário de teste)
     """
-    import json
-    from pathlib import Path
-    
-    # Verificar se já existem dados
-    usuarios = carregar_backup_json("users")
-    jogadoras = carregar_backup_json("jogadoras")
-    eventos = carregar_backup_json("eventos")
-    
-    # Se não houver jogadoras, copiar do frontend
-    if len(jogadoras) == 0:
-        frontend_jogadoras = Path(__file__).resolve().parent.parent.parent / "passa-a-bola-frontend" / "src" / "data" / "jogadoras.json"
-        if frontend_jogadoras.exists():
-            with open(frontend_jogadoras, 'r', encoding='utf-8') as f:
-                jogadoras_data = json.load(f)
-                salvar_backup_json("jogadoras", jogadoras_data)
-                registrar_log(f"✓ {len(jogadoras_data)} jogadoras importadas do frontend")
-    
-    # Se não houver eventos, copiar do frontend
-    if len(eventos) == 0:
-        frontend_eventos = Path(__file__).resolve().parent.parent.parent / "passa-a-bola-frontend" / "src" / "data" / "eventos.json"
-        if frontend_eventos.exists():
-            with open(frontend_eventos, 'r', encoding='utf-8') as f:
-                eventos_data = json.load(f)
-                salvar_backup_json("eventos", eventos_data)
-                registrar_log(f"✓ {len(eventos_data)} eventos importados do frontend")
-    
-    # Criar usuário de teste se não houver usuários
-    if len(usuarios) == 0:
-        from backend.security import get_password_hash
-        usuario_teste = {
-            "_id": "1",
-            "nome": "Usuária Teste",
-            "email": "teste@passabola.com",
-            "hashed_password": get_password_hash("senha123"),
-            "role": "jogadora_amadora",
-            "data_criacao": "2025-11-05T00:00:00"
-        }
-        salvar_backup_json("users", [usuario_teste])
-        registrar_log("✓ Usuário de teste criado: teste@passabola.com / senha123")
+    for collection_name in ("users", "jogadoras", "eventos"):
+        carregar_backup_json(collection_name)
 
 
 # Executar a aplicação
@@ -86,6 +86,8 @@ class EventoCreate(EventoBase):
     vagas: Optional[int] = None
     categoria: Optional[str] = None
     organizador: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class EventoResponse(EventoBase):
@@ -98,6 +100,14 @@ class EventoResponse(EventoBase):
         from_attributes = True
 
 
+class InscricaoCreate(BaseModel):
+    """Modelo para inscrição em evento"""
+    nome: str = Field(..., min_length=3, max_length=100, description="Nome completo de quem se inscreve")
+    email: EmailStr = Field(..., description="Email válido (uma inscrição por email em cada evento)")
+    telefone: Optional[str] = Field(None, max_length=30)
+    jogadora_id: Optional[str] = Field(None, description="ID da jogadora cadastrada, se houver")
+
+
 class MessageResponse(BaseModel):
     """Modelo genérico de resposta com mensagem"""
     mensagem: str
@@ -13,41 +13,74 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 
+from backend.dependencias import get_current_user, limitar_cadastro, limitar_login
 from backend.models import UsuarioCreate, UsuarioResponse, TokenResponse
-from backend.security import get_password_hash, verify_password, create_access_token
+from backend.security import (
+    PoolSenhasSaturado,
+    create_access_token,
+    get_password_hash_async,
+    verify_password_async
+)
 from utils.persistence import (
-    carregar_backup_json,
-    salvar_backup_json,
-    inserir_registro_json,
+    ChaveDuplicada,
+    registrar_campo_id,
+    registrar_chave_unica,
     registrar_log
 )
+from utils.persistence_async import (
+    atualizar_registro_json_async,
+    buscar_por_chave_unica_async,
+    inserir_registro_json_async
+)
 
 router = APIRouter(prefix="/auth", tags=["Autenticação"])
 
+# Email único sem diferenciar maiúsculas: índice mantido pela persistência,
+# usado no cadastro (verificação atômica com a inserção) e no login
+registrar_chave_unica("users", "email")
+
+# Campo de ID da coleção (chave primária no backend SQLite)
+registrar_campo_id("users", "_id")
+
+
+def pool_saturado(e: PoolSenhasSaturado) -> HTTPException:
+    """Resposta 503 para quando a fila do bcrypt está cheia"""
+    registrar_log(f"⚠ Operação de senha recusada (pool saturado): {str(e)}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "1"}
+    )
+
+
+def email_duplicado(email: str) -> HTTPException:
+    """Resposta 400 para cadastro com email já existente"""
+    registrar_log(f"✗ Tentativa de registro com email duplicado: {email}")
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Email já cadastrado. Faça login ou use outro email."
+    )
 
-@router.post("/register", response_model=Dict, status_code=status.HTTP_201_CREATED)
-def registrar_usuario(dados: UsuarioCreate):
+
+@router.post("/register", response_model=Dict, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(limitar_cadastro)])
+async def registrar_usuario(dados: UsuarioCreate):
     """
     Registra novo usuário no sistema (CRUD - CREATE)
     Try-except obrigatório para tratamento de erros
     
     Validações:
-    - Email único
+    - Email único (sem diferenciar maiúsculas)
     - Senha mínimo 8 caracteres
     - Role válido
+    
+    O bcrypt roda no pool de senhas (503 se estiver saturado); tentativas
+    demais por IP respondem 429 antes dele
     """
     try:
-        # Carregar usuários existentes do JSON
-        usuarios = carregar_backup_json("users")
-        
-        # Validar email único
-        for usuario in usuarios:
-            if usuario.get('email') == dados.email:
-                registrar_log(f"✗ Tentativa de registro com email duplicado: {dados.email}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email já cadastrado. Faça login ou use outro email."
-                )
+        # Validar email único (antes do bcrypt; a inserção confirma de forma atômica)
+        if await buscar_por_chave_unica_async("users", "email", dados.email):
+            raise email_duplicado(dados.email)
         
         # Validar role
         roles_validos = ['jogadora_amadora', 'jogadora_profissional', 'olheiro', 'torcedor']
@@ -58,7 +91,10 @@ def registrar_usuario(dados: UsuarioCreate):
             )
         
         # Hash da senha
-        senha_hash = get_password_hash(dados.senha)
+        try:
+            senha_hash = await get_password_hash_async(dados.senha)
+        except PoolSenhasSaturado as e:
+            raise pool_saturado(e)
         
         # Criar registro do usuário
         novo_usuario = {
@@ -69,11 +105,14 @@ def registrar_usuario(dados: UsuarioCreate):
             "data_criacao": str(datetime.now())
         }
         
-        # Adicionar aos usuários
-        usuarios.append(novo_usuario)
-        
         # Salvar backup JSON (REQUISITO OBRIGATÓRIO)
-        salvar_backup_json("users", usuarios)
+        try:
+            inserido = await inserir_registro_json_async("users", novo_usuario)
+        except ChaveDuplicada:
+            # Cadastro concorrente com o mesmo email durante o hash da senha
+            raise email_duplicado(dados.email)
+        if not inserido:
+            raise IOError("Falha ao gravar usuário")
         
         # Log da ação (REQUISITO OBRIGATÓRIO)
         registrar_log(f"✓ Novo usuário registrado: {dados.email} ({dados.role})")
@@ -100,8 +139,8 @@ def registrar_usuario(dados: UsuarioCreate):
         )
 
 
-@router.post("/login", response_model=TokenResponse)
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(limitar_login)])
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """
     Autentica usuário e retorna token JWT (CRUD - READ)
     Try-except obrigatório para tratamento de erros
@@ -112,17 +151,13 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
         
     Returns:
         dict: access_token, token_type, role, nome
+    
+    O bcrypt roda no pool de senhas (503 se estiver saturado); tentativas
+    demais por IP ou por email respondem 429 antes dele
     """
     try:
-        # Carregar usuários do JSON (REQUISITO OBRIGATÓRIO)
-        usuarios = carregar_backup_json("users")
-        
-        # Buscar usuário por email
-        usuario_encontrado = None
-        for usuario in usuarios:
-            if usuario.get('email') == form_data.username:
-                usuario_encontrado = usuario
-                break
+        # Buscar usuário por email (REQUISITO OBRIGATÓRIO), pelo índice de emails
+        usuario_encontrado = await buscar_por_chave_unica_async("users", "email", form_data.username)
         
         # Verificar se usuário existe
         if not usuario_encontrado:
@@ -134,7 +169,13 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
             )
         
         # Verificar senha
-        if not verify_password(form_data.password, usuario_encontrado["hashed_password"]):
+        try:
+            senha_valida, novo_hash = await verify_password_async(
+                form_data.password, usuario_encontrado["hashed_password"]
+            )
+        except PoolSenhasSaturado as e:
+            raise pool_saturado(e)
+        if not senha_valida:
             registrar_log(f"✗ Tentativa de login com senha incorreta: {form_data.username}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -142,6 +183,10 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        # Hash com custo diferente do configurado (BCRYPT_CUSTO): regravar
+        if novo_hash and "_id" in usuario_encontrado:
+            await atualizar_registro_json_async("users", usuario_encontrado["_id"], {"hashed_password": novo_hash})
+        
         # Gerar token JWT
         token = create_access_token(
             data={
@@ -170,6 +215,25 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
         )
 
 
+@router.get("/me", response_model=UsuarioResponse)
+async def usuario_atual(usuario: Dict = Depends(get_current_user)):
+    """
+    Retorna o usuário autenticado pelo token (CRUD - READ)
+    Try-except obrigatório para tratamento de erros
+    
+    Requer header Authorization: Bearer <token> (401 sem token válido)
+    """
+    try:
+        return {**usuario, "id": usuario.get("_id")}
+        
+    except Exception as e:
+        registrar_log(f"✗ ERRO inesperado ao buscar usuário autenticado: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro interno ao buscar usuário: {str(e)}"
+        )
+
+
 # Importar datetime
 from datetime import datetime
 
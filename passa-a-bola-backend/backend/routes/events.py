@@ -4,37 +4,124 @@ Todas as rotas com try-except (REQUISITO OBRIGATÓRIO)
 Operações em arquivos JSON (REQUISITO OBRIGATÓRIO)
 """
 
-from fastapi import APIRouter, HTTPException, status
-from typing import List, Dict
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from typing import List, Dict, Optional
 
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 
-from backend.models import EventoCreate, EventoResponse
+from backend.models import EventoCreate, EventoResponse, InscricaoCreate
 from utils.persistence import (
     carregar_backup_json,
-    salvar_backup_json,
+    buscar_registro_json,
+    registrar_campo_id,
     registrar_log
 )
+from utils.persistence_async import (
+    atualizar_registro_json_async,
+    buscar_registro_json_async,
+    deletar_registro_json_async,
+    executar_escrita,
+    executar_leitura,
+    inserir_registro_json_async,
+    inserir_registros_json_async,
+    versao_colecao_async
+)
+from utils.agendador import AgendadorEncerramentos
+from utils.cache_respostas import CacheRespostas
+from utils.condicional import resposta_condicional
+from utils.geoespacial import IndiceGeoespacial
+from utils.importacao import validar_registros, ErroImportacao
+from utils.indices import IndiceTemporal, CursorInvalido, agora_local, limite_intervalo
+from utils.inscricoes import ControleInscricoes, EventoNaoEncontrado, InscricoesEncerradas, InscricaoDuplicada
+from utils.projecao import projecao_campos, CamposInvalidos
 
 router = APIRouter(prefix="/api/events", tags=["Eventos"])
 
+# Campo de ID da coleção (chave primária no backend SQLite)
+registrar_campo_id("eventos", "id")
+
+# Corpos prontos (JSON e gzip/brotli) da listagem, por versão da coleção
+cache_listagem = CacheRespostas("eventos")
+
+# Grade espacial para "eventos perto de mim" (filtros aplicados na busca)
+CAMPOS_FILTRO_PROXIMIDADE = ("tipo", "categoria", "inscricoes_abertas")
+indice_geoespacial = IndiceGeoespacial("eventos", filtros=CAMPOS_FILTRO_PROXIMIDADE, campo_id="id")
+
+# Eventos em ordem cronológica (data + horário) para o calendário
+indice_calendario = IndiceTemporal("eventos", campo_data="data", campo_horario="horario", campo_id="id")
+
+# Reserva atômica de vagas (lock por evento) e arquivo de inscrições
+controle_inscricoes = ControleInscricoes("eventos", campo_id="id")
+
+# Encerramento automático das inscrições na data/horário do evento
+# (thread iniciada e parada pelo lifespan em backend/main.py)
+agendador_inscricoes = AgendadorEncerramentos("eventos", campo_data="data", campo_horario="horario", campo_id="id")
+
+
+def evento_nao_encontrado(evento_id: str) -> HTTPException:
+    """Resposta 404 para evento inexistente (ou removido durante a requisição)"""
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Evento com ID {evento_id} não encontrado"
+    )
+
+
+def montar_evento(dados: EventoCreate) -> Dict:
+    """Registro de um novo evento, sem ID (vagas disponíveis e inscrições abertas)"""
+    return {
+        **dados.dict(),
+        "vagas_disponiveis": dados.vagas if dados.vagas else None,
+        "inscricoes_abertas": True
+    }
+
 
 @router.get("/", response_model=List[Dict])
-def listar_eventos():
+async def listar_eventos(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: titulo,data)")
+):
     """
     Lista todos os eventos (CRUD - READ)
     Try-except obrigatório para tratamento de erros
+    
+    Com fields, cada evento traz só os campos pedidos (e o id). Com
+    If-None-Match igual ao ETag da coleção, retorna 304 sem carregar os eventos.
     """
     try:
-        # Carregar do JSON (REQUISITO OBRIGATÓRIO)
-        eventos = carregar_backup_json("eventos")
+        try:
+            projetar = projecao_campos(fields)
+        except CamposInvalidos as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         
-        registrar_log(f"✓ Listagem de eventos: {len(eventos)} registros")
+        versao, modificado = await versao_colecao_async("eventos")
+        nao_modificado = resposta_condicional(request, response, versao, modificado)
+        if nao_modificado is not None:
+            return nao_modificado
         
-        return eventos
+        def montar_listagem():
+            # Carregar do JSON (REQUISITO OBRIGATÓRIO)
+            eventos = carregar_backup_json("eventos")
+            
+            registrar_log(f"✓ Listagem de eventos: {len(eventos)} registros")
+            
+            if projetar is not None:
+                return [projetar(evento) for evento in eventos], {}
+            return eventos, {}
+        
+        # Corpo já serializado (e comprimido) por versão da coleção
+        return await executar_leitura(
+            cache_listagem.responder, request, versao, montar_listagem,
+            cabecalhos=dict(response.headers)
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         registrar_log(f"✗ ERRO ao listar eventos: {str(e)}")
         raise HTTPException(
@@ -43,20 +130,183 @@ def listar_eventos():
         )
 
 
+@router.get("/near", response_model=List[Dict])
+async def buscar_eventos_proximos(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude do ponto"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude do ponto"),
+    radius_km: Optional[float] = Query(None, gt=0, le=20000, description="Distância máxima; sem raio, retorna os mais próximos"),
+    limit: int = Query(20, ge=1, le=500, description="Quantidade máxima de eventos (k mais próximos)"),
+    tipo: Optional[str] = None,
+    categoria: Optional[str] = None,
+    inscricoes_abertas: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: titulo,data)")
+):
+    """
+    Eventos mais próximos de um ponto (CRUD - READ)
+    Try-except obrigatório para tratamento de erros
+    
+    Do mais perto para o mais longe, cada evento com o campo
+    "distancia_km". Servido pelo índice geoespacial, sem varrer os eventos.
+    """
+    try:
+        try:
+            projetar = projecao_campos(fields)
+        except CamposInvalidos as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        def buscar_proximos():
+            proximos = indice_geoespacial.proximos(
+                lat, lon,
+                limite=limit,
+                raio_km=radius_km,
+                filtros={"tipo": tipo, "categoria": categoria, "inscricoes_abertas": inscricoes_abertas}
+            )
+            
+            eventos = []
+            for evento_id, distancia in proximos:
+                evento = buscar_registro_json("eventos", evento_id, campo_id="id")
+                if evento is not None:
+                    if projetar is not None:
+                        evento = projetar(evento)
+                    eventos.append({**evento, "distancia_km": distancia})
+            return eventos
+        
+        eventos = await executar_leitura(buscar_proximos)
+        
+        registrar_log(f"✓ Eventos próximos de ({lat}, {lon}): {len(eventos)} resultados")
+        
+        return eventos
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao buscar eventos próximos: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao buscar eventos próximos: {str(e)}"
+        )
+
+
+@router.get("/calendar", response_model=List[Dict])
+async def calendario_eventos(
+    response: Response,
+    inicio: Optional[str] = Query(None, alias="from", description="Data inicial (AAAA-MM-DD ou AAAA-MM-DDTHH:MM)"),
+    fim: Optional[str] = Query(None, alias="to", description="Data final, inclusiva (AAAA-MM-DD ou AAAA-MM-DDTHH:MM)"),
+    periodo: Optional[str] = Query(None, pattern="^(upcoming|past)$", description="upcoming: a partir de agora; past: até agora"),
+    ordem: Optional[str] = Query(None, pattern="^(asc|desc)$", description="Padrão: desc para past, asc nos demais"),
+    limit: int = Query(50, ge=1, le=500, description="Tamanho da página"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em X-Proximo-Cursor"),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: titulo,data)")
+):
+    """
+    Eventos de um período em ordem cronológica (CRUD - READ)
+    Try-except obrigatório para tratamento de erros
+    
+    Servido pelo índice de data/horário, sem varrer os eventos. O total do
+    período vem em X-Total-Count e o cursor da próxima página em
+    X-Proximo-Cursor. Eventos sem data válida não aparecem.
+    """
+    try:
+        try:
+            projetar = projecao_campos(fields)
+        except CamposInvalidos as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        try:
+            inicio = limite_intervalo(inicio) if inicio is not None else None
+            fim = limite_intervalo(fim, fim=True) if fim is not None else None
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        agora = agora_local()
+        if periodo == "upcoming":
+            inicio = max(inicio, agora) if inicio is not None else agora
+        elif periodo == "past":
+            fim = min(fim, agora) if fim is not None else agora
+        decrescente = ordem == "desc" if ordem is not None else periodo == "past"
+        
+        def consultar():
+            try:
+                ids, proximo_cursor, total = indice_calendario.consultar(
+                    inicio=inicio,
+                    fim=fim,
+                    decrescente=decrescente,
+                    limite=limit,
+                    cursor=cursor
+                )
+            except CursorInvalido:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor inválido"
+                )
+            
+            eventos = []
+            for evento_id in ids:
+                evento = buscar_registro_json("eventos", evento_id, campo_id="id")
+                if evento is not None:
+                    eventos.append(projetar(evento) if projetar is not None else evento)
+            return eventos, proximo_cursor, total
+        
+        eventos, proximo_cursor, total = await executar_leitura(consultar)
+        
+        response.headers["X-Total-Count"] = str(total)
+        if proximo_cursor is not None:
+            response.headers["X-Proximo-Cursor"] = proximo_cursor
+        
+        registrar_log(f"✓ Calendário de eventos ({inicio or '...'} a {fim or '...'}): {len(eventos)} de {total}")
+        
+        return eventos
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao consultar calendário de eventos: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao consultar calendário de eventos: {str(e)}"
+        )
+
+
 @router.get("/{evento_id}", response_model=Dict)
-def buscar_evento(evento_id: str):
+async def buscar_evento(
+    request: Request,
+    response: Response,
+    evento_id: str,
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: titulo,data)")
+):
     """
     Busca um evento por ID (CRUD - READ)
     Try-except obrigatório para tratamento de erros
+    
+    ETag/Last-Modified seguem a versão do evento (304 se não mudou)
     """
     try:
-        eventos = carregar_backup_json("eventos")
+        try:
+            projetar = projecao_campos(fields)
+        except CamposInvalidos as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        nao_modificado = resposta_condicional(request, response, *await versao_colecao_async("eventos", evento_id))
+        if nao_modificado is not None:
+            return nao_modificado
         
         # Buscar evento
-        for evento in eventos:
-            if str(evento.get('id')) == str(evento_id):
-                registrar_log(f"✓ Evento encontrado: {evento.get('titulo')}")
-                return evento
+        evento = await buscar_registro_json_async("eventos", evento_id, campo_id="id")
+        if evento is not None:
+            registrar_log(f"✓ Evento encontrado: {evento.get('titulo')}")
+            return projetar(evento) if projetar is not None else evento
         
         # Não encontrado
         registrar_log(f"⚠ Evento não encontrado: ID {evento_id}")
@@ -76,37 +326,28 @@ def buscar_evento(evento_id: str):
 
 
 @router.post("/", response_model=Dict, status_code=status.HTTP_201_CREATED)
-def criar_evento(dados: EventoCreate):
+async def criar_evento(dados: EventoCreate):
     """
     Cria novo evento (CRUD - CREATE)
     Try-except obrigatório para tratamento de erros
     Salva em arquivo JSON (REQUISITO OBRIGATÓRIO)
     """
     try:
-        eventos = carregar_backup_json("eventos")
-        
-        # Criar novo registro
-        novo_id = str(len(eventos) + 1)
-        novo_evento = {
-            "id": novo_id,
-            **dados.dict(),
-            "vagas_disponiveis": dados.vagas if dados.vagas else None,
-            "inscricoes_abertas": True
-        }
-        
-        eventos.append(novo_evento)
-        
-        # Salvar no JSON (REQUISITO OBRIGATÓRIO)
-        salvar_backup_json("eventos", eventos)
+        # Criar e salvar no JSON (REQUISITO OBRIGATÓRIO); o ID é gerado na inserção
+        novo_evento = await inserir_registro_json_async("eventos", montar_evento(dados), campo_id="id")
+        if novo_evento is None:
+            raise IOError("Falha ao gravar evento")
         
         registrar_log(f"✓ Novo evento criado: {dados.titulo}")
         
         return {
             "mensagem": "Evento criado com sucesso",
-            "id": novo_id,
+            "id": novo_evento["id"],
             "evento": novo_evento
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         registrar_log(f"✗ ERRO ao criar evento: {str(e)}")
         raise HTTPException(
@@ -115,32 +356,123 @@ def criar_evento(dados: EventoCreate):
         )
 
 
-@router.put("/{evento_id}", response_model=Dict)
-def atualizar_evento(evento_id: str, dados: Dict):
+@router.post("/import", response_model=Dict)
+async def importar_eventos(
+    request: Request,
+    atomico: bool = Query(False, description="Se true, qualquer linha inválida cancela a importação inteira")
+):
     """
-    Atualiza dados de um evento (CRUD - UPDATE)
+    Importa eventos em lote (CRUD - CREATE)
     Try-except obrigatório para tratamento de erros
-    Atualiza arquivo JSON (REQUISITO OBRIGATÓRIO)
+    Salva em arquivo JSON com uma única gravação (REQUISITO OBRIGATÓRIO)
+    
+    O corpo é lido em streaming, como NDJSON (um evento por linha) ou
+    array JSON, e cada registro é validado com EventoCreate. Os registros
+    válidos são gravados de uma vez; os inválidos voltam em "erros", com o
+    número da linha.
     """
     try:
-        eventos = carregar_backup_json("eventos")
+        try:
+            eventos, erros, total_erros = await validar_registros(request.stream(), EventoCreate, montar_evento)
+        except ErroImportacao as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         
-        # Encontrar e atualizar evento
-        encontrado = False
-        for i, evento in enumerate(eventos):
-            if str(evento.get('id')) == str(evento_id):
-                eventos[i].update(dados)
-                encontrado = True
-                break
+        if total_erros and atomico:
+            registrar_log(f"⚠ Importação de eventos cancelada: {total_erros} linhas inválidas")
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={"mensagem": "Importação cancelada: há linhas inválidas", "com_erro": total_erros, "erros": erros}
+            )
+        
+        # Gravação única do lote, fora do loop de eventos (REQUISITO OBRIGATÓRIO)
+        if not await inserir_registros_json_async("eventos", eventos, "id"):
+            raise IOError("Falha ao gravar lote de eventos")
+        
+        registrar_log(f"✓ Importação de eventos: {len(eventos)} importados, {total_erros} com erro")
+        
+        return {
+            "mensagem": "Importação concluída",
+            "importados": len(eventos),
+            "com_erro": total_erros,
+            "erros": erros
+        }
         
-        if not encontrado:
+    except HTTPException:
+        raise
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao importar eventos: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao importar eventos: {str(e)}"
+        )
+
+
+@router.post("/{evento_id}/inscricoes", response_model=Dict, status_code=status.HTTP_201_CREATED)
+async def inscrever_evento(evento_id: str, dados: InscricaoCreate):
+    """
+    Inscreve em um evento, reservando uma vaga (CRUD - CREATE)
+    Try-except obrigatório para tratamento de erros
+    Salva em arquivo de inscrições (REQUISITO OBRIGATÓRIO)
+    
+    A vaga é reservada de forma atômica: inscrições simultâneas nunca
+    passam do número de vagas. Quando as vagas acabam, as inscrições do
+    evento são encerradas. Responde 409 sem vagas, com inscrições
+    encerradas ou com o email já inscrito.
+    """
+    try:
+        try:
+            inscricao, evento = await executar_escrita(controle_inscricoes.inscrever, evento_id, dados.dict())
+        except EventoNaoEncontrado as e:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Evento com ID {evento_id} não encontrado"
+                detail=str(e)
+            )
+        except (InscricoesEncerradas, InscricaoDuplicada) as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e)
             )
         
-        # Salvar no JSON (REQUISITO OBRIGATÓRIO)
-        salvar_backup_json("eventos", eventos)
+        registrar_log(f"✓ Inscrição no evento {evento_id}: {dados.nome} ({evento.get('vagas_disponiveis')} vagas restantes)")
+        
+        return {
+            "mensagem": "Inscrição realizada com sucesso",
+            "inscricao": inscricao,
+            "vagas_disponiveis": evento.get("vagas_disponiveis"),
+            "inscricoes_abertas": evento.get("inscricoes_abertas", True)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao inscrever no evento: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao inscrever no evento: {str(e)}"
+        )
+
+
+@router.put("/{evento_id}", response_model=Dict)
+async def atualizar_evento(evento_id: str, dados: Dict):
+    """
+    Atualiza dados de um evento (CRUD - UPDATE)
+    Try-except obrigatório para tratamento de erros
+    Atualiza arquivo JSON (REQUISITO OBRIGATÓRIO)
+    """
+    try:
+        # Verificar se o evento existe
+        if await buscar_registro_json_async("eventos", evento_id, campo_id="id") is None:
+            raise evento_nao_encontrado(evento_id)
+        
+        # Atualizar no JSON (REQUISITO OBRIGATÓRIO)
+        if not await atualizar_registro_json_async("eventos", evento_id, dados, campo_id="id"):
+            # Removido por outra requisição entre a verificação e a gravação
+            if await buscar_registro_json_async("eventos", evento_id, campo_id="id") is None:
+                raise evento_nao_encontrado(evento_id)
+            raise IOError("Falha ao gravar evento")
         
         registrar_log(f"✓ Evento atualizado: ID {evento_id}")
         
@@ -160,26 +492,23 @@ def atualizar_evento(evento_id: str, dados: Dict):
 
 
 @router.delete("/{evento_id}", response_model=Dict)
-def deletar_evento(evento_id: str):
+async def deletar_evento(evento_id: str):
     """
     Deleta um evento (CRUD - DELETE)
     Try-except obrigatório para tratamento de erros
     Remove do arquivo JSON (REQUISITO OBRIGATÓRIO)
     """
     try:
-        eventos = carregar_backup_json("eventos")
-        
-        # Filtrar removendo o evento
-        eventos_filtrados = [e for e in eventos if str(e.get('id')) != str(evento_id)]
-        
-        if len(eventos_filtrados) == len(eventos):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Evento com ID {evento_id} não encontrado"
-            )
+        # Verificar se o evento existe
+        if await buscar_registro_json_async("eventos", evento_id, campo_id="id") is None:
+            raise evento_nao_encontrado(evento_id)
         
-        # Salvar no JSON (REQUISITO OBRIGATÓRIO)
-        salvar_backup_json("eventos", eventos_filtrados)
+        # Remover do JSON (REQUISITO OBRIGATÓRIO)
+        if not await deletar_registro_json_async("eventos", evento_id, campo_id="id"):
+            # Removido por outra requisição entre a verificação e a gravação
+            if await buscar_registro_json_async("eventos", evento_id, campo_id="id") is None:
+                raise evento_nao_encontrado(evento_id)
+            raise IOError("Falha ao remover evento")
         
         registrar_log(f"✓ Evento deletado: ID {evento_id}")
         
@@ -0,0 +1,72 @@
+"""
+Rotas de Notificações em Tempo Real (Server-Sent Events)
+Todas as rotas com try-except (REQUISITO OBRIGATÓRIO)
+"""
+
+from fastapi import APIRouter, HTTPException, Header, Query, status
+from typing import Optional
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from utils.notificacoes import Barramento, LimiteAssinantes, RespostaStream
+from utils.persistence import registrar_log
+
+router = APIRouter(prefix="/api/stream", tags=["Notificações"])
+
+# Mutações de eventos e jogadoras, vindas das escritas (rotas, inscrições...)
+TOPICOS = ("eventos", "jogadoras")
+barramento = Barramento()
+barramento.acompanhar("eventos", campo_id="id")
+barramento.acompanhar("jogadoras", campo_id="id")
+
+
+@router.get("/")
+async def stream_notificacoes(
+    topicos: str = Query(",".join(TOPICOS), description=f"Tópicos separados por vírgula: {', '.join(TOPICOS)}"),
+    last_event_id: Optional[str] = Header(None, description="Enviado pelo EventSource ao reconectar"),
+    ultimo_id: Optional[int] = Query(None, ge=0, description="Alternativa ao header Last-Event-ID")
+):
+    """
+    Stream de mudanças (Server-Sent Events)
+    Try-except obrigatório para tratamento de erros
+
+    Cada mensagem tem "event" igual ao tópico e "data" em JSON com "op"
+    (inserir, atualizar, deletar ou recarregar), "id" e os campos novos ou
+    alterados (ex.: vagas_disponiveis). Ao reconectar com Last-Event-ID, as
+    mensagens perdidas são reenviadas; se já saíram do histórico, chega um
+    evento "reiniciar" e o cliente deve recarregar os dados. Um cliente que
+    não consome as mensagens é desconectado.
+    """
+    try:
+        escolhidos = [topico.strip() for topico in topicos.split(",") if topico.strip()]
+        invalidos = [topico for topico in escolhidos if topico not in TOPICOS]
+        if not escolhidos or invalidos:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Tópicos inválidos: {', '.join(invalidos) or topicos}. Use: {', '.join(TOPICOS)}"
+            )
+
+        if ultimo_id is None and last_event_id is not None and last_event_id.strip().isdigit():
+            ultimo_id = int(last_event_id.strip())
+
+        try:
+            assinante = barramento.assinar(escolhidos, ultimo_id=ultimo_id)
+        except LimiteAssinantes as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e),
+                headers={"Retry-After": "30"}
+            )
+
+        return RespostaStream(barramento, assinante)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao abrir stream de notificações: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao abrir stream de notificações: {str(e)}"
+        )
@@ -4,8 +4,8 @@ Todas as rotas com try-except (REQUISITO OBRIGATÓRIO)
 Operações em arquivos JSON (REQUISITO OBRIGATÓRIO)
 """
 
-from fastapi import APIRouter, HTTPException, status
-from typing import List, Dict
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from typing import List, Dict, Optional
 
 import sys
 from pathlib import Path
@@ -14,30 +14,215 @@ sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 from backend.models import JogadoraCreate, JogadoraResponse
 from utils.persistence import (
     carregar_backup_json,
-    salvar_backup_json,
-    inserir_registro_json,
-    atualizar_registro_json,
-    deletar_registro_json,
+    buscar_registro_json,
+    registrar_campo_id,
     registrar_log
 )
+from utils.persistence_async import (
+    atualizar_registro_json_async,
+    buscar_registro_json_async,
+    deletar_registro_json_async,
+    executar_leitura,
+    inserir_registro_json_async,
+    inserir_registros_json_async,
+    versao_colecao_async
+)
+from utils.indices import IndiceSecundario, CursorInvalido, Ranking, numero
+from utils.busca import IndiceTextual
+from utils.cache_respostas import CacheRespostas
+from utils.condicional import resposta_condicional
+from utils.importacao import validar_registros, ErroImportacao
+from utils.projecao import projecao_campos, CamposInvalidos
+from utils.similaridade import IndiceSimilaridade
 
 router = APIRouter(prefix="/api/players", tags=["Jogadoras"])
 
+# Campo de ID da coleção (chave primária no backend SQLite)
+registrar_campo_id("jogadoras", "id")
+
+# Índices secundários para filtros, ordenação e paginação da listagem
+CAMPOS_FILTRO = ("posicao", "clube_atual", "nacionalidade", "status", "pe_preferido")
+CAMPOS_ORDENACAO = ("gols_carreira", "assistencias", "partidas_jogadas")
+indice_jogadoras = IndiceSecundario(
+    "jogadoras",
+    campo_id="id",
+    igualdade=CAMPOS_FILTRO,
+    intervalo=("idade",),
+    ordenacao=CAMPOS_ORDENACAO
+)
+
+# Corpos prontos (JSON e gzip/brotli) da listagem, por versão da coleção
+cache_listagem = CacheRespostas("jogadoras")
+
+# Índice invertido para a busca textual (peso de cada campo na relevância)
+CAMPOS_BUSCA = {"nome": 3.0, "conquistas": 1.5, "bio": 1.0}
+indice_busca = IndiceTextual("jogadoras", campos=CAMPOS_BUSCA, campo_id="id")
+
+
+def gols_por_partida(jogadora: Dict) -> Optional[float]:
+    """Média de gols por partida (None para quem ainda não jogou)"""
+    partidas = numero(jogadora.get("partidas_jogadas"))
+    if not partidas:
+        return None
+    return round((numero(jogadora.get("gols_carreira")) or 0.0) / partidas, 4)
+
+
+# Rankings mantidos a cada criação/atualização/remoção de jogadora
+METRICAS_RANKING = {
+    "gols_carreira": lambda jogadora: jogadora.get("gols_carreira"),
+    "assistencias": lambda jogadora: jogadora.get("assistencias"),
+    "partidas_jogadas": lambda jogadora: jogadora.get("partidas_jogadas"),
+    "gols_por_partida": gols_por_partida
+}
+CAMPOS_GRUPO_RANKING = ("posicao", "clube_atual")
+ranking_jogadoras = Ranking("jogadoras", METRICAS_RANKING, grupos=CAMPOS_GRUPO_RANKING, campo_id="id")
+
+# Matriz de atributos para "jogadoras parecidas" (k-NN)
+CAMPOS_SIMILARIDADE = ("idade", "altura", "peso", "gols_carreira", "assistencias", "partidas_jogadas")
+CAMPOS_SIMILARIDADE_CATEGORICOS = ("posicao", "pe_preferido")
+indice_similaridade = IndiceSimilaridade(
+    "jogadoras",
+    campos_numericos=CAMPOS_SIMILARIDADE,
+    campos_categoricos=CAMPOS_SIMILARIDADE_CATEGORICOS,
+    campo_id="id"
+)
+
+
+def jogadora_nao_encontrada(jogadora_id: str) -> HTTPException:
+    """Resposta 404 para jogadora inexistente (ou removida durante a requisição)"""
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Jogadora com ID {jogadora_id} não encontrada"
+    )
+
+
+def montar_jogadora(dados: JogadoraCreate) -> Dict:
+    """Registro de uma nova jogadora, sem ID (estatísticas zeradas e status Ativo)"""
+    return {
+        **dados.dict(),
+        "gols_carreira": 0,
+        "assistencias": 0,
+        "partidas_jogadas": 0,
+        "status": "Ativo"
+    }
+
 
 @router.get("/", response_model=List[Dict])
-def listar_jogadoras():
+async def listar_jogadoras(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Tamanho da página"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em X-Proximo-Cursor"),
+    posicao: Optional[str] = None,
+    clube_atual: Optional[str] = None,
+    nacionalidade: Optional[str] = None,
+    status_jogadora: Optional[str] = Query(None, alias="status"),
+    pe_preferido: Optional[str] = None,
+    idade_min: Optional[int] = Query(None, ge=0),
+    idade_max: Optional[int] = Query(None, ge=0),
+    ordenar_por: Optional[str] = Query(None, description=f"Um de: {', '.join(CAMPOS_ORDENACAO)}"),
+    ordem: Optional[str] = Query(None, pattern="^(asc|desc)$",
+                                 description="asc ou desc (padrão: asc pelo id; desc com ordenar_por)"),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: nome,posicao)")
+):
     """
-    Lista todas as jogadoras (CRUD - READ)
+    Lista jogadoras (CRUD - READ)
     Try-except obrigatório para tratamento de erros
+    
+    Sem parâmetros, retorna a coleção inteira. Com filtros, ordenação ou
+    limit, retorna uma página servida pelos índices secundários; o cursor
+    da próxima página vem no header X-Proximo-Cursor e o total filtrado
+    em X-Total-Count. Sem ordenar_por, as páginas seguem o id em ordem
+    crescente, como a listagem completa; com ordenar_por, o padrão é
+    decrescente. Com fields, cada jogadora traz só os campos pedidos
+    (e o id).
+    
+    A resposta traz ETag/Last-Modified da versão da coleção; com
+    If-None-Match (ou If-Modified-Since) atual, retorna 304 sem carregar
+    nem serializar as jogadoras. As demais respostas saem do cache de
+    corpos já serializados (e comprimidos conforme o Accept-Encoding),
+    montados uma vez por versão da coleção.
     """
     try:
-        # Carregar do JSON (REQUISITO OBRIGATÓRIO)
-        jogadoras = carregar_backup_json("jogadoras")
+        try:
+            projetar = projecao_campos(fields)
+        except CamposInvalidos as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         
-        registrar_log(f"✓ Listagem de jogadoras: {len(jogadoras)} registros")
+        filtros = {
+            "posicao": posicao,
+            "clube_atual": clube_atual,
+            "nacionalidade": nacionalidade,
+            "status": status_jogadora,
+            "pe_preferido": pe_preferido
+        }
+        paginado = (
+            limit is not None or cursor is not None or ordenar_por is not None
+            or idade_min is not None or idade_max is not None
+            or any(valor is not None for valor in filtros.values())
+        )
         
-        return jogadoras
+        if ordenar_por is not None and ordenar_por not in CAMPOS_ORDENACAO:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"ordenar_por inválido. Valores aceitos: {', '.join(CAMPOS_ORDENACAO)}"
+            )
+        
+        # Versão lida antes dos dados: os dados servidos nunca são mais
+        # antigos que o ETag enviado
+        versao, modificado = await versao_colecao_async("jogadoras")
+        nao_modificado = resposta_condicional(request, response, versao, modificado)
+        if nao_modificado is not None:
+            return nao_modificado
+        
+        def montar_listagem():
+            # Carregar do JSON (REQUISITO OBRIGATÓRIO)
+            jogadoras = carregar_backup_json("jogadoras")
+            registrar_log(f"✓ Listagem de jogadoras: {len(jogadoras)} registros")
+            if projetar is not None:
+                return [projetar(jogadora) for jogadora in jogadoras], {}
+            return jogadoras, {}
+        
+        def montar_pagina():
+            try:
+                ids, proximo_cursor, total = indice_jogadoras.consultar(
+                    filtros=filtros,
+                    intervalos={"idade": (idade_min, idade_max)},
+                    ordenar_por=ordenar_por,
+                    decrescente=(ordem == "desc") if ordem is not None else ordenar_por is not None,
+                    limite=limit or 50,
+                    cursor=cursor
+                )
+            except CursorInvalido:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor inválido"
+                )
+            
+            jogadoras = []
+            for jogadora_id in ids:
+                jogadora = buscar_registro_json("jogadoras", jogadora_id, campo_id="id")
+                if jogadora is not None:
+                    jogadoras.append(projetar(jogadora) if projetar is not None else jogadora)
+            
+            cabecalhos = {"X-Total-Count": str(total)}
+            if proximo_cursor is not None:
+                cabecalhos["X-Proximo-Cursor"] = proximo_cursor
+            
+            registrar_log(f"✓ Listagem paginada de jogadoras: {len(jogadoras)} de {total} registros")
+            return jogadoras, cabecalhos
+        
+        return await executar_leitura(
+            cache_listagem.responder, request, versao,
+            montar_pagina if paginado else montar_listagem,
+            cabecalhos=dict(response.headers)
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         registrar_log(f"✗ ERRO ao listar jogadoras: {str(e)}")
         raise HTTPException(
@@ -46,20 +231,159 @@ def listar_jogadoras():
         )
 
 
+@router.get("/search", response_model=List[Dict])
+async def buscar_jogadoras_texto(
+    q: str = Query(..., min_length=1, max_length=200, description="Texto a buscar em nome, bio e conquistas"),
+    limit: int = Query(20, ge=1, le=100, description="Quantidade máxima de resultados")
+):
+    """
+    Busca textual de jogadoras (CRUD - READ)
+    Try-except obrigatório para tratamento de erros
+    
+    Procura em nome, bio e conquistas, sem diferenciar acentos e
+    maiúsculas; o último termo também casa por prefixo. Os resultados vêm
+    em ordem de relevância, com o campo "relevancia" em cada jogadora.
+    """
+    try:
+        def buscar():
+            jogadoras = []
+            for jogadora_id, relevancia in indice_busca.buscar(q, limite=limit):
+                jogadora = buscar_registro_json("jogadoras", jogadora_id, campo_id="id")
+                if jogadora is not None:
+                    jogadoras.append({**jogadora, "relevancia": relevancia})
+            return jogadoras
+        
+        jogadoras = await executar_leitura(buscar)
+        
+        registrar_log(f"✓ Busca de jogadoras '{q}': {len(jogadoras)} resultados")
+        
+        return jogadoras
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao buscar jogadoras: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao buscar jogadoras: {str(e)}"
+        )
+
+
+@router.get("/search/stats", response_model=Dict)
+async def estatisticas_busca():
+    """
+    Tamanho e memória aproximada do índice de busca textual
+    """
+    try:
+        return await executar_leitura(indice_busca.estatisticas)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao obter estatísticas da busca: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao obter estatísticas da busca: {str(e)}"
+        )
+
+
+@router.get("/leaderboard/{metrica}", response_model=Dict)
+async def ranking_jogadoras_metrica(
+    metrica: str,
+    limit: int = Query(10, ge=1, le=100, description="Tamanho do ranking"),
+    agrupar_por: Optional[str] = Query(None, description=f"Um de: {', '.join(CAMPOS_GRUPO_RANKING)}"),
+    grupo: Optional[str] = Query(None, description="Valor do grupo (ex.: Atacante)")
+):
+    """
+    Ranking (top-K) de jogadoras por métrica (CRUD - READ)
+    Try-except obrigatório para tratamento de erros
+    
+    Métricas: gols_carreira, assistencias, partidas_jogadas e
+    gols_por_partida. Com agrupar_por, retorna um ranking por valor do
+    campo (ou só o do grupo informado).
+    """
+    try:
+        if metrica not in METRICAS_RANKING:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Métrica inválida. Valores aceitos: {', '.join(METRICAS_RANKING)}"
+            )
+        if agrupar_por is not None and agrupar_por not in CAMPOS_GRUPO_RANKING:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"agrupar_por inválido. Valores aceitos: {', '.join(CAMPOS_GRUPO_RANKING)}"
+            )
+        
+        def montar(entradas):
+            ranking = []
+            for jogadora_id, valor in entradas:
+                jogadora = buscar_registro_json("jogadoras", jogadora_id, campo_id="id")
+                if jogadora is not None:
+                    ranking.append({"posicao_ranking": len(ranking) + 1, "valor": valor, "jogadora": jogadora})
+            return ranking
+        
+        def montar_ranking():
+            resultado = ranking_jogadoras.top(metrica, limite=limit, agrupar_por=agrupar_por, grupo=grupo)
+            if isinstance(resultado, dict):
+                return {
+                    "metrica": metrica,
+                    "agrupar_por": agrupar_por,
+                    "grupos": {valor_grupo: montar(entradas) for valor_grupo, entradas in resultado.items()}
+                }
+            return {
+                "metrica": metrica,
+                "agrupar_por": agrupar_por,
+                "grupo": grupo,
+                "ranking": montar(resultado)
+            }
+        
+        ranking = await executar_leitura(montar_ranking)
+        
+        registrar_log(f"✓ Ranking de jogadoras por {metrica}" + (f" agrupado por {agrupar_por}" if agrupar_por else ""))
+        
+        return ranking
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao montar ranking de jogadoras: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao montar ranking de jogadoras: {str(e)}"
+        )
+
+
 @router.get("/{jogadora_id}", response_model=Dict)
-def buscar_jogadora(jogadora_id: str):
+async def buscar_jogadora(
+    request: Request,
+    response: Response,
+    jogadora_id: str,
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: nome,posicao)")
+):
     """
     Busca uma jogadora por ID (CRUD - READ)
     Try-except obrigatório para tratamento de erros
+    
+    ETag/Last-Modified seguem a versão da jogadora (304 se não mudou)
     """
     try:
-        jogadoras = carregar_backup_json("jogadoras")
+        try:
+            projetar = projecao_campos(fields)
+        except CamposInvalidos as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        nao_modificado = resposta_condicional(request, response, *await versao_colecao_async("jogadoras", jogadora_id))
+        if nao_modificado is not None:
+            return nao_modificado
         
         # Buscar jogadora
-        for jogadora in jogadoras:
-            if str(jogadora.get('id')) == str(jogadora_id):
-                registrar_log(f"✓ Jogadora encontrada: {jogadora.get('nome')}")
-                return jogadora
+        jogadora = await buscar_registro_json_async("jogadoras", jogadora_id, campo_id="id")
+        if jogadora is not None:
+            registrar_log(f"✓ Jogadora encontrada: {jogadora.get('nome')}")
+            return projetar(jogadora) if projetar is not None else jogadora
         
         # Não encontrada
         registrar_log(f"⚠ Jogadora não encontrada: ID {jogadora_id}")
@@ -78,40 +402,77 @@ def buscar_jogadora(jogadora_id: str):
         )
 
 
+@router.get("/{jogadora_id}/similar", response_model=List[Dict])
+async def buscar_jogadoras_similares(
+    jogadora_id: str,
+    limit: int = Query(10, ge=1, le=100, description="Quantidade de jogadoras"),
+    posicao: Optional[str] = Query(None, description="Considerar só jogadoras desta posição")
+):
+    """
+    Jogadoras mais parecidas com uma jogadora (CRUD - READ)
+    Try-except obrigatório para tratamento de erros
+    
+    Compara idade, altura, peso, gols, assistências e partidas (colunas
+    normalizadas), além de posição e pé preferido. Cada jogadora vem com
+    o campo "distancia" (menor = mais parecida).
+    """
+    try:
+        def buscar_similares():
+            similares = indice_similaridade.similares(jogadora_id, limite=limit, filtros={"posicao": posicao})
+            if similares is None:
+                return None
+            jogadoras = []
+            for similar_id, distancia in similares:
+                jogadora = buscar_registro_json("jogadoras", similar_id, campo_id="id")
+                if jogadora is not None:
+                    jogadoras.append({**jogadora, "distancia": distancia})
+            return jogadoras
+        
+        jogadoras = await executar_leitura(buscar_similares)
+        if jogadoras is None:
+            registrar_log(f"⚠ Jogadora não encontrada: ID {jogadora_id}")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Jogadora com ID {jogadora_id} não encontrada"
+            )
+        
+        registrar_log(f"✓ Jogadoras similares a ID {jogadora_id}: {len(jogadoras)} resultados")
+        
+        return jogadoras
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao buscar jogadoras similares: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao buscar jogadoras similares: {str(e)}"
+        )
+
+
 @router.post("/", response_model=Dict, status_code=status.HTTP_201_CREATED)
-def criar_jogadora(dados: JogadoraCreate):
+async def criar_jogadora(dados: JogadoraCreate):
     """
     Cria nova jogadora (CRUD - CREATE)
     Try-except obrigatório para tratamento de erros
     Salva em arquivo JSON (REQUISITO OBRIGATÓRIO)
     """
     try:
-        jogadoras = carregar_backup_json("jogadoras")
-        
-        # Criar novo registro
-        novo_id = str(len(jogadoras) + 1)
-        nova_jogadora = {
-            "id": novo_id,
-            **dados.dict(),
-            "gols_carreira": 0,
-            "assistencias": 0,
-            "partidas_jogadas": 0,
-            "status": "Ativo"
-        }
-        
-        jogadoras.append(nova_jogadora)
-        
-        # Salvar no JSON (REQUISITO OBRIGATÓRIO)
-        salvar_backup_json("jogadoras", jogadoras)
+        # Criar e salvar no JSON (REQUISITO OBRIGATÓRIO); o ID é gerado na inserção
+        nova_jogadora = await inserir_registro_json_async("jogadoras", montar_jogadora(dados), campo_id="id")
+        if nova_jogadora is None:
+            raise IOError("Falha ao gravar jogadora")
         
         registrar_log(f"✓ Nova jogadora criada: {dados.nome}")
         
         return {
             "mensagem": "Jogadora criada com sucesso",
-            "id": novo_id,
+            "id": nova_jogadora["id"],
             "jogadora": nova_jogadora
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         registrar_log(f"✗ ERRO ao criar jogadora: {str(e)}")
         raise HTTPException(
@@ -120,32 +481,78 @@ def criar_jogadora(dados: JogadoraCreate):
         )
 
 
-@router.put("/{jogadora_id}", response_model=Dict)
-def atualizar_jogadora(jogadora_id: str, dados: Dict):
+@router.post("/import", response_model=Dict)
+async def importar_jogadoras(
+    request: Request,
+    atomico: bool = Query(False, description="Se true, qualquer linha inválida cancela a importação inteira")
+):
     """
-    Atualiza dados de uma jogadora (CRUD - UPDATE)
+    Importa jogadoras em lote (CRUD - CREATE)
     Try-except obrigatório para tratamento de erros
-    Atualiza arquivo JSON (REQUISITO OBRIGATÓRIO)
+    Salva em arquivo JSON com uma única gravação (REQUISITO OBRIGATÓRIO)
+    
+    O corpo é lido em streaming, como NDJSON (uma jogadora por linha) ou
+    array JSON, e cada registro é validado com JogadoraCreate. Os registros
+    válidos são gravados de uma vez; os inválidos voltam em "erros", com o
+    número da linha.
     """
     try:
-        jogadoras = carregar_backup_json("jogadoras")
-        
-        # Encontrar e atualizar jogadora
-        encontrada = False
-        for i, jogadora in enumerate(jogadoras):
-            if str(jogadora.get('id')) == str(jogadora_id):
-                jogadoras[i].update(dados)
-                encontrada = True
-                break
+        try:
+            jogadoras, erros, total_erros = await validar_registros(request.stream(), JogadoraCreate, montar_jogadora)
+        except ErroImportacao as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         
-        if not encontrada:
+        if total_erros and atomico:
+            registrar_log(f"⚠ Importação de jogadoras cancelada: {total_erros} linhas inválidas")
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Jogadora com ID {jogadora_id} não encontrada"
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={"mensagem": "Importação cancelada: há linhas inválidas", "com_erro": total_erros, "erros": erros}
             )
         
-        # Salvar no JSON (REQUISITO OBRIGATÓRIO)
-        salvar_backup_json("jogadoras", jogadoras)
+        # Gravação única do lote, fora do loop de eventos (REQUISITO OBRIGATÓRIO)
+        if not await inserir_registros_json_async("jogadoras", jogadoras, "id"):
+            raise IOError("Falha ao gravar lote de jogadoras")
+        
+        registrar_log(f"✓ Importação de jogadoras: {len(jogadoras)} importadas, {total_erros} com erro")
+        
+        return {
+            "mensagem": "Importação concluída",
+            "importados": len(jogadoras),
+            "com_erro": total_erros,
+            "erros": erros
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao importar jogadoras: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao importar jogadoras: {str(e)}"
+        )
+
+
+@router.put("/{jogadora_id}", response_model=Dict)
+async def atualizar_jogadora(jogadora_id: str, dados: Dict):
+    """
+    Atualiza dados de uma jogadora (CRUD - UPDATE)
+    Try-except obrigatório para tratamento de erros
+    Atualiza arquivo JSON (REQUISITO OBRIGATÓRIO)
+    """
+    try:
+        # Verificar se a jogadora existe
+        if await buscar_registro_json_async("jogadoras", jogadora_id, campo_id="id") is None:
+            raise jogadora_nao_encontrada(jogadora_id)
+        
+        # Atualizar no JSON (REQUISITO OBRIGATÓRIO)
+        if not await atualizar_registro_json_async("jogadoras", jogadora_id, dados, campo_id="id"):
+            # Removida por outra requisição entre a verificação e a gravação
+            if await buscar_registro_json_async("jogadoras", jogadora_id, campo_id="id") is None:
+                raise jogadora_nao_encontrada(jogadora_id)
+            raise IOError("Falha ao gravar jogadora")
         
         registrar_log(f"✓ Jogadora atualizada: ID {jogadora_id}")
         
@@ -165,26 +572,23 @@ def atualizar_jogadora(jogadora_id: str, dados: Dict):
 
 
 @router.delete("/{jogadora_id}", response_model=Dict)
-def deletar_jogadora(jogadora_id: str):
+async def deletar_jogadora(jogadora_id: str):
     """
     Deleta uma jogadora (CRUD - DELETE)
     Try-except obrigatório para tratamento de erros
     Remove do arquivo JSON (REQUISITO OBRIGATÓRIO)
     """
     try:
-        jogadoras = carregar_backup_json("jogadoras")
-        
-        # Filtrar removendo a jogadora
-        jogadoras_filtradas = [j for j in jogadoras if str(j.get('id')) != str(jogadora_id)]
-        
-        if len(jogadoras_filtradas) == len(jogadoras):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Jogadora com ID {jogadora_id} não encontrada"
-            )
+        # Verificar se a jogadora existe
+        if await buscar_registro_json_async("jogadoras", jogadora_id, campo_id="id") is None:
+            raise jogadora_nao_encontrada(jogadora_id)
         
-        # Salvar no JSON (REQUISITO OBRIGATÓRIO)
-        salvar_backup_json("jogadoras", jogadoras_filtradas)
+        # Remover do JSON (REQUISITO OBRIGATÓRIO)
+        if not await deletar_registro_json_async("jogadoras", jogadora_id, campo_id="id"):
+            # Removida por outra requisição entre a verificação e a gravação
+            if await buscar_registro_json_async("jogadoras", jogadora_id, campo_id="id") is None:
+                raise jogadora_nao_encontrada(jogadora_id)
+            raise IOError("Falha ao remover jogadora")
         
         registrar_log(f"✓ Jogadora deletada: ID {jogadora_id}")
         
@@ -3,19 +3,45 @@ Módulo de Segurança - JWT e Hash de Senhas
 Implementa autenticação segura com JWT e bcrypt
 """
 
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import multiprocessing
 import os
+import threading
 
 # Configurações de segurança
 SECRET_KEY = os.getenv("SECRET_KEY", "sua_chave_super_secreta_para_jwt_2025_passa_a_bola")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 dias
 
-# Context para hash de senhas com bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Custo do bcrypt (2^custo iterações) para novos hashes; hashes com outro
+# custo são regravados no próximo login
+BCRYPT_CUSTO = int(os.getenv("BCRYPT_CUSTO", "12"))
+
+# Processos dedicados ao bcrypt (0 = threads, para ambientes sem
+# multiprocessing) e limite de operações em andamento + na fila
+PROCESSOS_SENHAS = int(os.getenv("SENHAS_PROCESSOS", str(min(os.cpu_count() or 1, 4))))
+FILA_MAXIMA_SENHAS = int(os.getenv("SENHAS_FILA_MAXIMA", str(8 * max(PROCESSOS_SENHAS, 1))))
+
+# Context para hash de senhas com bcrypt, criado no primeiro uso: passlib e
+# jose são importados só quando uma senha ou um token é processado (início
+# rápido em serverless; os processos do pool também não pagam o import)
+_pwd_context = None
+_pwd_context_lock = threading.Lock()
+
+
+def _contexto_senhas():
+    """CryptContext do bcrypt (importa o passlib na primeira chamada)"""
+    global _pwd_context
+    if _pwd_context is None:
+        with _pwd_context_lock:
+            if _pwd_context is None:
+                from passlib.context import CryptContext
+                _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_CUSTO)
+    return _pwd_context
 
 
 def get_password_hash(password: str) -> str:
@@ -33,7 +59,7 @@ def get_password_hash(password: str) -> str:
         >>> print(hashed)
         $2b$12$...
     """
-    return pwd_context.hash(password)
+    return _contexto_senhas().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -52,7 +78,150 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         >>> print(is_valid)
         True
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return _contexto_senhas().verify(plain_password, hashed_password)
+
+
+def _verificar_e_atualizar(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verificação executada no pool: (senha correta, novo hash se o custo mudou)"""
+    return _contexto_senhas().verify_and_update(plain_password, hashed_password)
+
+
+def _aquecer() -> None:
+    """Tarefa vazia para iniciar os processos do pool"""
+
+
+class PoolSenhasSaturado(Exception):
+    """Fila de operações de senha cheia (a requisição deve ser recusada com 503)"""
+
+
+class PoolSenhas:
+    """
+    Pool limitado de processos para o bcrypt
+
+    O bcrypt é lento de propósito: feito nas threads das requisições, uma
+    rajada de logins ocupa todas elas e atrasa as demais rotas. Aqui cada
+    operação vai para um processo dedicado e a rota assíncrona só aguarda
+    o resultado, sem ocupar thread. Operações em andamento e na fila são
+    limitadas: acima do limite, PoolSenhasSaturado (503) em vez de uma
+    fila que só cresce.
+
+    Example:
+        >>> pool = PoolSenhas(processos=2, fila_maxima=16)
+        >>> await pool.executar(get_password_hash, "minhasenha123")
+        '$2b$12$...'
+    """
+
+    def __init__(self, processos: int = PROCESSOS_SENHAS, fila_maxima: int = FILA_MAXIMA_SENHAS):
+        self.processos = processos
+        self.fila_maxima = fila_maxima
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pendentes = 0
+        self._estatisticas = {"executadas": 0, "recusadas": 0}
+
+    def _obter_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Executor de processos, criado no primeiro uso (None = modo threads)"""
+        with self._lock:
+            if self._executor is None and self.processos > 0:
+                try:
+                    # spawn: um fork de um processo com threads pode herdar locks travados
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.processos, mp_context=multiprocessing.get_context("spawn")
+                    )
+                except (OSError, NotImplementedError, ImportError):
+                    # Sem suporte a multiprocessing (ex.: serverless): threads
+                    self.processos = 0
+            return self._executor
+
+    def iniciar(self) -> None:
+        """Inicia os processos em segundo plano (startup da API), sem esperar"""
+        executor = self._obter_executor()
+        if executor is not None:
+            for _ in range(self.processos):
+                executor.submit(_aquecer)
+
+    async def executar(self, funcao: Callable[..., Any], *args: Any) -> Any:
+        """
+        Executa uma função de senha no pool e aguarda o resultado
+
+        Raises:
+            PoolSenhasSaturado: se a fila estiver cheia
+        """
+        with self._lock:
+            if self._pendentes >= self.fila_maxima:
+                self._estatisticas["recusadas"] += 1
+                raise PoolSenhasSaturado("Muitas operações de senha em andamento. Tente novamente em instantes.")
+            self._pendentes += 1
+        try:
+            executor = self._obter_executor()
+            if executor is None:
+                return await asyncio.to_thread(funcao, *args)
+            try:
+                return await asyncio.wrap_future(executor.submit(funcao, *args))
+            except BrokenProcessPool:
+                # Um processo morreu: o próximo uso cria um pool novo
+                with self._lock:
+                    if self._executor is executor:
+                        self._executor = None
+                raise
+        finally:
+            with self._lock:
+                self._pendentes -= 1
+                self._estatisticas["executadas"] += 1
+
+    def encerrar(self) -> None:
+        """Encerra os processos (shutdown da API)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Contadores do pool
+
+        Returns:
+            Dict: operações executadas, recusadas por fila cheia, pendentes
+            agora, processos e limite da fila
+        """
+        with self._lock:
+            estatisticas = dict(self._estatisticas)
+            estatisticas["pendentes"] = self._pendentes
+        estatisticas["processos"] = self.processos
+        estatisticas["fila_maxima"] = self.fila_maxima
+        estatisticas["bcrypt_custo"] = BCRYPT_CUSTO
+        return estatisticas
+
+
+pool_senhas = PoolSenhas()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Gera hash da senha no pool de senhas (para rotas assíncronas)
+
+    Raises:
+        PoolSenhasSaturado: se a fila do pool estiver cheia
+    """
+    return await pool_senhas.executar(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica a senha no pool de senhas (para rotas assíncronas)
+
+    Returns:
+        Tuple: (senha correta, novo hash se o custo configurado mudou)
+
+    Raises:
+        PoolSenhasSaturado: se a fila do pool estiver cheia
+
+    Example:
+        >>> valida, novo_hash = await verify_password_async("minhasenha123", hashed)
+        >>> print(valida)
+        True
+    """
+    return await pool_senhas.executar(_verificar_e_atualizar, plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -71,6 +240,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         >>> print(token)
         eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...
     """
+    from jose import jwt
+    
     to_encode = data.copy()
     
     if expires_delta:
@@ -99,6 +270,8 @@ def decode_access_token(token: str) -> Optional[dict]:
         >>> print(payload['sub'])
         user@email.com
     """
+    from jose import JWTError, jwt
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
@@ -0,0 +1,121 @@
+"""
+Benchmark: cache de respostas serializadas x serializar e comprimir a cada requisição
+Mede o tempo por requisição da listagem de jogadoras servida pelo
+CacheRespostas (hit), o miss logo após uma mutação e a serialização +
+compressão refeitas a cada requisição, para cada codificação. Roda no
+próprio processo, em um diretório de dados temporário
+
+Uso:
+    python benchmarks/cache_respostas.py --jogadoras 2000 --requisicoes 500
+"""
+
+import argparse
+import gzip
+import json
+import random
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.comum import usar_diretorio_temporario
+
+
+def gerar_jogadoras(quantidade: int):
+    """Coleção sintética com o formato das jogadoras da API"""
+    posicoes = ["Atacante", "Meio-campista", "Zagueira", "Goleira", "Lateral"]
+    return [
+        {
+            "id": str(i),
+            "nome": f"Jogadora {i}",
+            "idade": random.randint(16, 40),
+            "posicao": random.choice(posicoes),
+            "clube_atual": f"Clube {i % 300}",
+            "gols_carreira": random.randint(0, 300),
+            "bio": "Atacante rápida, com passagem pela seleção de base e pelo futebol universitário."
+        }
+        for i in range(1, quantidade + 1)
+    ]
+
+
+def montar_requisicao(accept_encoding: str):
+    """Requisição GET /api/players/ com o Accept-Encoding informado"""
+    from starlette.requests import Request
+
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/players/",
+        "query_string": b"",
+        "headers": [(b"accept-encoding", accept_encoding.encode("latin-1"))] if accept_encoding else []
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jogadoras", type=int, default=2000, help="Tamanho da coleção listada")
+    parser.add_argument("--requisicoes", type=int, default=500, help="Requisições medidas em cada cenário")
+    args = parser.parse_args()
+
+    diretorio = usar_diretorio_temporario()
+    from utils import persistence
+    from utils.cache_respostas import NIVEL_GZIP, QUALIDADE_BROTLI, CacheRespostas, brotli
+
+    try:
+        random.seed(1)
+        persistence.salvar_backup_json("jogadoras", gerar_jogadoras(args.jogadoras))
+        cache = CacheRespostas("jogadoras")
+
+        def montar():
+            return persistence.carregar_backup_json("jogadoras"), {}
+
+        def sem_cache(codificacao: str) -> bytes:
+            corpo = json.dumps(
+                persistence.carregar_backup_json("jogadoras"),
+                ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+            ).encode("utf-8")
+            if codificacao == "gzip":
+                return gzip.compress(corpo, compresslevel=NIVEL_GZIP)
+            if codificacao == "br":
+                return brotli.compress(corpo, quality=QUALIDADE_BROTLI)
+            return corpo
+
+        codificacoes = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+        print(f"GET /api/players/ com {args.jogadoras} jogadoras, {args.requisicoes} requisições por cenário")
+        for codificacao in codificacoes:
+            requisicao = montar_requisicao("" if codificacao == "identity" else codificacao)
+
+            inicio = time.perf_counter()
+            for _ in range(args.requisicoes):
+                sem_cache(codificacao)
+            sem = (time.perf_counter() - inicio) / args.requisicoes
+
+            # Primeira requisição após uma mutação: o observador limpa o cache
+            assert persistence.atualizar_registro_json("jogadoras", "1", {"gols_carreira": random.randint(0, 300)}, "id")
+            inicio = time.perf_counter()
+            cache.responder(requisicao, persistence.versao_colecao("jogadoras"), montar)
+            miss = time.perf_counter() - inicio
+
+            versao = persistence.versao_colecao("jogadoras")
+            inicio = time.perf_counter()
+            for _ in range(args.requisicoes):
+                resposta = cache.responder(requisicao, versao, montar)
+            hit = (time.perf_counter() - inicio) / args.requisicoes
+
+            print(
+                f"  {codificacao:8s} {len(resposta.body) / 1024:8.1f} KiB | "
+                f"sem cache {sem * 1000:8.3f} ms | miss {miss * 1000:8.3f} ms | hit {hit * 1000:8.3f} ms "
+                f"({sem / hit:.0f}x)"
+            )
+
+        print(f"  estatísticas: {cache.estatisticas()}")
+    finally:
+        persistence.encerrar_persistencia()
+        persistence.encerrar_log()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Utilitários dos Benchmarks
+Diretório de dados temporário para os benchmarks que rodam no próprio
+processo, cliente HTTP para os que rodam contra a API e resumo das
+latências medidas
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+
+def usar_diretorio_temporario() -> Path:
+    """
+    Redireciona a persistência (coleções, journals e logs.txt) para um
+    diretório temporário, para que o benchmark não altere database/.
+    Deve ser chamada antes de qualquer leitura ou gravação
+
+    Returns:
+        Path: diretório criado (o chamador o remove no fim)
+    """
+    from utils import persistence
+
+    diretorio = Path(tempfile.mkdtemp(prefix="passabola-benchmark-"))
+    persistence.DATABASE_DIR = diretorio
+    persistence.LOG_FILE = diretorio / "logs.txt"
+    return diretorio
+
+
+class ClienteHTTP:
+    """
+    Cliente HTTP/1.1 mínimo sobre uma conexão keep-alive (asyncio), para
+    gerar carga sem dependências além da biblioteca padrão
+
+    Example:
+        >>> cliente = ClienteHTTP("http://127.0.0.1:8000")
+        >>> status, corpo = await cliente.requisitar("GET", "/health")
+        >>> await cliente.fechar()
+    """
+
+    def __init__(self, url: str):
+        partes = urlsplit(url)
+        self.host = partes.hostname or "127.0.0.1"
+        self.porta = partes.port or 80
+        self._leitor: Optional[asyncio.StreamReader] = None
+        self._escritor: Optional[asyncio.StreamWriter] = None
+
+    async def requisitar(self, metodo: str, caminho: str, corpo: Any = None,
+                         cabecalhos: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        """
+        Envia uma requisição e lê a resposta inteira
+
+        Args:
+            metodo (str): GET, POST, PUT...
+            caminho (str): Caminho com query string
+            corpo (Any): bytes enviados como estão; outro valor vai como JSON
+            cabecalhos (Dict, optional): Headers extras (ex.: Content-Type)
+
+        Returns:
+            Tuple[int, bytes]: status e corpo da resposta
+        """
+        headers = {"Host": f"{self.host}:{self.porta}"}
+        if corpo is not None and not isinstance(corpo, bytes):
+            corpo = json.dumps(corpo).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        corpo = corpo or b""
+        headers["Content-Length"] = str(len(corpo))
+        headers.update(cabecalhos or {})
+
+        cabecalho = f"{metodo} {caminho} HTTP/1.1\r\n" + "".join(f"{nome}: {valor}\r\n" for nome, valor in headers.items())
+        mensagem = cabecalho.encode("latin-1") + b"\r\n" + corpo
+
+        reaproveitada = self._escritor is not None
+        try:
+            resposta = await self._enviar(mensagem)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            # Conexão ociosa fechada pelo servidor (keep-alive expirado): reconecta uma vez
+            if not reaproveitada or (isinstance(e, asyncio.IncompleteReadError) and e.partial):
+                raise
+            await self.fechar()
+            resposta = await self._enviar(mensagem)
+
+        linhas = resposta.decode("latin-1").split("\r\n")
+        status = int(linhas[0].split(" ", 2)[1])
+        tamanho = 0
+        for linha in linhas[1:]:
+            nome, _, valor = linha.partition(":")
+            if nome.strip().lower() == "content-length":
+                tamanho = int(valor)
+        return status, await self._leitor.readexactly(tamanho)
+
+    async def _enviar(self, mensagem: bytes) -> bytes:
+        """Envia a requisição (abrindo a conexão se preciso) e lê os headers da resposta"""
+        if self._escritor is None:
+            self._leitor, self._escritor = await asyncio.open_connection(self.host, self.porta)
+        self._escritor.write(mensagem)
+        await self._escritor.drain()
+        return await self._leitor.readuntil(b"\r\n\r\n")
+
+    async def json(self, metodo: str, caminho: str, corpo: Any = None) -> Tuple[int, Any]:
+        """requisitar com a resposta decodificada como JSON"""
+        status, resposta = await self.requisitar(metodo, caminho, corpo)
+        return status, json.loads(resposta) if resposta else None
+
+    async def fechar(self) -> None:
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+
+async def executar_carga(url: str, requisicoes: Sequence[Tuple[str, str, Any]],
+                         conexoes: int = 100) -> Tuple[List[Tuple[int, float]], float]:
+    """
+    Dispara as requisições (método, caminho, corpo) por várias conexões
+    simultâneas, cada uma com a próxima requisição da fila
+
+    Returns:
+        Tuple: (status, latência em segundos) de cada requisição, na ordem
+        recebida, e a duração total
+    """
+    fila: "asyncio.Queue[Tuple[int, Tuple[str, str, Any]]]" = asyncio.Queue()
+    for posicao, requisicao in enumerate(requisicoes):
+        fila.put_nowait((posicao, requisicao))
+    resultados: List[Tuple[int, float]] = [(0, 0.0)] * len(requisicoes)
+
+    async def conexao() -> None:
+        cliente = ClienteHTTP(url)
+        try:
+            while not fila.empty():
+                posicao, (metodo, caminho, corpo) = fila.get_nowait()
+                inicio = time.perf_counter()
+                status, _ = await cliente.requisitar(metodo, caminho, corpo)
+                resultados[posicao] = (status, time.perf_counter() - inicio)
+        finally:
+            await cliente.fechar()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(conexao() for _ in range(min(conexoes, len(requisicoes)))))
+    return resultados, time.perf_counter() - inicio
+
+
+async def chamar_asgi(app: Any, metodo: str, caminho: str, corpo: bytes = b"",
+                      cabecalhos: Optional[Dict[str, str]] = None,
+                      ip: str = "127.0.0.1") -> Tuple[int, bytes]:
+    """
+    Executa uma requisição direto na aplicação ASGI, sem servidor nem
+    rede, com o IP do cliente escolhido (para os limites por IP)
+
+    Args:
+        app: Aplicação ASGI (ex.: backend.main.app)
+        metodo (str): GET, POST...
+        caminho (str): Caminho com query string
+        corpo (bytes): Corpo da requisição
+        cabecalhos (Dict, optional): Headers da requisição
+        ip (str): Endereço do cliente em scope["client"]
+
+    Returns:
+        Tuple[int, bytes]: status e corpo da resposta
+    """
+    rota, _, query = caminho.partition("?")
+    headers = [(b"host", b"benchmark"), (b"content-length", str(len(corpo)).encode("ascii"))]
+    headers += [(nome.lower().encode("latin-1"), valor.encode("latin-1")) for nome, valor in (cabecalhos or {}).items()]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": metodo, "scheme": "http", "path": rota, "raw_path": rota.encode("utf-8"),
+        "query_string": query.encode("latin-1"), "root_path": "", "headers": headers,
+        "client": (ip, 50000), "server": ("benchmark", 80)
+    }
+    mensagens = [{"type": "http.request", "body": corpo, "more_body": False}]
+    resposta = {"status": 0, "corpo": b""}
+
+    async def receive() -> Dict[str, Any]:
+        return mensagens.pop(0) if mensagens else {"type": "http.disconnect"}
+
+    async def send(mensagem: Dict[str, Any]) -> None:
+        if mensagem["type"] == "http.response.start":
+            resposta["status"] = mensagem["status"]
+        elif mensagem["type"] == "http.response.body":
+            resposta["corpo"] += mensagem.get("body", b"")
+
+    await app(scope, receive, send)
+    return resposta["status"], resposta["corpo"]
+
+
+def contar_status(resultados: List[Tuple[int, float]]) -> Dict[int, int]:
+    """Quantidade de respostas por status HTTP"""
+    contagem: Dict[int, int] = {}
+    for status, _ in resultados:
+        contagem[status] = contagem.get(status, 0) + 1
+    return dict(sorted(contagem.items()))
+
+
+def percentis(latencias: List[float]) -> Dict[str, float]:
+    """
+    Resumo de latências em segundos
+
+    Returns:
+        Dict: quantidade, p50, p99 e máximo (em ms)
+    """
+    if not latencias:
+        return {"n": 0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+    ordenadas = sorted(latencias)
+    n = len(ordenadas)
+    return {
+        "n": n,
+        "p50": ordenadas[n // 2] * 1000,
+        "p99": ordenadas[min(int(n * 0.99), n - 1)] * 1000,
+        "max": ordenadas[-1] * 1000
+    }
+
+
+def formatar_percentis(latencias: List[float]) -> str:
+    """Texto "n=... p50 ... p99 ... max ..." (ms) para os relatórios"""
+    resumo = percentis(latencias)
+    return f"n={resumo['n']} p50 {resumo['p50']:.2f} ms p99 {resumo['p99']:.2f} ms max {resumo['max']:.2f} ms"
@@ -0,0 +1,105 @@
+"""
+Benchmark: índice de email único x varredura da coleção de usuários
+Mede a busca de uma conta pelo email (como no login e no cadastro) com o
+índice de chave única e com a varredura que ele substituiu, o tempo e a
+memória para montar o índice e o custo de inserções verificadas (inclusive
+a recusa de um email repetido com outra caixa). Roda no próprio processo,
+em um diretório de dados temporário, com o journal ligado
+
+Uso:
+    python benchmarks/email_unico.py --usuarios 200000 --consultas 20000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("PERSISTENCIA_JOURNAL", "1")
+
+from benchmarks.comum import usar_diretorio_temporario
+
+
+def gerar_usuarios(quantidade: int):
+    """Coleção sintética com o formato dos usuários da API"""
+    return [
+        {
+            "_id": str(i),
+            "nome": f"Usuária {i}",
+            "email": f"usuaria{i}@email.com",
+            "hashed_password": "$2b$12$" + "x" * 53,
+            "role": "torcedor",
+            "data_criacao": "2025-01-01T00:00:00"
+        }
+        for i in range(1, quantidade + 1)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=200000, help="Tamanho da coleção")
+    parser.add_argument("--consultas", type=int, default=20000, help="Buscas pelo índice")
+    parser.add_argument("--varreduras", type=int, default=20, help="Buscas por varredura")
+    parser.add_argument("--insercoes", type=int, default=1000, help="Inserções verificadas")
+    args = parser.parse_args()
+
+    diretorio = usar_diretorio_temporario()
+    from utils import persistence
+
+    try:
+        persistence.registrar_chave_unica("users", "email")
+        persistence.salvar_backup_json("users", gerar_usuarios(args.usuarios))
+        persistence.limpar_cache()
+
+        inicio = time.perf_counter()
+        persistence.carregar_backup_json("users")
+        print(f"{args.usuarios} usuários, carga da coleção {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+        random.seed(1)
+        alvos = [f"Usuaria{random.randint(1, args.usuarios)}@Email.com" for _ in range(args.consultas)]
+
+        inicio = time.perf_counter()
+        for alvo in alvos[:args.varreduras]:
+            assert persistence.buscar_registros_por_campo("users", "email", alvo.lower())
+        varredura = (time.perf_counter() - inicio) / args.varreduras
+        print(f"  varredura          {varredura * 1000:10.3f} ms/busca")
+
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        persistence.buscar_por_chave_unica("users", "email", alvos[0])
+        montagem = time.perf_counter() - inicio
+        memoria = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"  montagem do índice {montagem * 1000:10.0f} ms, {memoria / 2 ** 20:.1f} MiB")
+
+        inicio = time.perf_counter()
+        for alvo in alvos:
+            assert persistence.buscar_por_chave_unica("users", "email", alvo)
+        indice = (time.perf_counter() - inicio) / args.consultas
+        print(f"  índice             {indice * 1000:10.4f} ms/busca ({varredura / indice:.0f}x)")
+
+        inicio = time.perf_counter()
+        for i in range(args.insercoes):
+            assert persistence.inserir_registro_json("users", {"nome": "Nova", "email": f"nova{i}@email.com"})
+        insercao = (time.perf_counter() - inicio) / args.insercoes
+        print(f"  inserção verificada {insercao * 1000:9.3f} ms")
+
+        try:
+            persistence.inserir_registro_json("users", {"nome": "Repetida", "email": "NOVA0@email.com"})
+            print("  ✗ email repetido foi aceito")
+            sys.exit(1)
+        except persistence.ChaveDuplicada:
+            print("  ✓ email repetido (outra caixa) recusado com ChaveDuplicada")
+    finally:
+        persistence.encerrar_persistencia()
+        persistence.encerrar_log()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: início a frio da API (INICIO_SOB_DEMANDA=0 x 1)
+Mede o tempo de importação de backend.main e o tempo entre iniciar o
+uvicorn e receber a primeira resposta de algumas rotas, com o início
+completo (coleções, agendador e processos do bcrypt no startup) e com o
+início sob demanda usado em serverless, com a pasta database/ existente e
+sem ela (primeiro deploy). Roda sobre uma cópia temporária do backend,
+para não alterar database/
+
+Uso:
+    python benchmarks/inicio_frio.py --repeticoes 5
+"""
+
+import argparse
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+FRONTEND_DIR = BACKEND_DIR.parent / "passa-a-bola-frontend"
+
+ROTAS = ("/health", "/api/events/1", "/api/players/1")
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def tempo_importacao(diretorio: Path, ambiente: dict) -> float:
+    """Segundos para importar backend.main em um processo novo"""
+    saida = subprocess.run(
+        [sys.executable, "-c", "import time; t = time.perf_counter(); import backend.main; print(time.perf_counter() - t)"],
+        cwd=diretorio, env=ambiente, capture_output=True, text=True, check=True
+    )
+    return float(saida.stdout.strip().splitlines()[-1])
+
+
+def primeira_resposta(diretorio: Path, ambiente: dict, rota: str) -> float:
+    """Segundos entre iniciar o uvicorn e a primeira resposta da rota"""
+    porta = porta_livre()
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(porta), "--log-level", "warning"],
+        cwd=diretorio, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{porta}{rota}", timeout=5) as resposta:
+                    resposta.read()
+                return time.perf_counter() - inicio
+            except OSError:
+                if processo.poll() is not None:
+                    raise RuntimeError(f"uvicorn encerrou antes de responder {rota}")
+                time.sleep(0.005)
+    finally:
+        processo.terminate()
+        processo.wait()
+
+
+def resumo(tempos: list) -> str:
+    return f"mediana {statistics.median(tempos) * 1000:6.0f} ms (mín {min(tempos) * 1000:.0f})"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5, help="Medições por caso")
+    args = parser.parse_args()
+
+    raiz = Path(tempfile.mkdtemp(prefix="passabola-inicio-"))
+    try:
+        copia = raiz / BACKEND_DIR.name
+        shutil.copytree(BACKEND_DIR, copia, ignore=shutil.ignore_patterns("__pycache__", "*.pyc"))
+        # Dados de exemplo do frontend, usados para semear as coleções vazias
+        if FRONTEND_DIR.exists():
+            os.symlink(FRONTEND_DIR, raiz / FRONTEND_DIR.name)
+        database = copia / "database"
+        modelo = raiz / "database_modelo"
+        shutil.copytree(database, modelo)
+
+        for sob_demanda in ("0", "1"):
+            ambiente = dict(os.environ, INICIO_SOB_DEMANDA=sob_demanda)
+            nome = "sob demanda" if sob_demanda == "1" else "completo"
+            importacoes = [tempo_importacao(copia, ambiente) for _ in range(args.repeticoes)]
+            print(f"INICIO_SOB_DEMANDA={sob_demanda} ({nome}): import backend.main {resumo(importacoes)}")
+
+            for sem_database in (False, True):
+                for rota in ROTAS if not sem_database else ROTAS[-1:]:
+                    tempos = []
+                    for _ in range(args.repeticoes):
+                        shutil.rmtree(database, ignore_errors=True)
+                        if not sem_database:
+                            shutil.copytree(modelo, database)
+                        tempos.append(primeira_resposta(copia, ambiente, rota))
+                    situacao = "sem database/" if sem_database else "com database/"
+                    print(f"  primeira resposta {rota:16s} {situacao:14s} {resumo(tempos)}")
+    finally:
+        shutil.rmtree(raiz, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
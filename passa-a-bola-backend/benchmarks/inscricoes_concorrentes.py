@@ -0,0 +1,102 @@
+"""
+Teste de carga: inscrições simultâneas além das vagas de um evento
+Cria um evento futuro com poucas vagas e dispara ao mesmo tempo mais
+inscrições (emails distintos) do que ele comporta, enquanto outra conexão
+consulta vagas_disponiveis sem parar. Verifica que exatamente "vagas"
+inscrições são aceitas, que as demais recebem 409, que as vagas terminam
+em 0 com as inscrições encerradas e que nenhuma leitura viu um valor
+negativo. Sai com código 1 se alguma verificação falhar
+
+Uso (com a API rodando):
+    python benchmarks/inscricoes_concorrentes.py --url http://127.0.0.1:8000 --vagas 50 --inscricoes 500
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.comum import ClienteHTTP, contar_status, executar_carga, formatar_percentis
+
+
+async def consultar_vagas(url: str, evento_id: str, encerrar: asyncio.Event) -> list:
+    """Lê vagas_disponiveis do evento até o fim da carga"""
+    cliente = ClienteHTTP(url)
+    vistas = []
+    try:
+        while not encerrar.is_set():
+            status, evento = await cliente.json("GET", f"/api/events/{evento_id}?fields=vagas_disponiveis")
+            if status == 200:
+                vistas.append(evento["vagas_disponiveis"])
+    finally:
+        await cliente.fechar()
+    return vistas
+
+
+async def executar(args: argparse.Namespace) -> bool:
+    cliente = ClienteHTTP(args.url)
+    status, criado = await cliente.json("POST", "/api/events/", {
+        "titulo": "Peneira de carga",
+        "descricao": "Evento criado por benchmarks/inscricoes_concorrentes.py",
+        "tipo": "Peneira",
+        "data": (date.today() + timedelta(days=30)).isoformat(),
+        "horario": "10:00",
+        "local": "Centro de Treinamento",
+        "endereco": "Rua do Teste, 100",
+        "vagas": args.vagas
+    })
+    if status != 201:
+        print(f"✗ Não foi possível criar o evento ({status}): {criado}")
+        return False
+    evento_id = criado["id"]
+
+    try:
+        inscricoes = [
+            ("POST", f"/api/events/{evento_id}/inscricoes",
+             {"nome": f"Jogadora {i}", "email": f"carga{i}@passabola.com.br"})
+            for i in range(args.inscricoes)
+        ]
+        encerrar = asyncio.Event()
+        consulta = asyncio.create_task(consultar_vagas(args.url, evento_id, encerrar))
+        resultados, duracao = await executar_carga(args.url, inscricoes, conexoes=args.conexoes)
+        encerrar.set()
+        vistas = await consulta
+
+        _, evento = await cliente.json("GET", f"/api/events/{evento_id}")
+        contagem = contar_status(resultados)
+        print(f"{args.inscricoes} inscrições para {args.vagas} vagas em {duracao:.2f} s: {contagem}")
+        print(f"  latência {formatar_percentis([latencia for _, latencia in resultados])}")
+        print(f"  {len(vistas)} leituras de vagas_disponiveis durante a carga (mínimo {min(vistas, default=None)})")
+
+        verificacoes = [
+            (f"{args.vagas} inscrições aceitas (201)", contagem.get(201, 0) == args.vagas),
+            (f"{args.inscricoes - args.vagas} recusadas (409)", contagem.get(409, 0) == args.inscricoes - args.vagas),
+            ("vagas_disponiveis termina em 0", evento["vagas_disponiveis"] == 0),
+            ("inscrições encerradas", evento["inscricoes_abertas"] is False),
+            ("vagas_disponiveis nunca negativa", all(vagas >= 0 for vagas in vistas))
+        ]
+        for descricao, passou in verificacoes:
+            print(f"  {'✓' if passou else '✗'} {descricao}")
+        return all(passou for _, passou in verificacoes)
+    finally:
+        await cliente.requisitar("DELETE", f"/api/events/{evento_id}")
+        await cliente.fechar()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Endereço da API")
+    parser.add_argument("--vagas", type=int, default=50, help="Vagas do evento criado")
+    parser.add_argument("--inscricoes", type=int, default=500, help="Inscrições disparadas")
+    parser.add_argument("--conexoes", type=int, default=200, help="Conexões simultâneas")
+    args = parser.parse_args()
+
+    if not asyncio.run(executar(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
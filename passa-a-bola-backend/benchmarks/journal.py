@@ -0,0 +1,112 @@
+"""
+Benchmark: journal de mutações x regravação do snapshot
+Mede atualizações por segundo, bytes gravados, a compactação e a carga com
+journal pendente, em uma coleção de jogadoras gerada em um diretório
+temporário (database/ não é alterado). Cada modo roda em um processo
+próprio, porque PERSISTENCIA_JOURNAL é lida na importação
+
+Uso:
+    python benchmarks/journal.py --registros 20000 --operacoes 200
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.comum import usar_diretorio_temporario
+
+
+def gerar_jogadoras(quantidade: int):
+    """Coleção sintética com o formato das jogadoras da API"""
+    posicoes = ["Atacante", "Meio-campista", "Zagueira", "Goleira", "Lateral"]
+    return [
+        {
+            "_id": str(i),
+            "nome": f"Jogadora {i}",
+            "idade": random.randint(16, 40),
+            "posicao": random.choice(posicoes),
+            "clube_atual": f"Clube {i % 300}",
+            "gols_carreira": random.randint(0, 300),
+            "bio": "Atacante rápida, com passagem pela seleção de base e pelo futebol universitário."
+        }
+        for i in range(1, quantidade + 1)
+    ]
+
+
+def medir_modo(registros: int, operacoes: int) -> dict:
+    """Executa o benchmark no processo atual (modo definido pelo ambiente)"""
+    diretorio = usar_diretorio_temporario()
+    from utils import persistence
+
+    try:
+        random.seed(1)
+        persistence.salvar_backup_json("jogadoras", gerar_jogadoras(registros))
+        tamanho_snapshot = os.path.getsize(diretorio / "jogadoras_backup.json")
+
+        inicio = time.perf_counter()
+        for operacao in range(operacoes):
+            registro_id = str(random.randint(1, registros))
+            assert persistence.atualizar_registro_json("jogadoras", registro_id, {"gols_carreira": operacao})
+        duracao = time.perf_counter() - inicio
+
+        journal = diretorio / "jogadoras_journal.log"
+        bytes_gravados = journal.stat().st_size if persistence.MODO_JOURNAL else tamanho_snapshot * operacoes
+
+        # Carga a frio com o journal ainda pendente (reproduzido sobre o snapshot)
+        persistence.limpar_cache()
+        inicio_carga = time.perf_counter()
+        persistence.carregar_backup_json("jogadoras")
+        carga = time.perf_counter() - inicio_carga
+
+        inicio_compactacao = time.perf_counter()
+        persistence.encerrar_persistencia()
+        compactacao = time.perf_counter() - inicio_compactacao
+        persistence.encerrar_log()
+
+        return {
+            "operacoes_por_segundo": operacoes / duracao,
+            "ms_por_operacao": duracao / operacoes * 1000,
+            "bytes_por_operacao": bytes_gravados / operacoes,
+            "carga_s": carga,
+            "compactacao_s": compactacao
+        }
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=20000, help="Tamanho da coleção")
+    parser.add_argument("--operacoes", type=int, default=200, help="Atualizações medidas em cada modo")
+    parser.add_argument("--filho", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        print(json.dumps(medir_modo(args.registros, args.operacoes)))
+        return
+
+    print(f"{args.operacoes} atualizações em uma coleção de {args.registros} jogadoras")
+    for nome, journal in (("snapshot", "0"), ("journal", "1")):
+        ambiente = dict(os.environ, PERSISTENCIA_JOURNAL=journal, PERSISTENCIA_COMPACTACAO_SEGUNDOS="3600")
+        saida = subprocess.run(
+            [sys.executable, __file__, "--filho", "--registros", str(args.registros), "--operacoes", str(args.operacoes)],
+            env=ambiente, capture_output=True, text=True, check=True
+        )
+        resultado = json.loads(saida.stdout.strip().splitlines()[-1])
+        print(
+            f"{nome:9s} {resultado['operacoes_por_segundo']:8.0f} op/s "
+            f"({resultado['ms_por_operacao']:.2f} ms/op, {resultado['bytes_por_operacao'] / 1024:.1f} KiB gravados/op) | "
+            f"carga {resultado['carga_s'] * 1000:.0f} ms | encerramento {resultado['compactacao_s'] * 1000:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
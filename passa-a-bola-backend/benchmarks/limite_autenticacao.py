@@ -0,0 +1,90 @@
+"""
+Benchmark: limite de tentativas de login x bcrypt em cada tentativa
+Dispara tentativas de login com senha errada em três cenários (um IP
+contra uma conta, um IP contra muitas contas, muitos IPs contra uma conta),
+com os limitadores por IP e por email desligados e ligados, e mede o tempo
+de CPU gasto e as respostas (401 x 429). Roda a aplicação no próprio
+processo (sem servidor), em um diretório de dados temporário, com o bcrypt
+na thread da requisição (SENHAS_PROCESSOS=0) para que o tempo de CPU o inclua
+
+Uso:
+    python benchmarks/limite_autenticacao.py --tentativas 40
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ["SENHAS_PROCESSOS"] = "0"
+
+from benchmarks.comum import chamar_asgi, contar_status, usar_diretorio_temporario
+
+CENARIOS = {
+    "um IP, uma conta": lambda rodada, i: (f"198.51.{rodada}.1", f"alvo{rodada}-0@email.com"),
+    "um IP, muitas contas": lambda rodada, i: (f"198.51.{rodada}.2", f"alvo{rodada}-{i}@email.com"),
+    "muitos IPs, uma conta": lambda rodada, i: (f"203.0.{rodada}.{i}", f"alvo{rodada}-1@email.com")
+}
+
+
+async def executar(tentativas: int) -> None:
+    from backend import dependencias
+    from backend.main import app
+    from backend.security import get_password_hash
+    from utils import persistence
+
+    rodadas = 2 * len(CENARIOS)
+    hash_senha = get_password_hash("senha-correta-123")
+    persistence.inserir_registros_json("users", [
+        {"nome": f"Alvo {rodada}-{i}", "email": f"alvo{rodada}-{i}@email.com",
+         "hashed_password": hash_senha, "role": "torcedor"}
+        for rodada in range(rodadas) for i in range(tentativas)
+    ])
+
+    async with app.router.lifespan_context(app):
+        rodada = 0
+        for ligado in (False, True):
+            dependencias.limite_auth_ip.rajada = dependencias.LIMITE_AUTH_IP_RAJADA if ligado else 0
+            dependencias.limite_auth_email.rajada = dependencias.LIMITE_AUTH_EMAIL_RAJADA if ligado else 0
+            for nome, gerar in CENARIOS.items():
+                resultados = []
+                cpu = time.process_time()
+                inicio = time.perf_counter()
+                for i in range(tentativas):
+                    ip, email = gerar(rodada, i)
+                    formulario = urlencode({"username": email, "password": "senha-errada"}).encode("ascii")
+                    status, _ = await chamar_asgi(
+                        app, "POST", "/auth/login", formulario,
+                        {"Content-Type": "application/x-www-form-urlencoded"}, ip=ip
+                    )
+                    resultados.append((status, 0.0))
+                print(
+                    f"  limitador {'ligado   ' if ligado else 'desligado'} {nome:22s} "
+                    f"CPU {time.process_time() - cpu:6.2f} s | parede {time.perf_counter() - inicio:6.2f} s | "
+                    f"{contar_status(resultados)}"
+                )
+                rodada += 1
+
+        print(f"  {dependencias.estatisticas_limites()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tentativas", type=int, default=40, help="Tentativas de login por cenário")
+    args = parser.parse_args()
+
+    diretorio = usar_diretorio_temporario()
+    try:
+        print(f"{args.tentativas} tentativas de login com senha errada por cenário")
+        asyncio.run(executar(args.tentativas))
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
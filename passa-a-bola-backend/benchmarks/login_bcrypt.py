@@ -0,0 +1,108 @@
+"""
+Teste de carga: logins simultâneos (bcrypt) x latência do resto da API
+Mantém várias conexões fazendo POST /auth/login com senha correta durante
+alguns segundos e, ao mesmo tempo, mede uma requisição sem relação com o
+login (GET /api/players/?limit=1). Com a verificação de senha fora do loop
+de eventos, essa latência não deve subir com a carga de logins; quando a
+fila de senhas enche, o login responde 503 e o cliente espera o Retry-After
+
+A conta --email é cadastrada na primeira execução, se ainda não existir.
+Para medir o bcrypt, e não o limitador de tentativas, inicie a API com
+AUTH_LIMITE_IP_RAJADA=0 e AUTH_LIMITE_EMAIL_RAJADA=0
+
+Uso (com a API rodando):
+    python benchmarks/login_bcrypt.py --url http://127.0.0.1:8000 --clientes 16 --duracao 10
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.comum import ClienteHTTP, formatar_percentis
+
+FORMULARIO = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+async def garantir_conta(url: str, email: str, senha: str, formulario: bytes) -> bool:
+    """Faz um login de teste e cadastra a conta se ela não existir"""
+    cliente = ClienteHTTP(url)
+    try:
+        status, _ = await cliente.requisitar("POST", "/auth/login", formulario, FORMULARIO)
+        if status == 401:
+            status, resposta = await cliente.json("POST", "/auth/register", {
+                "nome": "Conta de Carga", "email": email, "senha": senha, "role": "torcedor"
+            })
+            if status != 201:
+                print(f"✗ Não foi possível cadastrar {email} ({status}): {resposta}")
+                return False
+            print(f"Conta {email} cadastrada")
+        elif status == 429:
+            print("⚠ Login limitado (429): inicie a API com AUTH_LIMITE_IP_RAJADA=0 e AUTH_LIMITE_EMAIL_RAJADA=0")
+        return True
+    finally:
+        await cliente.fechar()
+
+
+async def executar(args: argparse.Namespace) -> None:
+    formulario = urlencode({"username": args.email, "password": args.senha}).encode("ascii")
+    if not await garantir_conta(args.url, args.email, args.senha, formulario):
+        sys.exit(1)
+
+    fim = time.perf_counter() + args.duracao
+    status_logins = {}
+    latencias_login = []
+    latencias_sonda = []
+
+    async def logins() -> None:
+        cliente = ClienteHTTP(args.url)
+        try:
+            while time.perf_counter() < fim:
+                inicio = time.perf_counter()
+                status, _ = await cliente.requisitar("POST", "/auth/login", formulario, FORMULARIO)
+                latencias_login.append(time.perf_counter() - inicio)
+                status_logins[status] = status_logins.get(status, 0) + 1
+                if status in (429, 503):
+                    await asyncio.sleep(1.0)
+        finally:
+            await cliente.fechar()
+
+    async def sonda() -> None:
+        cliente = ClienteHTTP(args.url)
+        try:
+            while time.perf_counter() < fim:
+                inicio = time.perf_counter()
+                await cliente.requisitar("GET", "/api/players/?limit=1")
+                latencias_sonda.append(time.perf_counter() - inicio)
+                await asyncio.sleep(0.02)
+        finally:
+            await cliente.fechar()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(sonda(), *(logins() for _ in range(args.clientes)))
+    duracao = time.perf_counter() - inicio
+
+    print(f"{args.clientes} clientes de login por {duracao:.0f} s: {dict(sorted(status_logins.items()))} "
+          f"({status_logins.get(200, 0) / duracao:.1f} logins/s)")
+    print(f"  login               {formatar_percentis(latencias_login)}")
+    print(f"  GET sem relação     {formatar_percentis(latencias_sonda)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Endereço da API")
+    parser.add_argument("--email", default="carga@passabola.com.br", help="Conta usada nos logins")
+    parser.add_argument("--senha", default="senha-de-carga-123", help="Senha da conta")
+    parser.add_argument("--clientes", type=int, default=16, help="Conexões fazendo login")
+    parser.add_argument("--duracao", type=float, default=10.0, help="Duração em segundos")
+    args = parser.parse_args()
+
+    asyncio.run(executar(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Teste de carga: leituras e gravações simultâneas nas rotas async
+Cria algumas jogadoras e, durante alguns segundos, mantém muitas conexões
+fazendo GET /api/players/{id}, uma conexão fazendo PUT nas mesmas
+jogadoras e outra medindo GET /health. Mostra req/s e latência das
+leituras, gravações por segundo e a latência do /health, que não deve
+travar enquanto as gravações ocupam a fila de escrita. Respostas 503
+indicam fila cheia. As jogadoras criadas são removidas no fim
+
+Uso (com a API rodando):
+    python benchmarks/persistencia_async.py --url http://127.0.0.1:8000 --conexoes 100 --duracao 10
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.comum import ClienteHTTP, formatar_percentis
+
+
+async def executar(args: argparse.Namespace) -> None:
+    cliente = ClienteHTTP(args.url)
+    ids = []
+    try:
+        for i in range(args.jogadoras):
+            status, criada = await cliente.json("POST", "/api/players/", {
+                "nome": f"Jogadora de Carga {i}", "posicao": "Atacante", "clube_atual": "Clube de Carga"
+            })
+            if status != 201:
+                print(f"✗ Não foi possível criar as jogadoras ({status}): {criada}")
+                return
+            ids.append(criada["id"])
+
+        fim = time.perf_counter() + args.duracao
+        status_leituras = {}
+        latencias_leitura = []
+        latencias_health = []
+        gravacoes = {"ok": 0, "total": 0}
+
+        async def leitor() -> None:
+            conexao = ClienteHTTP(args.url)
+            try:
+                while time.perf_counter() < fim:
+                    inicio = time.perf_counter()
+                    status, _ = await conexao.requisitar("GET", f"/api/players/{random.choice(ids)}")
+                    latencias_leitura.append(time.perf_counter() - inicio)
+                    status_leituras[status] = status_leituras.get(status, 0) + 1
+            finally:
+                await conexao.fechar()
+
+        async def escritor() -> None:
+            conexao = ClienteHTTP(args.url)
+            try:
+                while time.perf_counter() < fim:
+                    gravacoes["total"] += 1
+                    status, _ = await conexao.requisitar(
+                        "PUT", f"/api/players/{random.choice(ids)}", {"gols_carreira": gravacoes["total"]}
+                    )
+                    gravacoes["ok"] += status == 200
+            finally:
+                await conexao.fechar()
+
+        async def health() -> None:
+            conexao = ClienteHTTP(args.url)
+            try:
+                while time.perf_counter() < fim:
+                    inicio = time.perf_counter()
+                    await conexao.requisitar("GET", "/health")
+                    latencias_health.append(time.perf_counter() - inicio)
+                    await asyncio.sleep(0.05)
+            finally:
+                await conexao.fechar()
+
+        inicio = time.perf_counter()
+        escritores = [escritor()] if not args.sem_escritor else []
+        await asyncio.gather(health(), *escritores, *(leitor() for _ in range(args.conexoes)))
+        duracao = time.perf_counter() - inicio
+
+        print(f"{args.conexoes} conexões de leitura por {duracao:.0f} s, {args.jogadoras} jogadoras")
+        print(f"  GET /api/players/{{id}} {dict(sorted(status_leituras.items()))} "
+              f"{status_leituras.get(200, 0) / duracao:.0f} req/s | {formatar_percentis(latencias_leitura)}")
+        if escritores:
+            print(f"  PUT /api/players/{{id}} {gravacoes['ok']}/{gravacoes['total']} ok, {gravacoes['ok'] / duracao:.1f}/s")
+        print(f"  GET /health            {formatar_percentis(latencias_health)}")
+    finally:
+        for jogadora_id in ids:
+            await cliente.requisitar("DELETE", f"/api/players/{jogadora_id}")
+        await cliente.fechar()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Endereço da API")
+    parser.add_argument("--jogadoras", type=int, default=200, help="Jogadoras criadas para a carga")
+    parser.add_argument("--conexoes", type=int, default=100, help="Conexões fazendo GET")
+    parser.add_argument("--duracao", type=float, default=10.0, help="Duração em segundos")
+    parser.add_argument("--sem-escritor", action="store_true", help="Só leituras, sem a conexão de PUT")
+    args = parser.parse_args()
+
+    asyncio.run(executar(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: rankings mantidos incrementalmente x ordenação completa
+Mede a montagem do ranking de jogadoras, o top 10 (geral, por posição e
+por clube) e a atualização de uma jogadora com o ranking já montado, em
+uma coleção gerada em um diretório temporário. Usa o journal para que a
+atualização meça o índice, não a regravação do snapshot
+
+Uso:
+    python benchmarks/ranking.py --jogadoras 200000
+    python benchmarks/ranking.py --jogadoras 200000 --gc-padrao
+"""
+
+import argparse
+import gc
+import os
+import random
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("PERSISTENCIA_JOURNAL", "1")
+
+from benchmarks.comum import formatar_percentis, usar_diretorio_temporario
+
+
+def gerar_jogadoras(quantidade: int):
+    """Coleção sintética com as estatísticas usadas pelos rankings"""
+    posicoes = ["Atacante", "Meio-campista", "Zagueira", "Goleira", "Lateral"]
+    return [
+        {
+            "id": str(i),
+            "nome": f"Jogadora {i}",
+            "posicao": random.choice(posicoes),
+            "clube_atual": f"Clube {random.randint(0, 2000)}",
+            "gols_carreira": random.randint(0, 300),
+            "assistencias": random.randint(0, 200),
+            "partidas_jogadas": random.randint(0, 400)
+        }
+        for i in range(1, quantidade + 1)
+    ]
+
+
+def medir(rotulo: str, funcao, repeticoes: int) -> None:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    print(f"  {rotulo:42s} {(time.perf_counter() - inicio) / repeticoes * 1000:10.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jogadoras", type=int, default=200000, help="Tamanho da coleção")
+    parser.add_argument("--atualizacoes", type=int, default=2000, help="Atualizações medidas")
+    parser.add_argument("--gc-padrao", action="store_true",
+                        help="Limiares padrão do coletor de ciclos (sem o ajuste do startup da API)")
+    args = parser.parse_args()
+
+    diretorio = usar_diretorio_temporario()
+    from backend.main import GC_LIMIAR
+    from backend.routes.players import ranking_jogadoras
+    from utils import persistence
+
+    if args.gc_padrao:
+        gc.set_threshold(700, 10, 10)
+    print(f"{args.jogadoras} jogadoras, limiares do coletor {gc.get_threshold()} (API: {GC_LIMIAR})")
+
+    try:
+        random.seed(1)
+        persistence.salvar_backup_json("jogadoras", gerar_jogadoras(args.jogadoras))
+        dados = persistence.carregar_backup_json("jogadoras")
+
+        inicio = time.perf_counter()
+        ranking_jogadoras.garantir_construido()
+        print(f"  {'montagem do ranking':42s} {(time.perf_counter() - inicio) * 1000:10.0f} ms")
+
+        medir("top 10 gols (ranking)", lambda: ranking_jogadoras.top("gols_carreira", 10), 200)
+        medir("top 10 gols (ordenação completa)",
+              lambda: sorted(dados, key=lambda j: j["gols_carreira"], reverse=True)[:10], 3)
+        medir("top 10 gols/partida atacantes (ranking)",
+              lambda: ranking_jogadoras.top("gols_por_partida", 10, agrupar_por="posicao", grupo="Atacante"), 200)
+        medir("top 10 gols/partida atacantes (ordenação)",
+              lambda: sorted(
+                  (j for j in dados if j["posicao"] == "Atacante"),
+                  key=lambda j: j["gols_carreira"] / j["partidas_jogadas"] if j["partidas_jogadas"] else 0,
+                  reverse=True
+              )[:10], 3)
+        medir("top 10 de cada clube (ranking)",
+              lambda: ranking_jogadoras.top("gols_carreira", 10, agrupar_por="clube_atual"), 5)
+
+        latencias = []
+        for atualizacao in range(args.atualizacoes):
+            registro_id = str(random.randint(1, args.jogadoras))
+            inicio = time.perf_counter()
+            assert persistence.atualizar_registro_json("jogadoras", registro_id, {"gols_carreira": atualizacao % 300}, "id")
+            latencias.append(time.perf_counter() - inicio)
+        print(f"  {'atualização (journal + ranking)':42s} {formatar_percentis(latencias)}")
+    finally:
+        persistence.encerrar_persistencia()
+        persistence.encerrar_log()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
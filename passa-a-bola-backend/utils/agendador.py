@@ -0,0 +1,203 @@
+"""
+Agendador de Encerramento de Inscrições
+Fecha as inscrições (inscricoes_abertas = False) dos eventos quando chega a
+data e o horário de cada um, em uma thread iniciada pelo lifespan da API
+"""
+
+import heapq
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.indices import IndiceIncremental, agora_local, chave_id, instante_evento, segundos_ate
+from utils.persistence import modificar_registros_json, registrar_log
+
+# Espera máxima entre verificações, mesmo sem eventos vencendo (protege
+# contra ajustes do relógio e mudanças de horário de verão)
+INTERVALO_MAXIMO = float(os.getenv("AGENDADOR_INTERVALO_MAXIMO_SEGUNDOS", "60"))
+
+
+class AgendadorEncerramentos(IndiceIncremental):
+    """
+    Timers de encerramento das inscrições dos eventos
+
+    Os eventos com inscrições abertas ficam em um heap de (instante, chave
+    do ID, ID); a thread dorme até o instante do primeiro e só então
+    encerra os vencidos, sem varrer a coleção. Criar, editar ou excluir um
+    evento reagenda só a entrada dele (entradas antigas ficam no heap e são
+    ignoradas ao sair, comparando com o instante atual do evento). Ao
+    reiniciar a API, o heap é remontado a partir da coleção e os eventos
+    que venceram com a API parada são encerrados na primeira rodada.
+
+    Example:
+        >>> agendador = AgendadorEncerramentos("eventos")
+        >>> agendador.iniciar()
+        >>> agendador.estatisticas()
+        {'agendados': 7, 'encerrados': 1, 'proximo': '2025-12-15T09:00', ...}
+    """
+
+    def __init__(self, collection_name: str = "eventos", campo_data: str = "data",
+                 campo_horario: Optional[str] = "horario", campo_id: str = "id",
+                 intervalo_maximo: float = INTERVALO_MAXIMO):
+        self.campo_data = campo_data
+        self.campo_horario = campo_horario
+        self.intervalo_maximo = intervalo_maximo
+        super().__init__(collection_name, campo_id)
+        self._condicao = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._ativo = False
+        self._estatisticas = {"encerrados": 0, "rodadas": 0}
+        self._limpar()
+
+    def _limpar(self) -> None:
+        self._heap: List[Tuple[str, Tuple[int, int, str], str]] = []
+        # ID → instante agendado (o que vale quando há entradas repetidas no heap)
+        self._agendados: Dict[str, str] = {}
+
+    def _instante(self, registro: Dict[str, Any]) -> Optional[str]:
+        """Instante de encerramento, ou None se não há o que agendar"""
+        if registro.get(self.campo_id) is None or not registro.get("inscricoes_abertas", True):
+            return None
+        horario = registro.get(self.campo_horario) if self.campo_horario else None
+        return instante_evento(registro.get(self.campo_data), horario)
+
+    def _construir(self, dados: List[Dict[str, Any]]) -> None:
+        """Carga em lote: um único heapify"""
+        self._limpar()
+        for registro in dados:
+            instante = self._instante(registro)
+            if instante is not None:
+                self._agendados[str(registro[self.campo_id])] = instante
+        self._heap = [(instante, chave_id(registro_id), registro_id) for registro_id, instante in self._agendados.items()]
+        heapq.heapify(self._heap)
+        self._condicao.notify()
+
+    def _adicionar(self, registro: Dict[str, Any]) -> None:
+        instante = self._instante(registro)
+        if instante is None:
+            return
+        registro_id = str(registro[self.campo_id])
+        self._agendados[registro_id] = instante
+        entrada = (instante, chave_id(registro_id), registro_id)
+        heapq.heappush(self._heap, entrada)
+        # Entradas descartadas não podem crescer sem limite (eventos muito editados)
+        if len(self._heap) > 2 * len(self._agendados) + 64:
+            self._heap = [(agendado, chave_id(outro_id), outro_id) for outro_id, agendado in self._agendados.items()]
+            heapq.heapify(self._heap)
+        if self._heap[0] == entrada:
+            # Novo primeiro da fila: a thread recalcula quanto dormir
+            self._condicao.notify()
+
+    def _remover(self, registro: Dict[str, Any]) -> None:
+        if registro.get(self.campo_id) is not None:
+            self._agendados.pop(str(registro[self.campo_id]), None)
+
+    def _ao_alterar(self, operacao: str, antigo: Optional[Dict[str, Any]], novo: Optional[Dict[str, Any]]) -> None:
+        super()._ao_alterar(operacao, antigo, novo)
+        if operacao == "recarregar":
+            with self._condicao:
+                self._condicao.notify()
+
+    def _proximo(self) -> Optional[str]:
+        """Instante do primeiro evento agendado, descartando entradas antigas do topo"""
+        heap = self._heap
+        while heap and self._agendados.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def _retirar_vencidos(self, agora: str) -> List[str]:
+        """Retira do heap os eventos cujo instante já chegou"""
+        vencidos = []
+        while True:
+            proximo = self._proximo()
+            if proximo is None or proximo > agora:
+                return vencidos
+            registro_id = heapq.heappop(self._heap)[2]
+            del self._agendados[registro_id]
+            vencidos.append(registro_id)
+
+    def _encerrar(self, vencidos: List[str], agora: str) -> int:
+        """Fecha as inscrições dos eventos vencidos (uma gravação para todos)"""
+
+        def fechar(evento: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            # O evento pode ter sido editado depois de sair do heap
+            instante = self._instante(evento)
+            if instante is None or instante > agora:
+                return None
+            return {"inscricoes_abertas": False}
+
+        encerrados = len(modificar_registros_json(self.collection_name, vencidos, fechar, self.campo_id))
+        if encerrados:
+            registrar_log(f"✓ Inscrições encerradas automaticamente: {encerrados} evento(s)")
+        return encerrados
+
+    def _executar(self) -> None:
+        """Laço da thread: dorme até o próximo encerramento e encerra os vencidos"""
+        while self._ativo:
+            try:
+                # Monta o heap fora do lock do agendador (ordem: coleções → índice)
+                self.garantir_construido()
+                with self._condicao:
+                    if not self._ativo:
+                        break
+                    if not self._construido:
+                        # Coleção recarregada entre a montagem e aqui
+                        continue
+                    agora = agora_local()
+                    vencidos = self._retirar_vencidos(agora)
+                    if not vencidos:
+                        proximo = self._proximo()
+                        espera = self.intervalo_maximo
+                        if proximo is not None:
+                            # Folga para não acordar um pouco antes do minuto virar
+                            espera = min(espera, max(segundos_ate(proximo), 0) + 0.05)
+                        self._condicao.wait(espera)
+                        continue
+                # Fora do lock: as gravações notificam o próprio agendador
+                encerrados = self._encerrar(vencidos, agora)
+                with self._lock:
+                    self._estatisticas["encerrados"] += encerrados
+                    self._estatisticas["rodadas"] += 1
+            except Exception as e:
+                registrar_log(f"✗ ERRO no agendador de {self.collection_name}: {str(e)}")
+                with self._condicao:
+                    self._condicao.wait(self.intervalo_maximo)
+
+    def iniciar(self) -> None:
+        """Inicia a thread do agendador (startup da API)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._ativo = True
+            self._thread = threading.Thread(
+                target=self._executar, name=f"agendador-{self.collection_name}", daemon=True
+            )
+            self._thread.start()
+
+    def parar(self, timeout: float = 5.0) -> None:
+        """Para a thread do agendador (shutdown da API)"""
+        with self._condicao:
+            self._ativo = False
+            self._condicao.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Contadores do agendador
+
+        Returns:
+            Dict: eventos agendados, encerrados automaticamente, rodadas de
+            encerramento, instante do próximo e se a thread está ativa
+        """
+        with self._lock:
+            estatisticas: Dict[str, Any] = dict(self._estatisticas)
+            estatisticas["agendados"] = len(self._agendados)
+            estatisticas["proximo"] = self._proximo()
+            estatisticas["ativo"] = self._thread is not None and self._thread.is_alive()
+        return estatisticas
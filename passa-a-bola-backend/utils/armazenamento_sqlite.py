@@ -0,0 +1,511 @@
+"""
+Backend de Armazenamento em SQLite
+Alternativa aos arquivos JSON para coleções grandes, selecionada com
+PERSISTENCIA_BACKEND=sqlite. As rotas continuam usando as funções de
+utils/persistence.py, que delegam para este backend quando ativo.
+
+Os backups <colecao>_backup.json continuam sendo gerados por exportação
+periódica. Para importar os backups existentes:
+
+    python -m utils.armazenamento_sqlite
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, List, Dict, Any, Optional
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.persistence import DATABASE_DIR, campo_id_declarado, normalizar_chave, registrar_log, _gravar_snapshot
+
+SQLITE_ARQUIVO = Path(os.getenv("PERSISTENCIA_SQLITE_ARQUIVO", str(DATABASE_DIR / "passa_a_bola.db")))
+INTERVALO_EXPORTACAO = float(os.getenv("PERSISTENCIA_EXPORTACAO_SEGUNDOS", "300"))
+
+# Colunas extraídas do registro para consultas indexadas (email é gravado
+# normalizado, para a busca sem diferenciar maiúsculas das chaves únicas)
+COLUNAS_INDEXADAS = ("email", "posicao", "data")
+COLUNAS_NORMALIZADAS = ("email",)
+
+# Versão do esquema (PRAGMA user_version); 1 = coluna email normalizada
+VERSAO_ESQUEMA = 1
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS colecoes (
+    nome TEXT PRIMARY KEY,
+    campo_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS registros (
+    colecao TEXT NOT NULL,
+    id TEXT NOT NULL,
+    dados TEXT NOT NULL,
+    email TEXT,
+    posicao TEXT,
+    data TEXT,
+    PRIMARY KEY (colecao, id)
+);
+CREATE INDEX IF NOT EXISTS idx_registros_email ON registros (colecao, email);
+CREATE INDEX IF NOT EXISTS idx_registros_posicao ON registros (colecao, posicao);
+CREATE INDEX IF NOT EXISTS idx_registros_data ON registros (colecao, data);
+"""
+
+# Consultas fixas: o sqlite3 mantém o statement preparado em cache por conexão
+SQL_LISTAR = "SELECT dados FROM registros WHERE colecao = ? ORDER BY rowid"
+SQL_BUSCAR = "SELECT dados FROM registros WHERE colecao = ? AND id = ?"
+SQL_EXISTE = "SELECT 1 FROM registros WHERE colecao = ? AND id = ?"
+SQL_CONTAR = "SELECT COUNT(*) FROM registros WHERE colecao = ?"
+SQL_ALGUM = "SELECT 1 FROM registros WHERE colecao = ? LIMIT 1"
+SQL_INSERIR = "INSERT INTO registros (colecao, id, dados, email, posicao, data) VALUES (?, ?, ?, ?, ?, ?)"
+SQL_ATUALIZAR = "UPDATE registros SET id = ?, dados = ?, email = ?, posicao = ?, data = ? WHERE colecao = ? AND id = ?"
+SQL_DELETAR = "DELETE FROM registros WHERE colecao = ? AND id = ?"
+SQL_LIMPAR = "DELETE FROM registros WHERE colecao = ?"
+SQL_CAMPO_ID = "SELECT campo_id FROM colecoes WHERE nome = ?"
+SQL_REGISTRAR_COLECAO = "INSERT OR IGNORE INTO colecoes (nome, campo_id) VALUES (?, ?)"
+SQL_BUSCAR_POR_COLUNA = "SELECT dados FROM registros WHERE colecao = ? AND {coluna} = ? ORDER BY rowid"
+
+
+def _serializar(registro: Dict[str, Any]) -> str:
+    """Serializa um registro para a coluna dados"""
+    return json.dumps(registro, ensure_ascii=False, default=str)
+
+
+def _valor_coluna(coluna: str, valor: Any) -> Optional[str]:
+    """Valor gravado em uma coluna indexada"""
+    if valor is None:
+        return None
+    return normalizar_chave(valor) if coluna in COLUNAS_NORMALIZADAS else str(valor)
+
+
+def _valores_indexados(registro: Dict[str, Any]) -> List[Optional[str]]:
+    """Valores das colunas indexadas (email, posicao, data) de um registro"""
+    return [_valor_coluna(c, registro.get(c)) for c in COLUNAS_INDEXADAS]
+
+
+def _detectar_campo_id(dados: List[Dict[str, Any]]) -> str:
+    """Detecta o campo de ID de uma coleção importada ("_id" ou "id")"""
+    if any('_id' in item for item in dados):
+        return "_id"
+    if any('id' in item for item in dados):
+        return "id"
+    return "_id"
+
+
+def _rechavear(dados: List[Dict[str, Any]], campo_antigo: str, campo_novo: str) -> List[Dict[str, Any]]:
+    """
+    Prepara registros gravados com o campo de ID campo_antigo para a
+    chave campo_novo: quem não tem campo_novo recebe o valor de
+    campo_antigo, se ainda não usado; os demais recebem um ID novo
+    """
+    existentes = {str(item[campo_novo]) for item in dados if item.get(campo_novo) is not None}
+    convertidos = []
+    for item in dados:
+        if item.get(campo_novo) is None and item.get(campo_antigo) is not None:
+            item = dict(item)
+            valor = item.pop(campo_antigo)
+            if str(valor) not in existentes:
+                item[campo_novo] = str(valor)
+                existentes.add(str(valor))
+        convertidos.append(item)
+    return convertidos
+
+
+class BackendSQLite:
+    """
+    Armazenamento das coleções em um banco SQLite (modo WAL)
+
+    Implementa as mesmas operações das funções públicas de persistência:
+    carregar, salvar, buscar, buscar_por_campo, gerar_id, inserir,
+    atualizar, deletar e encerrar. Cada thread usa sua própria conexão e
+    as escritas usam transações BEGIN IMMEDIATE.
+    """
+
+    def __init__(self, arquivo: Path = SQLITE_ARQUIVO):
+        self.arquivo = Path(arquivo)
+        self._local = threading.local()
+        self._escrita_lock = threading.RLock()
+        self._campos_id: Dict[str, str] = {}
+        self._alteradas: set = set()
+        self._parar = threading.Event()
+        self._exportador: Optional[threading.Thread] = None
+
+        self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+        self._conexao().executescript(ESQUEMA)
+        self._migrar()
+        registrar_log(f"✓ Backend SQLite ativo: {self.arquivo.name}")
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Conexão da thread atual (criada na primeira utilização)"""
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.arquivo, timeout=30, isolation_level=None, cached_statements=128)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+        return conexao
+
+    @contextmanager
+    def _transacao(self):
+        """Transação de escrita (BEGIN IMMEDIATE ... COMMIT/ROLLBACK)"""
+        with self._escrita_lock:
+            conexao = self._conexao()
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                yield conexao
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+            conexao.execute("COMMIT")
+
+    def _migrar(self) -> None:
+        """Atualiza um banco criado por uma versão anterior do esquema"""
+        with self._transacao() as conexao:
+            versao = conexao.execute("PRAGMA user_version").fetchone()[0]
+            if versao >= VERSAO_ESQUEMA:
+                return
+            # Versão 0: email gravado como veio no registro
+            linhas = conexao.execute("SELECT rowid, email FROM registros WHERE email IS NOT NULL").fetchall()
+            alteradas = [(normalizar_chave(email), rowid) for rowid, email in linhas if normalizar_chave(email) != email]
+            conexao.executemany("UPDATE registros SET email = ? WHERE rowid = ?", alteradas)
+            conexao.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+        if alteradas:
+            registrar_log(f"✓ SQLite: {len(alteradas)} emails normalizados")
+
+    def _campo_id(self, collection_name: str, campo_padrao: Optional[str]) -> Optional[str]:
+        """
+        Campo de ID da coleção. Uma coleção ainda não registrada é importada
+        do seu arquivo <colecao>_backup.json, se existir; senão é registrada
+        com o campo declarado (registrar_campo_id) ou, na primeira escrita,
+        com campo_padrao. Leituras passam campo_padrao=None e não registram
+        a coleção (retorna None enquanto o campo não estiver definido).
+        Uma coleção registrada com campo diferente do declarado é migrada
+        """
+        declarado = campo_id_declarado(collection_name)
+        campo = self._campos_id.get(collection_name)
+        if campo is not None and declarado in (None, campo):
+            return campo
+
+        with self._transacao() as conexao:
+            linha = conexao.execute(SQL_CAMPO_ID, (collection_name,)).fetchone()
+            if linha is None:
+                arquivo_json = DATABASE_DIR / f"{collection_name}_backup.json"
+                if arquivo_json.exists():
+                    with open(arquivo_json, 'r', encoding='utf-8') as f:
+                        dados = json.load(f)
+                    campo = _detectar_campo_id(dados)
+                    if declarado is not None and declarado != campo:
+                        dados, campo = _rechavear(dados, campo, declarado), declarado
+                    self._substituir(conexao, collection_name, dados, campo)
+                    self._alteradas.discard(collection_name)
+                    registrar_log(f"✓ Coleção importada para o SQLite: {collection_name} ({len(dados)} registros)")
+                elif declarado is not None or campo_padrao is not None:
+                    conexao.execute(SQL_REGISTRAR_COLECAO, (collection_name, declarado or campo_padrao))
+                else:
+                    return None
+            elif declarado is not None and linha[0] != declarado:
+                self._migrar_campo_id(conexao, collection_name, linha[0], declarado)
+            linha = conexao.execute(SQL_CAMPO_ID, (collection_name,)).fetchone()
+
+        self._campos_id[collection_name] = linha[0]
+        return linha[0]
+
+    def _migrar_campo_id(self, conexao: sqlite3.Connection, collection_name: str, campo_antigo: str, campo_novo: str) -> None:
+        """
+        Troca a chave primária de uma coleção registrada com outro campo
+        (por exemplo, "_id" fixado por uma leitura antes da primeira escrita)
+        """
+        dados = [json.loads(dados) for (dados,) in conexao.execute(SQL_LISTAR, (collection_name,))]
+        self._substituir(conexao, collection_name, _rechavear(dados, campo_antigo, campo_novo), campo_novo)
+        registrar_log(
+            f"✓ SQLite: campo de ID de {collection_name} migrado de {campo_antigo} para {campo_novo} "
+            f"({len(dados)} registros)"
+        )
+
+    def _substituir(self, conexao: sqlite3.Connection, collection_name: str, dados: List[Dict[str, Any]], campo_id: str) -> None:
+        """Substitui todo o conteúdo de uma coleção (dentro da transação atual)"""
+        conexao.execute("DELETE FROM colecoes WHERE nome = ?", (collection_name,))
+        conexao.execute(SQL_REGISTRAR_COLECAO, (collection_name, campo_id))
+        conexao.execute(SQL_LIMPAR, (collection_name,))
+
+        # IDs já existentes não podem ser reutilizados pelos registros sem ID
+        existentes = {str(item[campo_id]) for item in dados if item.get(campo_id) is not None}
+        linhas = []
+        usados = set()
+        proximo = 1
+        for item in dados:
+            item = dict(item)
+            if item.get(campo_id) is None:
+                while str(proximo) in existentes or str(proximo) in usados:
+                    proximo += 1
+                item[campo_id] = str(proximo)
+            chave = str(item[campo_id])
+            if chave in usados:
+                registrar_log(f"⚠ ID duplicado ignorado ao importar {collection_name}: {chave}")
+                continue
+            usados.add(chave)
+            linhas.append((collection_name, chave, _serializar(item), *_valores_indexados(item)))
+
+        conexao.executemany(SQL_INSERIR, linhas)
+        self._campos_id[collection_name] = campo_id
+        self._alteradas.add(collection_name)
+
+    def _resolver_id(self, conexao: sqlite3.Connection, collection_name: str, registro_id: str, campo_id: str) -> Optional[str]:
+        """
+        Converte o ID informado na chave primária da coleção. Se a consulta
+        usar um campo diferente do campo de ID, faz uma busca pelo campo
+        """
+        campo_colecao = self._campo_id(collection_name, None) or campo_id
+        if campo_id == campo_colecao:
+            return str(registro_id)
+
+        for (dados,) in conexao.execute(SQL_LISTAR, (collection_name,)):
+            item = json.loads(dados)
+            if str(item.get(campo_id)) == str(registro_id):
+                return str(item[campo_colecao])
+        return None
+
+    def _proximo_id(self, conexao: sqlite3.Connection, collection_name: str) -> str:
+        """Próximo ID numérico livre (quantidade de registros + 1 em diante)"""
+        proximo = conexao.execute(SQL_CONTAR, (collection_name,)).fetchone()[0] + 1
+        while conexao.execute(SQL_EXISTE, (collection_name, str(proximo))).fetchone():
+            proximo += 1
+        return str(proximo)
+
+    def carregar(self, collection_name: str) -> List[Dict[str, Any]]:
+        """Lista todos os registros da coleção, na ordem de inserção"""
+        self._campo_id(collection_name, None)
+        return [json.loads(dados) for (dados,) in self._conexao().execute(SQL_LISTAR, (collection_name,))]
+
+    def vazia(self, collection_name: str) -> bool:
+        """Indica se a coleção não tem registros (sem ler a coleção)"""
+        self._campo_id(collection_name, None)
+        return self._conexao().execute(SQL_ALGUM, (collection_name,)).fetchone() is None
+
+    def salvar(self, collection_name: str, data: List[Dict[str, Any]]) -> bool:
+        """Substitui a coleção inteira pelos dados informados"""
+        campo_id = self._campo_id(collection_name, _detectar_campo_id(data) if data else None)
+        with self._transacao() as conexao:
+            if campo_id is None:
+                # Coleção vazia sem campo de ID definido: nada a registrar
+                conexao.execute(SQL_LIMPAR, (collection_name,))
+                return True
+            self._substituir(conexao, collection_name, data, campo_id)
+        self._iniciar_exportador()
+        return True
+
+    def buscar(self, collection_name: str, registro_id: str, campo_id: str = "_id") -> Optional[Dict[str, Any]]:
+        """Busca um registro pela chave primária"""
+        conexao = self._conexao()
+        chave = self._resolver_id(conexao, collection_name, registro_id, campo_id)
+        if chave is None:
+            return None
+        linha = conexao.execute(SQL_BUSCAR, (collection_name, chave)).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def buscar_por_campo(self, collection_name: str, campo: str, valor: Any) -> List[Dict[str, Any]]:
+        """Busca registros por igualdade de campo (indexada para email/posicao/data)"""
+        if campo not in COLUNAS_INDEXADAS:
+            return [item for item in self.carregar(collection_name) if item.get(campo) == valor]
+
+        self._campo_id(collection_name, None)
+        sql = SQL_BUSCAR_POR_COLUNA.format(coluna=campo)
+        encontrados = [json.loads(dados) for (dados,) in self._conexao().execute(sql, (collection_name, _valor_coluna(campo, valor)))]
+        if campo in COLUNAS_NORMALIZADAS:
+            # A coluna guarda o valor normalizado: manter a igualdade exata
+            encontrados = [item for item in encontrados if item.get(campo) == valor]
+        return encontrados
+
+    def buscar_por_chave(self, collection_name: str, campo: str, chave: str,
+                         normalizar: Callable[[Any], Optional[str]] = normalizar_chave) -> List[Dict[str, Any]]:
+        """Busca registros pelo valor normalizado de uma chave única (indexada para email)"""
+        if campo in COLUNAS_NORMALIZADAS and normalizar is normalizar_chave:
+            self._campo_id(collection_name, None)
+            sql = SQL_BUSCAR_POR_COLUNA.format(coluna=campo)
+            return [json.loads(dados) for (dados,) in self._conexao().execute(sql, (collection_name, chave))]
+        return [item for item in self.carregar(collection_name) if normalizar(item.get(campo)) == chave]
+
+    def gerar_id(self, collection_name: str, campo_id: str = "_id") -> str:
+        """Gera um ID ainda não usado na coleção"""
+        self._campo_id(collection_name, campo_id)
+        return self._proximo_id(self._conexao(), collection_name)
+
+    def inserir(self, collection_name: str, registro: Dict[str, Any], campo_id: str = "_id") -> Optional[Dict[str, Any]]:
+        """Insere um registro (sem alterar o dict recebido); retorna o registro gravado, ou None se o ID já existir"""
+        campo_colecao = self._campo_id(collection_name, campo_id)
+        novo = {campo_colecao: registro.get(campo_colecao), **registro}
+        with self._transacao() as conexao:
+            if novo[campo_colecao] is None:
+                novo[campo_colecao] = self._proximo_id(conexao, collection_name)
+            try:
+                conexao.execute(SQL_INSERIR, (
+                    collection_name, str(novo[campo_colecao]), _serializar(novo),
+                    *_valores_indexados(novo)
+                ))
+            except sqlite3.IntegrityError:
+                registrar_log(f"⚠ ID duplicado ao inserir em {collection_name}: {novo[campo_colecao]}")
+                return None
+            self._alteradas.add(collection_name)
+        self._iniciar_exportador()
+        return novo
+
+    def inserir_lote(self, collection_name: str, registros: List[Dict[str, Any]],
+                     campo_id: str = "_id") -> Optional[List[Dict[str, Any]]]:
+        """
+        Insere vários registros em uma única transação (sem alterar os dicts
+        recebidos); retorna os registros gravados, ou None (e nada gravado)
+        se algum ID já existir
+        """
+        campo_colecao = self._campo_id(collection_name, campo_id)
+        novos = [{campo_colecao: registro.get(campo_colecao), **registro} for registro in registros]
+        try:
+            with self._transacao() as conexao:
+                proximo = None
+                for novo in novos:
+                    if novo[campo_colecao] is None:
+                        if proximo is None:
+                            proximo = int(self._proximo_id(conexao, collection_name))
+                        while conexao.execute(SQL_EXISTE, (collection_name, str(proximo))).fetchone():
+                            proximo += 1
+                        novo[campo_colecao] = str(proximo)
+                        proximo += 1
+                    conexao.execute(SQL_INSERIR, (
+                        collection_name, str(novo[campo_colecao]), _serializar(novo),
+                        *_valores_indexados(novo)
+                    ))
+                self._alteradas.add(collection_name)
+        except sqlite3.IntegrityError:
+            registrar_log(f"⚠ ID duplicado na importação em {collection_name}")
+            return None
+        self._iniciar_exportador()
+        return novos
+
+    def _mesclar(self, conexao: sqlite3.Connection, collection_name: str, registro_id: str,
+                 novos_dados: Dict[str, Any], campo_id: str, campo_colecao: str) -> bool:
+        """Mescla novos dados em um registro dentro de uma transação; False se não existir"""
+        chave = self._resolver_id(conexao, collection_name, registro_id, campo_id)
+        linha = conexao.execute(SQL_BUSCAR, (collection_name, chave)).fetchone() if chave else None
+        if linha is None:
+            return False
+
+        registro = {**json.loads(linha[0]), **novos_dados}
+        conexao.execute(SQL_ATUALIZAR, (
+            str(registro.get(campo_colecao, chave)), _serializar(registro),
+            *_valores_indexados(registro), collection_name, chave
+        ))
+        return True
+
+    def atualizar(self, collection_name: str, registro_id: str, novos_dados: Dict[str, Any], campo_id: str = "_id") -> bool:
+        """Mescla novos dados em um registro; False se não existir"""
+        campo_colecao = self._campo_id(collection_name, campo_id)
+        with self._transacao() as conexao:
+            if not self._mesclar(conexao, collection_name, registro_id, novos_dados, campo_id, campo_colecao):
+                return False
+            self._alteradas.add(collection_name)
+        self._iniciar_exportador()
+        return True
+
+    def atualizar_lote(self, collection_name: str, alteracoes: Dict[str, Dict[str, Any]], campo_id: str = "_id") -> int:
+        """Mescla novos dados em vários registros (ID → dados) em uma única transação; retorna quantos existiam"""
+        campo_colecao = self._campo_id(collection_name, campo_id)
+        with self._transacao() as conexao:
+            atualizados = sum(
+                self._mesclar(conexao, collection_name, registro_id, novos_dados, campo_id, campo_colecao)
+                for registro_id, novos_dados in alteracoes.items()
+            )
+            if atualizados:
+                self._alteradas.add(collection_name)
+        self._iniciar_exportador()
+        return atualizados
+
+    def deletar(self, collection_name: str, registro_id: str, campo_id: str = "_id") -> bool:
+        """Remove um registro; False se não existir"""
+        self._campo_id(collection_name, campo_id)
+        with self._transacao() as conexao:
+            chave = self._resolver_id(conexao, collection_name, registro_id, campo_id)
+            if chave is None or conexao.execute(SQL_DELETAR, (collection_name, chave)).rowcount == 0:
+                return False
+            self._alteradas.add(collection_name)
+        self._iniciar_exportador()
+        return True
+
+    def exportar_json(self) -> None:
+        """Exporta as coleções alteradas para <colecao>_backup.json"""
+        with self._escrita_lock:
+            alteradas, self._alteradas = self._alteradas, set()
+
+        for nome in sorted(alteradas):
+            try:
+                dados = self.carregar(nome)
+                _gravar_snapshot(nome, dados)
+                registrar_log(f"✓ Backup JSON exportado do SQLite: {nome} ({len(dados)} registros)")
+            except Exception as e:
+                with self._escrita_lock:
+                    self._alteradas.add(nome)
+                registrar_log(f"✗ ERRO ao exportar backup JSON {nome}: {str(e)}")
+
+    def _loop_exportador(self) -> None:
+        """Thread de exportação periódica dos backups JSON"""
+        while not self._parar.wait(INTERVALO_EXPORTACAO):
+            self.exportar_json()
+
+    def _iniciar_exportador(self) -> None:
+        """Inicia a exportação periódica após a primeira escrita"""
+        with self._escrita_lock:
+            if self._exportador is None or not self._exportador.is_alive():
+                self._parar.clear()
+                self._exportador = threading.Thread(
+                    target=self._loop_exportador, name="exportador-sqlite", daemon=True
+                )
+                self._exportador.start()
+
+    def encerrar(self) -> None:
+        """Para a exportação periódica e exporta as coleções pendentes"""
+        self._parar.set()
+        if self._exportador is not None:
+            self._exportador.join(timeout=5)
+            self._exportador = None
+        self.exportar_json()
+
+
+def migrar_backups_json(arquivo: Path = SQLITE_ARQUIVO) -> Dict[str, int]:
+    """
+    Importa todos os arquivos <colecao>_backup.json para o banco SQLite,
+    substituindo o conteúdo atual das coleções
+
+    Args:
+        arquivo (Path): Caminho do banco SQLite
+
+    Returns:
+        Dict[str, int]: Quantidade de registros importados por coleção
+
+    Example:
+        >>> migrar_backups_json()
+        {'eventos': 8, 'jogadoras': 12, 'users': 2}
+    """
+    backend = BackendSQLite(arquivo)
+    importados = {}
+
+    for arquivo_json in sorted(DATABASE_DIR.glob("*_backup.json")):
+        nome = arquivo_json.name[:-len("_backup.json")]
+        with open(arquivo_json, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+
+        campo_id = _detectar_campo_id(dados)
+        declarado = campo_id_declarado(nome)
+        if declarado is not None and declarado != campo_id:
+            dados, campo_id = _rechavear(dados, campo_id, declarado), declarado
+        with backend._transacao() as conexao:
+            backend._substituir(conexao, nome, dados, campo_id)
+        backend._alteradas.discard(nome)
+        importados[nome] = len(dados)
+        registrar_log(f"✓ Migração SQLite: {nome} ({len(dados)} registros)")
+
+    return importados
+
+
+if __name__ == "__main__":
+    for nome, quantidade in migrar_backups_json().items():
+        print(f"{nome}: {quantidade} registros importados")
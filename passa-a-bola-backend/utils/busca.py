@@ -0,0 +1,316 @@
+"""
+Busca Textual com Índice Invertido
+Tokenização sem acentos, busca por prefixo e ranqueamento por relevância,
+mantida incrementalmente pelos observadores de utils/persistence.py
+"""
+
+import heapq
+import math
+import re
+import sys
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.indices import IndiceIncremental
+
+# Palavras muito comuns que não ajudam a diferenciar registros
+STOPWORDS = frozenset({
+    "a", "o", "as", "os", "e", "de", "da", "do", "das", "dos", "em", "no", "na",
+    "nos", "nas", "um", "uma", "com", "por", "para", "que", "se", "ao", "aos"
+})
+
+# Prefixos menores que isso só casam com o termo exato
+TAMANHO_MINIMO_PREFIXO = 2
+
+# Máximo de termos considerados na expansão de um prefixo
+LIMITE_EXPANSAO = 64
+
+# Postings consultados com mais entradas que isso guardam uma lista ordenada
+# por peso (descartada quando o termo muda), para servir o top-K sem ordenar;
+# no máximo LIMITE_LISTAS_ORDENADAS listas ficam guardadas ao mesmo tempo
+LIMITE_ORDENACAO_CACHE = 32
+LIMITE_LISTAS_ORDENADAS = 4096
+
+# Peso de um termo que casou apenas por prefixo, relativo ao termo exato
+PESO_PREFIXO = 0.7
+
+_PADRAO_TOKEN = re.compile(r"[^\W_]+")
+_PADRAO_ACENTOS = re.compile("[\u0300-\u036f]")
+
+# Frequência saturada (2.2 * f / (f + 1.2)): repetir um termo ajuda, mas cada vez menos
+_SATURACAO = [2.2 * freq / (freq + 1.2) for freq in range(64)]
+
+
+def normalizar_texto(texto: str) -> str:
+    """Remove acentos e diferenças de maiúsculas ("Rozeira", "rozéira" → "rozeira")"""
+    if texto.isascii():
+        return texto.lower()
+    return _PADRAO_ACENTOS.sub("", unicodedata.normalize("NFKD", texto)).casefold()
+
+
+def tokenizar(texto: Any) -> List[str]:
+    """
+    Quebra um texto (ou lista de textos) em termos normalizados
+
+    Example:
+        >>> tokenizar("Cristiane Rozeira de Souza")
+        ['cristiane', 'rozeira', 'souza']
+    """
+    if texto is None:
+        return []
+    if isinstance(texto, (list, tuple)):
+        return [termo for item in texto for termo in _tokens(str(item))]
+    return list(_tokens(str(texto)))
+
+
+@lru_cache(maxsize=65536)
+def _tokens(texto: str) -> Tuple[str, ...]:
+    """Tokenização de um texto (bios e conquistas se repetem muito entre registros)"""
+    return tuple(
+        termo for termo in _PADRAO_TOKEN.findall(normalizar_texto(texto))
+        if len(termo) > 1 and termo not in STOPWORDS
+    )
+
+
+class IndiceTextual(IndiceIncremental):
+    """
+    Índice invertido de campos textuais de uma coleção
+
+    - postings: termo → {ID: peso do termo no registro}
+    - vocabulário: lista ordenada de termos, para expandir prefixos por
+      busca binária
+    O peso soma a frequência (saturada) do termo em cada campo multiplicada
+    pelo peso do campo; na consulta é multiplicado pelo IDF do termo.
+
+    Example:
+        >>> indice = IndiceTextual("jogadoras", campos={"nome": 3.0, "bio": 1.0})
+        >>> indice.buscar("marta", limite=10)
+        [('1', 4.21)]
+    """
+
+    def __init__(self, collection_name: str, campos: Dict[str, float], campo_id: str = "id"):
+        self.campos = dict(campos)
+        super().__init__(collection_name, campo_id)
+        self._limpar()
+
+    def _limpar(self) -> None:
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._vocabulario: List[str] = []
+        self._ordenados: Dict[str, List[Tuple[float, str]]] = {}
+        self._expansoes: Dict[str, List[str]] = {}
+        self._documentos = 0
+
+    def _pesos(self, registro: Dict[str, Any]) -> Dict[str, float]:
+        """Peso de cada termo do registro"""
+        pesos: Dict[str, float] = {}
+        for campo, peso_campo in self.campos.items():
+            for termo, freq in Counter(tokenizar(registro.get(campo))).items():
+                pesos[termo] = pesos.get(termo, 0.0) + peso_campo * _SATURACAO[min(freq, 63)]
+        return pesos
+
+    def _construir(self, dados: List[Dict[str, Any]]) -> None:
+        """Carga em lote: ordena o vocabulário uma única vez"""
+        self._limpar()
+        postings = self._postings
+        for registro in dados:
+            if registro.get(self.campo_id) is None:
+                continue
+            registro_id = str(registro[self.campo_id])
+            for termo, peso in self._pesos(registro).items():
+                ids = postings.get(termo)
+                if ids is None:
+                    ids = postings[sys.intern(termo)] = {}
+                ids[registro_id] = peso
+            self._documentos += 1
+        self._vocabulario = sorted(postings)
+
+    def _adicionar(self, registro: Dict[str, Any]) -> None:
+        if registro.get(self.campo_id) is None:
+            return
+        registro_id = str(registro[self.campo_id])
+        for termo, peso in self._pesos(registro).items():
+            ids = self._postings.get(termo)
+            if ids is None:
+                termo = sys.intern(termo)
+                ids = self._postings[termo] = {}
+                insort(self._vocabulario, termo)
+                self._expansoes.clear()
+            ids[registro_id] = peso
+            self._ordenados.pop(termo, None)
+        self._documentos += 1
+
+    def _remover(self, registro: Dict[str, Any]) -> None:
+        if registro.get(self.campo_id) is None:
+            return
+        registro_id = str(registro[self.campo_id])
+        for termo in self._pesos(registro):
+            ids = self._postings.get(termo)
+            if ids is None or ids.pop(registro_id, None) is None:
+                continue
+            self._ordenados.pop(termo, None)
+            if not ids:
+                del self._postings[termo]
+                posicao = bisect_left(self._vocabulario, termo)
+                if posicao < len(self._vocabulario) and self._vocabulario[posicao] == termo:
+                    del self._vocabulario[posicao]
+                self._expansoes.clear()
+        self._documentos = max(self._documentos - 1, 0)
+
+    def _expandir(self, token: str, prefixo: bool) -> List[Tuple[str, float]]:
+        """
+        Termos do vocabulário que casam com um token da consulta, com o
+        fator de cada um (1.0 para o termo exato, PESO_PREFIXO para prefixos)
+        """
+        termos = [(token, 1.0)] if token in self._postings else []
+        if not prefixo or len(token) < TAMANHO_MINIMO_PREFIXO:
+            return termos
+
+        expansao = self._expansoes.get(token)
+        if expansao is None:
+            inicio = bisect_left(self._vocabulario, token)
+            fim = bisect_left(self._vocabulario, token + "\uffff", inicio)
+            expansao = [t for t in islice(self._vocabulario, inicio, fim) if t != token]
+            if len(expansao) > LIMITE_EXPANSAO:
+                # Prefixo muito comum: ficar com os termos mais frequentes e
+                # guardar a escolha até o vocabulário mudar
+                expansao = heapq.nlargest(LIMITE_EXPANSAO, expansao, key=lambda t: len(self._postings[t]))
+                if len(self._expansoes) >= LIMITE_LISTAS_ORDENADAS:
+                    del self._expansoes[next(iter(self._expansoes))]
+                self._expansoes[token] = expansao
+        termos.extend((termo, PESO_PREFIXO) for termo in expansao)
+        return termos
+
+    def _idf(self, termo: str) -> float:
+        return math.log(1.0 + self._documentos / len(self._postings[termo]))
+
+    def _ordenado(self, termo: str) -> Iterable[Tuple[float, str]]:
+        """Postings do termo em ordem decrescente de peso (peso negado)"""
+        ordenado = self._ordenados.get(termo)
+        if ordenado is None:
+            ordenado = sorted((-peso, registro_id) for registro_id, peso in self._postings[termo].items())
+            if len(ordenado) > LIMITE_ORDENACAO_CACHE:
+                if len(self._ordenados) >= LIMITE_LISTAS_ORDENADAS:
+                    # Descarta a lista guardada há mais tempo
+                    del self._ordenados[next(iter(self._ordenados))]
+                self._ordenados[termo] = ordenado
+        return ordenado
+
+    def buscar(self, consulta: str, limite: int = 20) -> List[Tuple[str, float]]:
+        """
+        Busca registros que contenham todos os termos da consulta
+
+        O último termo também casa por prefixo (busca enquanto digita); os
+        demais casam pelo termo exato e, se ele não existir, por prefixo.
+
+        Args:
+            consulta (str): texto digitado
+            limite (int): quantidade máxima de resultados
+
+        Returns:
+            List[Tuple]: (ID, relevância) em ordem decrescente de relevância
+        """
+        tokens = list(dict.fromkeys(tokenizar(consulta)))
+        if not tokens or limite < 1:
+            return []
+
+        self.garantir_construido()
+        with self._lock:
+            grupos = []
+            for posicao, token in enumerate(tokens):
+                ultimo = posicao == len(tokens) - 1
+                termos = self._expandir(token, prefixo=ultimo or token not in self._postings)
+                if not termos:
+                    return []
+                grupos.append([(termo, fator * self._idf(termo)) for termo, fator in termos])
+
+            if len(grupos) == 1:
+                return self._top_grupo(grupos[0], limite)
+            return self._top_intersecao(grupos, limite)
+
+    def _top_grupo(self, grupo: List[Tuple[str, float]], limite: int) -> List[Tuple[str, float]]:
+        """
+        Top-K de um único token: intercala as listas ordenadas de cada termo
+        e para ao completar o limite, sem pontuar todos os registros
+        """
+        fluxos = [
+            ((negado * fator, registro_id) for negado, registro_id in self._ordenado(termo))
+            for termo, fator in grupo
+        ]
+        resultado = []
+        vistos = set()
+        for negado, registro_id in heapq.merge(*fluxos):
+            # A primeira ocorrência de um ID é a do termo de maior pontuação
+            if registro_id in vistos:
+                continue
+            vistos.add(registro_id)
+            resultado.append((registro_id, round(-negado, 4)))
+            if len(resultado) >= limite:
+                break
+        return resultado
+
+    def _top_intersecao(self, grupos: List[List[Tuple[str, float]]], limite: int) -> List[Tuple[str, float]]:
+        """
+        Top-K de vários tokens: intersecta os IDs a partir do token mais raro
+        (operações de conjunto) e só então pontua os registros restantes
+        """
+        grupos = sorted(grupos, key=lambda g: sum(len(self._postings[termo]) for termo, _ in g))
+
+        candidatos = set().union(*(self._postings[termo].keys() for termo, _ in grupos[0]))
+        for grupo in grupos[1:]:
+            candidatos = set().union(*(self._postings[termo].keys() & candidatos for termo, _ in grupo))
+            if not candidatos:
+                return []
+
+        # Em cada token, a pontuação é a do termo de maior peso no registro
+        pontuacoes = dict.fromkeys(candidatos, 0.0)
+        for grupo in grupos:
+            melhores_grupo: Dict[str, float] = {}
+            for termo, fator in grupo:
+                ids = self._postings[termo]
+                for registro_id in ids.keys() & candidatos:
+                    pontuacao = ids[registro_id] * fator
+                    if pontuacao > melhores_grupo.get(registro_id, 0.0):
+                        melhores_grupo[registro_id] = pontuacao
+            for registro_id, pontuacao in melhores_grupo.items():
+                pontuacoes[registro_id] += pontuacao
+
+        melhores = heapq.nsmallest(limite, pontuacoes.items(), key=lambda item: (-item[1], item[0]))
+        return [(registro_id, round(pontuacao, 4)) for registro_id, pontuacao in melhores]
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Tamanho do índice e memória aproximada ocupada (estruturas do índice;
+        os IDs são compartilhados com os registros em cache)
+
+        Returns:
+            Dict: documentos, termos, postings e memoria_bytes
+        """
+        with self._lock:
+            if not self._construido:
+                return {"construido": False, "documentos": 0, "termos": 0, "postings": 0, "memoria_bytes": 0}
+
+            postings = 0
+            memoria = sys.getsizeof(self._postings) + sys.getsizeof(self._vocabulario)
+            for termo, ids in self._postings.items():
+                postings += len(ids)
+                memoria += sys.getsizeof(termo) + sys.getsizeof(ids)
+            # Cada peso é um float próprio
+            memoria += postings * sys.getsizeof(0.0)
+            for ordenado in self._ordenados.values():
+                memoria += sys.getsizeof(ordenado) + len(ordenado) * (sys.getsizeof((0.0, "")) + sys.getsizeof(0.0))
+
+            return {
+                "construido": True,
+                "documentos": self._documentos,
+                "termos": len(self._postings),
+                "postings": postings,
+                "listas_ordenadas": len(self._ordenados),
+                "memoria_bytes": memoria
+            }
@@ -0,0 +1,243 @@
+"""
+Cache de Respostas Serializadas
+Guarda o corpo já codificado em JSON (e comprimido em gzip/brotli) das
+listagens, por versão da coleção e codificação negociada, para servir
+requisições repetidas sem serializar nem comprimir de novo
+"""
+
+import gzip
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.persistence import registrar_observador
+
+try:
+    # Opcional: sem o pacote brotli, só gzip é oferecido
+    import brotli
+except ImportError:
+    brotli = None
+
+# Memória máxima de cada cache (corpos de todas as codificações somados)
+CAPACIDADE_CACHE_RESPOSTAS = int(os.getenv("CACHE_RESPOSTAS_MB", "64")) * 1024 * 1024
+
+# Corpos menores que isso não compensam a compressão
+TAMANHO_MINIMO_COMPRESSAO = 1024
+
+NIVEL_GZIP = 6
+QUALIDADE_BROTLI = 5
+
+
+def _serializar(conteudo: Any) -> bytes:
+    """JSON com as mesmas opções do JSONResponse do FastAPI"""
+    return json.dumps(
+        conteudo, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _comprimir(corpo: bytes, codificacao: str) -> bytes:
+    """Comprime o corpo em "br" ou "gzip"""
+    if codificacao == "br":
+        return brotli.compress(corpo, quality=QUALIDADE_BROTLI)
+    return gzip.compress(corpo, compresslevel=NIVEL_GZIP, mtime=0)
+
+
+def negociar_codificacao(accept_encoding: Optional[str]) -> str:
+    """
+    Escolhe a codificação da resposta a partir do Accept-Encoding
+
+    Args:
+        accept_encoding (str): Valor do header (ex.: "gzip, deflate, br")
+
+    Returns:
+        str: "br", "gzip" ou "identity"
+
+    Example:
+        >>> negociar_codificacao("gzip;q=0.8, br")
+        'br'
+    """
+    if not accept_encoding:
+        return "identity"
+
+    suportadas = ("br", "gzip") if brotli is not None else ("gzip",)
+    pesos: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        nome, _, parametros = item.strip().partition(";")
+        nome = nome.strip().lower()
+        peso = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                peso = float(parametros[2:])
+            except ValueError:
+                peso = 0.0
+        pesos[nome] = peso
+
+    melhor, melhor_peso = "identity", 0.0
+    for codificacao in suportadas:
+        peso = pesos.get(codificacao, pesos.get("*", 0.0))
+        if peso > melhor_peso:
+            melhor, melhor_peso = codificacao, peso
+    return melhor
+
+
+class CacheRespostas:
+    """
+    Corpos de resposta prontos de uma coleção, por variante da requisição
+    (query string) e codificação
+
+    Cada entrada guarda a versão da coleção (versao_colecao) com que foi
+    gerada: uma versão diferente é um miss, e qualquer mutação da coleção
+    descarta as entradas dela na hora (observador da persistência). O
+    JSON é gerado uma vez por versão e cada compressão uma vez por
+    codificação pedida; a memória total é limitada, com descarte LRU.
+
+    Example:
+        >>> cache = CacheRespostas("jogadoras")
+        >>> cache.responder(request, versao, lambda: (carregar_backup_json("jogadoras"), {}))
+    """
+
+    def __init__(self, collection_name: str, capacidade_bytes: int = CAPACIDADE_CACHE_RESPOSTAS):
+        self.collection_name = collection_name
+        self.capacidade_bytes = capacidade_bytes
+        self._entradas: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._tamanho = 0
+        self._lock = threading.Lock()
+        self._gerando: Dict[Hashable, threading.Lock] = {}
+        self._estatisticas = {"hits": 0, "misses": 0, "compressoes": 0, "descartes": 0, "invalidacoes": 0}
+        registrar_observador(collection_name, self._invalidar)
+
+    def _invalidar(self, operacao: str, antigo: Optional[Dict[str, Any]], novo: Optional[Dict[str, Any]]) -> None:
+        """Observador: qualquer mutação torna todas as entradas obsoletas"""
+        with self._lock:
+            if self._entradas:
+                self._entradas.clear()
+                self._tamanho = 0
+                self._estatisticas["invalidacoes"] += 1
+
+    def _guardar(self, chave: Hashable, entrada: Dict[str, Any], codificacao: str, corpo: bytes) -> None:
+        """Adiciona um corpo à entrada e descarta as menos usadas se passar da capacidade"""
+        with self._lock:
+            atual = self._entradas.get(chave)
+            if atual is not entrada:
+                # Entrada nova começa sempre pelo corpo sem compressão
+                if codificacao != "identity" or len(corpo) > self.capacidade_bytes:
+                    return
+                if atual is not None:
+                    self._tamanho -= sum(len(c) for c in atual["corpos"].values())
+                self._entradas[chave] = entrada
+            elif codificacao in entrada["corpos"]:
+                return
+            entrada["corpos"][codificacao] = corpo
+            self._tamanho += len(corpo)
+            self._entradas.move_to_end(chave)
+
+            while self._tamanho > self.capacidade_bytes and self._entradas:
+                _, descartada = self._entradas.popitem(last=False)
+                self._tamanho -= sum(len(c) for c in descartada["corpos"].values())
+                self._estatisticas["descartes"] += 1
+
+    def _buscar(self, chave: Hashable, versao: str, codificacao: str) -> Tuple[Optional[Dict[str, Any]], Optional[bytes], str]:
+        """Entrada da versão atual (ou None), o corpo na codificação (ou None) e a codificação usada"""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada["versao"] != versao:
+                return None, None, codificacao
+            self._entradas.move_to_end(chave)
+            if len(entrada["corpos"]["identity"]) < TAMANHO_MINIMO_COMPRESSAO:
+                codificacao = "identity"
+            return entrada, entrada["corpos"].get(codificacao), codificacao
+
+    def _gerar(self, chave: Hashable, versao: str, codificacao: str,
+               montar: Callable[[], Tuple[Any, Dict[str, str]]]) -> Tuple[Dict[str, Any], bytes, str]:
+        """Miss: serializa (se a versão ainda não tem entrada) e comprime"""
+        # Um único gerador por variante; os demais esperam e reaproveitam
+        with self._lock:
+            gerando = self._gerando.setdefault(chave, threading.Lock())
+        try:
+            with gerando:
+                entrada, corpo, codificacao = self._buscar(chave, versao, codificacao)
+                if corpo is not None:
+                    with self._lock:
+                        self._estatisticas["hits"] += 1
+                    return entrada, corpo, codificacao
+
+                with self._lock:
+                    self._estatisticas["misses"] += 1
+                if entrada is None:
+                    conteudo, extras = montar()
+                    entrada = {"versao": versao, "cabecalhos": dict(extras), "corpos": {}}
+                    identidade = _serializar(conteudo)
+                    self._guardar(chave, entrada, "identity", identidade)
+                else:
+                    identidade = entrada["corpos"]["identity"]
+
+                if codificacao == "identity" or len(identidade) < TAMANHO_MINIMO_COMPRESSAO:
+                    return entrada, identidade, "identity"
+
+                corpo = _comprimir(identidade, codificacao)
+                with self._lock:
+                    self._estatisticas["compressoes"] += 1
+                self._guardar(chave, entrada, codificacao, corpo)
+                return entrada, corpo, codificacao
+        finally:
+            with self._lock:
+                if self._gerando.get(chave) is gerando and not gerando.locked():
+                    del self._gerando[chave]
+
+    def responder(self, request: Request, versao: str,
+                  montar: Callable[[], Tuple[Any, Dict[str, str]]],
+                  cabecalhos: Optional[Dict[str, str]] = None) -> Response:
+        """
+        Resposta pronta para a requisição, do cache ou montada agora
+
+        Args:
+            request (Request): Requisição (query string e Accept-Encoding)
+            versao (str): Versão atual da coleção (lida antes dos dados)
+            montar (Callable): Retorna (conteúdo JSON, headers extras da
+                resposta, ex.: X-Total-Count); só é chamada em um miss
+            cabecalhos (Dict, optional): Headers já definidos pela rota
+                (ex.: ETag), copiados para a resposta
+
+        Returns:
+            Response: corpo JSON já codificado
+        """
+        chave = tuple(sorted(request.query_params.multi_items()))
+        codificacao = negociar_codificacao(request.headers.get("accept-encoding"))
+
+        entrada, corpo, codificacao = self._buscar(chave, versao, codificacao)
+        if corpo is None:
+            entrada, corpo, codificacao = self._gerar(chave, versao, codificacao, montar)
+        else:
+            with self._lock:
+                self._estatisticas["hits"] += 1
+
+        headers = dict(cabecalhos or {})
+        headers.update(entrada["cabecalhos"])
+        headers["Vary"] = "Accept-Encoding"
+        if codificacao != "identity":
+            headers["Content-Encoding"] = codificacao
+        return Response(content=corpo, media_type="application/json", headers=headers)
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Contadores do cache
+
+        Returns:
+            Dict: hits, misses, compressões feitas, entradas descartadas
+            por capacidade, invalidações por mutação, entradas e bytes
+        """
+        with self._lock:
+            estatisticas = dict(self._estatisticas)
+            estatisticas["entradas"] = len(self._entradas)
+            estatisticas["bytes"] = self._tamanho
+            estatisticas["capacidade_bytes"] = self.capacidade_bytes
+        return estatisticas
@@ -0,0 +1,89 @@
+"""
+GET Condicional (ETag / Last-Modified)
+Cabeçalhos de validação a partir das versões mantidas em utils/persistence.py
+e resposta 304 Not Modified quando o cliente já tem a versão atual
+"""
+
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+
+def etag_versao(versao: str) -> str:
+    """
+    ETag (fraco) de uma versão
+
+    Fraco porque a mesma versão pode ser servida com codificações ou
+    seleções de campos diferentes
+    """
+    return f'W/"{versao}"'
+
+
+def _etag_corresponde(if_none_match: str, etag: str) -> bool:
+    """Compara If-None-Match com o ETag atual (comparação fraca, aceita "*")"""
+    atual = etag[2:] if etag.startswith("W/") else etag
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*":
+            return True
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato == atual:
+            return True
+    return False
+
+
+def _nao_modificado_desde(if_modified_since: str, modificado: float) -> bool:
+    """True se a data de If-Modified-Since não é anterior à última modificação"""
+    try:
+        data = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # Last-Modified tem resolução de segundos
+    return int(modificado) <= data.timestamp()
+
+
+def resposta_condicional(request: Request, response: Response,
+                         versao: str, modificado: float) -> Optional[Response]:
+    """
+    Define ETag, Last-Modified e Cache-Control na resposta e verifica os
+    cabeçalhos condicionais da requisição
+
+    If-None-Match tem precedência; If-Modified-Since só é considerado na
+    ausência dele. Deve ser chamada antes de carregar os dados, para que
+    uma requisição não modificada não custe leitura nem serialização.
+
+    Args:
+        request (Request): Requisição recebida
+        response (Response): Resposta da rota (recebe os cabeçalhos)
+        versao (str): Versão retornada por versao_colecao
+        modificado (float): Instante da última modificação (epoch)
+
+    Returns:
+        Response: 304 Not Modified a ser retornado pela rota, ou None se o
+        cliente não tem a versão atual
+
+    Example:
+        >>> nao_modificado = resposta_condicional(request, response, *versao_colecao("jogadoras"))
+        >>> if nao_modificado is not None:
+        ...     return nao_modificado
+    """
+    cabecalhos = {
+        "ETag": etag_versao(versao),
+        "Last-Modified": formatdate(modificado, usegmt=True),
+        # Pode guardar, mas deve revalidar a cada uso (If-None-Match)
+        "Cache-Control": "no-cache",
+    }
+    response.headers.update(cabecalhos)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        nao_modificado = _etag_corresponde(if_none_match, cabecalhos["ETag"])
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        nao_modificado = if_modified_since is not None and _nao_modificado_desde(if_modified_since, modificado)
+
+    if nao_modificado:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+    return None
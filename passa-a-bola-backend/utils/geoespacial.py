@@ -0,0 +1,305 @@
+"""
+Índice Geoespacial (Grade Hierárquica)
+Localiza os registros mais próximos de um ponto (latitude/longitude) sem
+varrer a coleção, mantido incrementalmente pelos observadores de
+utils/persistence.py
+"""
+
+import heapq
+import math
+import sys
+from operator import itemgetter
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.indices import IndiceIncremental, chave_id, normalizar_valor, numero
+
+# Raio médio da Terra (km)
+RAIO_TERRA_KM = 6371.0088
+_MEIO_GRAU_RAD = math.pi / 360
+
+# Lado das células da grade: o nível mais fino guarda os registros; cada
+# nível acima agrupa 4×4 células do anterior e guarda só as filhas ocupadas
+# (0,01° ≈ 1,1 km; 40,96° cobre o Brasil em poucas células)
+LADO_CELULA_GRAUS = 0.01
+FATOR_NIVEL = 4
+QUANTIDADE_NIVEIS = 7
+
+
+def _fator_haversine(distancia_km: float) -> float:
+    """
+    Distância → termo "a" da fórmula de haversine (sin²(d / 2R))
+    O termo cresce com a distância, então as comparações são feitas nele,
+    sem raiz nem arco-seno por candidato
+    """
+    return math.sin(min(distancia_km / (2 * RAIO_TERRA_KM), math.pi / 2)) ** 2
+
+
+def _distancia_km(fator: float) -> float:
+    """Termo "a" da fórmula de haversine → distância em km"""
+    return 2 * RAIO_TERRA_KM * math.asin(math.sqrt(min(max(fator, 0.0), 1.0)))
+
+
+class IndiceGeoespacial(IndiceIncremental):
+    """
+    Vizinhos mais próximos de um ponto, com raio máximo e filtros
+
+    Os registros com latitude/longitude válidas ficam em uma grade
+    hierárquica (quadtree de grade fixa). A consulta é uma busca pelo
+    melhor primeiro: as células ocupadas entram em uma fila de prioridade
+    pelo limite inferior da distância ao ponto; uma célula grande é
+    trocada pelas filhas ocupadas e uma célula do nível mais fino tem os
+    registros comparados. A busca para quando a próxima célula não pode
+    estar mais perto que o k-ésimo resultado (ou que o raio). Áreas
+    vazias e regiões densas custam o mesmo: só as células ocupadas perto
+    do ponto são visitadas.
+
+    Example:
+        >>> indice = IndiceGeoespacial("eventos", filtros=["tipo", "categoria"])
+        >>> indice.proximos(-23.55, -46.63, limite=5, raio_km=20, filtros={"tipo": "Peneira"})
+        [('1', 15.412), ('4', 18.07)]
+    """
+
+    def __init__(self, collection_name: str, campo_latitude: str = "latitude",
+                 campo_longitude: str = "longitude", filtros: Iterable[str] = (),
+                 campo_id: str = "id"):
+        self.campo_latitude = campo_latitude
+        self.campo_longitude = campo_longitude
+        self.campos_filtro = tuple(filtros)
+        self.lados = tuple(LADO_CELULA_GRAUS * FATOR_NIVEL ** nivel for nivel in range(QUANTIDADE_NIVEIS))
+        # Por nível: (primeira linha, cosseno da latitude mais afastada do
+        # equador em cada linha), para o limite inferior das distâncias
+        self._cos_linhas = []
+        for lado in self.lados:
+            primeira, ultima = math.floor(-90 / lado), math.floor(90 / lado)
+            self._cos_linhas.append((primeira, [
+                max(0.0, min(math.cos(math.radians(min(abs(borda), 90.0))) for borda in (linha * lado, (linha + 1) * lado)))
+                for linha in range(primeira, ultima + 1)
+            ]))
+        super().__init__(collection_name, campo_id)
+        self._limpar()
+
+    def _limpar(self) -> None:
+        # ID → (lat, lon, lat em radianos, lon em radianos, cos(lat), valores dos filtros, célula)
+        self._entradas: Dict[str, Tuple[float, float, float, float, float, tuple, Tuple[int, int]]] = {}
+        # Nível mais fino: (linha, coluna) → ID → entrada (a mesma de _entradas)
+        self._folhas: Dict[Tuple[int, int], Dict[str, tuple]] = {}
+        # Níveis acima (do mais fino ao mais grosso): (linha, coluna) → filhas ocupadas
+        self._filhas: List[Dict[Tuple[int, int], set]] = [{} for _ in range(QUANTIDADE_NIVEIS - 1)]
+
+    def _filtros_registro(self, registro: Dict[str, Any]) -> tuple:
+        """Valores normalizados dos campos de filtro (booleanos ficam como estão)"""
+        return tuple(
+            valor if isinstance(valor, bool) else normalizar_valor(valor)
+            for valor in (registro.get(campo) for campo in self.campos_filtro)
+        )
+
+    def _adicionar(self, registro: Dict[str, Any]) -> None:
+        if registro.get(self.campo_id) is None:
+            return
+        latitude = numero(registro.get(self.campo_latitude))
+        longitude = numero(registro.get(self.campo_longitude))
+        if latitude is None or longitude is None or not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return
+
+        registro_id = str(registro[self.campo_id])
+        if registro_id in self._entradas:
+            self._remover(registro)
+        linha = math.floor(latitude / LADO_CELULA_GRAUS)
+        coluna = math.floor(longitude / LADO_CELULA_GRAUS)
+        lat_rad = math.radians(latitude)
+        entrada = self._entradas[registro_id] = (
+            latitude, longitude, lat_rad, math.radians(longitude), math.cos(lat_rad),
+            self._filtros_registro(registro), (linha, coluna)
+        )
+
+        folha = self._folhas.get((linha, coluna))
+        if folha is None:
+            folha = self._folhas[(linha, coluna)] = {}
+            # Célula nova: registrar nos níveis acima até achar um que já a conheça
+            celula = (linha, coluna)
+            for filhas in self._filhas:
+                pai = (celula[0] // FATOR_NIVEL, celula[1] // FATOR_NIVEL)
+                ocupadas = filhas.get(pai)
+                if ocupadas is not None:
+                    ocupadas.add(celula)
+                    break
+                filhas[pai] = {celula}
+                celula = pai
+        folha[registro_id] = entrada
+
+    def _remover(self, registro: Dict[str, Any]) -> None:
+        if registro.get(self.campo_id) is None:
+            return
+        registro_id = str(registro[self.campo_id])
+        entrada = self._entradas.pop(registro_id, None)
+        if entrada is None:
+            return
+
+        linha, coluna = entrada[6]
+        folha = self._folhas[(linha, coluna)]
+        del folha[registro_id]
+        if not folha:
+            del self._folhas[(linha, coluna)]
+            # Célula vazia: retirar dos níveis acima enquanto eles esvaziarem
+            celula = (linha, coluna)
+            for filhas in self._filhas:
+                pai = (celula[0] // FATOR_NIVEL, celula[1] // FATOR_NIVEL)
+                ocupadas = filhas[pai]
+                ocupadas.discard(celula)
+                if ocupadas:
+                    break
+                del filhas[pai]
+                celula = pai
+
+    def _fator_minimo(self, latitude: float, longitude: float, cos_lat: float,
+                      nivel: int, linha: int, coluna: int) -> float:
+        """
+        Limite inferior (termo "a") da distância do ponto a qualquer ponto
+        da célula: menores diferenças de latitude e de longitude possíveis,
+        com o cosseno da latitude mais afastada do equador dentro da célula
+        """
+        lado = self.lados[nivel]
+        lat_minima = linha * lado
+        if latitude < lat_minima:
+            diferenca_lat = lat_minima - latitude
+        else:
+            diferenca_lat = max(latitude - lat_minima - lado, 0.0)
+
+        lon_minima = coluna * lado
+        if lon_minima <= longitude <= lon_minima + lado:
+            diferenca_lon = 0.0
+        else:
+            # Menor diferença considerando a volta no antimeridiano
+            diferenca_lon = min((lon_minima - longitude) % 360.0, (longitude - lon_minima - lado) % 360.0, 180.0)
+
+        primeira_linha, cossenos = self._cos_linhas[nivel]
+        seno_lat = math.sin(diferenca_lat * _MEIO_GRAU_RAD)
+        seno_lon = math.sin(diferenca_lon * _MEIO_GRAU_RAD)
+        return seno_lat * seno_lat + cos_lat * cossenos[linha - primeira_linha] * seno_lon * seno_lon
+
+    def proximos(self, latitude: float, longitude: float, limite: int = 20,
+                 raio_km: Optional[float] = None,
+                 filtros: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """
+        Registros mais próximos de um ponto, do mais perto para o mais longe
+
+        Args:
+            latitude (float): Latitude do ponto (graus)
+            longitude (float): Longitude do ponto (graus)
+            limite (int): Quantidade máxima de registros (k)
+            raio_km (float, optional): Distância máxima; sem raio, retorna
+                os k mais próximos a qualquer distância
+            filtros (Dict, optional): campo de filtro → valor exigido
+                (None ignora o filtro)
+
+        Returns:
+            List[Tuple]: (ID, distância em km)
+        """
+        self.garantir_construido()
+        posicoes = []
+        exigidos = []
+        for posicao, campo in enumerate(self.campos_filtro):
+            valor = (filtros or {}).get(campo)
+            if valor is not None:
+                posicoes.append(posicao)
+                exigidos.append(valor if isinstance(valor, bool) else normalizar_valor(valor))
+        # Compara só os campos filtrados, de uma vez (itemgetter em C)
+        seletor = itemgetter(*posicoes) if posicoes else None
+        exigido = tuple(exigidos) if len(exigidos) > 1 else (exigidos[0] if exigidos else None)
+
+        lat_rad = math.radians(latitude)
+        lon_rad = math.radians(longitude)
+        cos_lat = math.cos(lat_rad)
+        fator_minimo = self._fator_minimo
+        sin = math.sin
+        heappush, heappop, heapreplace = heapq.heappush, heapq.heappop, heapq.heapreplace
+
+        with self._lock:
+            if limite <= 0 or not self._entradas:
+                return []
+
+            fator_raio = _fator_haversine(raio_km) if raio_km is not None else 1.0
+            fator_corte = fator_raio
+            # Heap de máximo (fator negativo): os k melhores até agora
+            melhores: List[Tuple[float, str]] = []
+            folhas = self._folhas
+            niveis = [folhas] + self._filhas
+            lados = self.lados
+            cos_linhas = self._cos_linhas
+
+            # Fila de células: (limite inferior, nível, linha, coluna)
+            nivel_topo = len(niveis) - 1
+            fila = []
+            for linha, coluna in niveis[nivel_topo]:
+                fator = fator_minimo(latitude, longitude, cos_lat, nivel_topo, linha, coluna)
+                if fator <= fator_corte:
+                    fila.append((fator, nivel_topo, linha, coluna))
+            heapq.heapify(fila)
+
+            while fila:
+                fator, nivel, linha, coluna = heappop(fila)
+                if fator > fator_corte:
+                    break
+
+                if nivel:
+                    # Trocar a célula pelas filhas ocupadas (mesmo cálculo de
+                    # _fator_minimo, repetido aqui por ser o laço mais quente)
+                    nivel -= 1
+                    lado = lados[nivel]
+                    primeira_linha, cossenos = cos_linhas[nivel]
+                    for linha_filha, coluna_filha in niveis[nivel + 1][(linha, coluna)]:
+                        lat_minima = linha_filha * lado
+                        if latitude < lat_minima:
+                            diferenca_lat = lat_minima - latitude
+                        elif latitude > lat_minima + lado:
+                            diferenca_lat = latitude - lat_minima - lado
+                        else:
+                            diferenca_lat = 0.0
+                        lon_minima = coluna_filha * lado
+                        if lon_minima <= longitude <= lon_minima + lado:
+                            diferenca_lon = 0.0
+                        else:
+                            diferenca_lon = min((lon_minima - longitude) % 360.0, (longitude - lon_minima - lado) % 360.0, 180.0)
+                        seno_lat = sin(diferenca_lat * _MEIO_GRAU_RAD)
+                        seno_lon = sin(diferenca_lon * _MEIO_GRAU_RAD)
+                        fator = seno_lat * seno_lat + cos_lat * cossenos[linha_filha - primeira_linha] * seno_lon * seno_lon
+                        if fator <= fator_corte:
+                            heappush(fila, (fator, nivel, linha_filha, coluna_filha))
+                    continue
+
+                for registro_id, entrada in folhas[(linha, coluna)].items():
+                    if seletor is not None and seletor(entrada[5]) != exigido:
+                        continue
+                    seno_lat = sin((entrada[2] - lat_rad) / 2)
+                    seno_lon = sin((entrada[3] - lon_rad) / 2)
+                    fator = seno_lat * seno_lat + cos_lat * entrada[4] * seno_lon * seno_lon
+                    if fator > fator_corte:
+                        continue
+                    if len(melhores) < limite:
+                        heappush(melhores, (-fator, registro_id))
+                        if len(melhores) == limite:
+                            fator_corte = min(fator_raio, -melhores[0][0])
+                    else:
+                        heapreplace(melhores, (-fator, registro_id))
+                        fator_corte = -melhores[0][0]
+
+        resultado = sorted((-fator, chave_id(registro_id), registro_id) for fator, registro_id in melhores)
+        return [(registro_id, round(_distancia_km(fator), 3)) for fator, _, registro_id in resultado]
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Tamanho do índice
+
+        Returns:
+            Dict: registros indexados e células ocupadas por nível
+        """
+        self.garantir_construido()
+        with self._lock:
+            niveis = [self._folhas] + self._filhas
+            return {
+                "registros": len(self._entradas),
+                "celulas": {f"{lado:g}": len(celulas) for lado, celulas in zip(self.lados, niveis)}
+            }
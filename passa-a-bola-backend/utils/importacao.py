@@ -0,0 +1,216 @@
+"""
+Leitura em Streaming para Importação em Lote
+Lê um corpo NDJSON (um objeto por linha) ou um array JSON à medida que
+chega, sem carregar o corpo inteiro em memória. O corpo é recebido no
+loop de eventos; a decodificação e a validação de cada lote acumulado
+rodam na fila de leituras
+"""
+
+import codecs
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from utils.persistence_async import executar_leitura
+
+# Maior registro aceito (o buffer de leitura nunca passa muito disso)
+TAMANHO_MAXIMO_REGISTRO = 1024 * 1024
+
+# Bytes do corpo acumulados no loop de eventos antes de cada lote de
+# decodificação e validação na fila de leituras
+TAMANHO_LOTE = 256 * 1024
+
+# Máximo de erros detalhados na resposta (os demais só são contados)
+LIMITE_ERROS_REPORTADOS = 1000
+
+_decodificador_json = json.JSONDecoder()
+_ESPACOS = " \t\r\n"
+
+
+class ErroImportacao(ValueError):
+    """Corpo da importação malformado a ponto de não ser possível continuar"""
+
+
+class _LeitorRegistros:
+    """
+    Leitura incremental (síncrona) de um corpo NDJSON ou array JSON
+
+    Recebe o corpo em partes de bytes, na ordem, e devolve os registros
+    completados por cada parte. O formato é detectado pelo primeiro
+    caractere: "[" indica array JSON; qualquer outro, NDJSON. No NDJSON uma
+    linha inválida é reportada e a leitura continua; no array, um elemento
+    inválido interrompe a leitura.
+    """
+
+    def __init__(self):
+        self._decodificador = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._formato = None
+        self._numero = 0
+
+    def alimentar(self, parte: bytes, fim: bool = False) -> List[Tuple[int, Any, str]]:
+        """
+        Processa mais uma parte do corpo (fim=True na última)
+
+        Returns:
+            List: (número da linha/elemento, objeto lido ou None, mensagem de erro ou "")
+
+        Raises:
+            ErroImportacao: se o array JSON estiver malformado ou um registro
+            passar de TAMANHO_MAXIMO_REGISTRO
+        """
+        lidos = []
+        buffer = self._buffer + self._decodificador.decode(parte, final=fim)
+
+        if self._formato is None:
+            buffer = buffer.lstrip(_ESPACOS + "\ufeff")
+            if not buffer:
+                self._buffer = buffer
+                return lidos
+            self._formato = "array" if buffer[0] == "[" else "ndjson"
+            if self._formato == "array":
+                buffer = buffer[1:]
+
+        if self._formato == "fim":
+            # Depois do "]" final só pode haver espaços
+            if buffer.strip(_ESPACOS):
+                raise ErroImportacao("Conteúdo após o fim do array JSON")
+            buffer = ""
+        elif self._formato == "ndjson":
+            linhas = buffer.split("\n")
+            # A última parte pode ser uma linha incompleta
+            buffer = "" if fim else linhas.pop()
+            for linha in linhas:
+                self._numero += 1
+                if not linha.strip():
+                    continue
+                try:
+                    lidos.append((self._numero, json.loads(linha), ""))
+                except json.JSONDecodeError as e:
+                    lidos.append((self._numero, None, f"JSON inválido: {e.msg}"))
+        else:
+            posicao = 0
+            while True:
+                # Pular espaços e vírgulas entre elementos
+                while posicao < len(buffer) and buffer[posicao] in _ESPACOS + ",":
+                    posicao += 1
+                if posicao == len(buffer):
+                    break
+                if buffer[posicao] == "]":
+                    self._formato = "fim"
+                    # Depois do "]" final só pode haver espaços
+                    if buffer[posicao + 1:].strip(_ESPACOS):
+                        raise ErroImportacao("Conteúdo após o fim do array JSON")
+                    posicao = len(buffer)
+                    break
+                try:
+                    registro, posicao = _decodificador_json.raw_decode(buffer, posicao)
+                except json.JSONDecodeError as e:
+                    if fim:
+                        raise ErroImportacao(f"Elemento {self._numero + 1} do array inválido: {e.msg}")
+                    # Elemento incompleto: esperar a próxima parte
+                    break
+                self._numero += 1
+                lidos.append((self._numero, registro, ""))
+            buffer = buffer[posicao:]
+            if fim and self._formato == "array":
+                raise ErroImportacao("Array JSON sem o ']' final")
+
+        if len(buffer) > TAMANHO_MAXIMO_REGISTRO:
+            raise ErroImportacao(f"Registro {self._numero + 1} maior que {TAMANHO_MAXIMO_REGISTRO} bytes")
+        self._buffer = buffer
+        return lidos
+
+
+async def ler_registros(partes: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any, str]]:
+    """
+    Lê registros de um corpo NDJSON ou array JSON recebido em partes
+
+    O formato é detectado pelo primeiro caractere: "[" indica array JSON;
+    qualquer outro, NDJSON. No NDJSON uma linha inválida é reportada e a
+    leitura continua; no array, um elemento inválido interrompe a leitura.
+    A decodificação roda no loop de eventos: para corpos grandes, use
+    validar_registros, que a faz na fila de leituras.
+
+    Args:
+        partes: iterador assíncrono de bytes (ex.: request.stream())
+
+    Yields:
+        Tuple: (número da linha/elemento, objeto lido ou None, mensagem de erro ou "")
+
+    Raises:
+        ErroImportacao: se o array JSON estiver malformado ou um registro
+        passar de TAMANHO_MAXIMO_REGISTRO
+
+    Example:
+        >>> async for numero, registro, erro in ler_registros(request.stream()):
+        ...     print(numero, registro, erro)
+    """
+    leitor = _LeitorRegistros()
+    async for parte in partes:
+        for lido in leitor.alimentar(parte):
+            yield lido
+    for lido in leitor.alimentar(b"", fim=True):
+        yield lido
+
+
+async def validar_registros(partes: AsyncIterator[bytes], modelo: Type[BaseModel],
+                            montar: Callable[[BaseModel], Dict[str, Any]],
+                            limite_erros: int = LIMITE_ERROS_REPORTADOS) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], int]:
+    """
+    Lê e valida cada registro do corpo com o modelo Pydantic
+
+    O corpo é recebido no loop de eventos e acumulado em lotes de
+    TAMANHO_LOTE bytes; a decodificação JSON, a validação e a montagem de
+    cada lote rodam na fila de leituras, um lote por vez.
+
+    Args:
+        partes: iterador assíncrono de bytes (ex.: request.stream())
+        modelo: modelo Pydantic de criação (ex.: JogadoraCreate)
+        montar: converte o modelo validado no registro a gravar
+        limite_erros (int): máximo de erros detalhados na resposta
+
+    Returns:
+        Tuple: (registros válidos, erros por linha, total de linhas com erro)
+
+    Raises:
+        ErroImportacao: se o corpo não puder ser lido até o fim
+        PersistenciaSaturada: se a fila de leituras estiver cheia
+    """
+    leitor = _LeitorRegistros()
+    registros = []
+    erros = []
+    contagem = {"erros": 0}
+
+    def validar_lote(lote: bytes, fim: bool) -> None:
+        for numero, dados, erro in leitor.alimentar(lote, fim):
+            if not erro:
+                if not isinstance(dados, dict):
+                    erro = "Registro deve ser um objeto JSON"
+                else:
+                    try:
+                        registros.append(montar(modelo(**dados)))
+                        continue
+                    except ValidationError as e:
+                        erro = "; ".join(
+                            f"{'.'.join(str(parte) for parte in detalhe['loc']) or 'registro'}: {detalhe['msg']}"
+                            for detalhe in e.errors()
+                        )
+
+            contagem["erros"] += 1
+            if len(erros) < limite_erros:
+                erros.append({"linha": numero, "erro": erro})
+
+    pendentes = []
+    tamanho = 0
+    async for parte in partes:
+        pendentes.append(parte)
+        tamanho += len(parte)
+        if tamanho >= TAMANHO_LOTE:
+            await executar_leitura(validar_lote, b"".join(pendentes), False)
+            pendentes = []
+            tamanho = 0
+    await executar_leitura(validar_lote, b"".join(pendentes), True)
+
+    return registros, erros, contagem["erros"]
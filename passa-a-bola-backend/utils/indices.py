@@ -0,0 +1,902 @@
+"""
+Índices em Memória Mantidos Incrementalmente
+Estruturas derivadas das coleções (filtros, ordenação, paginação) que são
+montadas uma vez e atualizadas a cada inserção/atualização/remoção,
+através dos observadores de utils/persistence.py
+"""
+
+import base64
+import json
+import os
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+from calendar import monthrange
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Callable
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.persistence import carregar_backup_json, registrar_observador, colecoes_lock
+
+
+class CursorInvalido(ValueError):
+    """Cursor de paginação malformado"""
+
+
+def chave_id(registro_id: Any) -> Tuple[int, int, str]:
+    """Chave de ordenação de IDs: numéricos em ordem numérica, depois textuais"""
+    texto = str(registro_id)
+    if texto.isdigit():
+        return (0, int(texto), "")
+    return (1, 0, texto)
+
+
+def normalizar_valor(valor: Any) -> Optional[str]:
+    """Normaliza valores de filtro por igualdade (sem diferenciar maiúsculas)"""
+    if valor is None:
+        return None
+    return str(valor).strip().casefold()
+
+
+def numero(valor: Any) -> Optional[float]:
+    """Converte um valor numérico do registro (None se ausente ou inválido)"""
+    try:
+        return float(valor) if valor is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def codificar_cursor(valores: List[Any]) -> str:
+    """Codifica a posição da última entrada de uma página em um cursor opaco"""
+    texto = json.dumps(valores, separators=(",", ":"))
+    return base64.urlsafe_b64encode(texto.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> List[Any]:
+    """Decodifica um cursor gerado por codificar_cursor"""
+    try:
+        preenchido = cursor + "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(preenchido.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise CursorInvalido("Cursor inválido")
+    if not isinstance(valores, list):
+        raise CursorInvalido("Cursor inválido")
+    return valores
+
+
+class IndiceIncremental:
+    """
+    Base para estruturas derivadas de uma coleção
+
+    A estrutura é montada na primeira consulta (garantir_construido) e
+    depois atualizada a cada mutação notificada pela persistência. Quando a
+    coleção é substituída ou relida do disco, é remontada na próxima consulta.
+    Subclasses implementam _limpar, _adicionar e _remover.
+    """
+
+    def __init__(self, collection_name: str, campo_id: str = "id"):
+        self.collection_name = collection_name
+        self.campo_id = campo_id
+        self._lock = threading.RLock()
+        self._construido = False
+        registrar_observador(collection_name, self._ao_alterar)
+
+    def _limpar(self) -> None:
+        raise NotImplementedError
+
+    def _adicionar(self, registro: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def _remover(self, registro: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def _ao_alterar(self, operacao: str, antigo: Optional[Dict[str, Any]], novo: Optional[Dict[str, Any]]) -> None:
+        """Observador de mutações da coleção"""
+        with self._lock:
+            if operacao == "recarregar":
+                self._construido = False
+                return
+            if not self._construido:
+                return
+            if antigo is not None:
+                self._remover(antigo)
+            if novo is not None:
+                self._adicionar(novo)
+
+    def garantir_construido(self) -> None:
+        """Monta a estrutura a partir da coleção, se ainda não estiver montada"""
+        if self._construido:
+            return
+        # Mesma ordem de locks das notificações: coleções → índice
+        with colecoes_lock, self._lock:
+            if self._construido:
+                return
+            self._construir(carregar_backup_json(self.collection_name))
+            self._construido = True
+
+    def _construir(self, dados: List[Dict[str, Any]]) -> None:
+        """Monta a estrutura do zero (subclasses podem otimizar a carga em lote)"""
+        self._limpar()
+        for registro in dados:
+            self._adicionar(registro)
+
+
+class IndiceSecundario(IndiceIncremental):
+    """
+    Índices secundários de uma coleção para filtros e ordenação paginada
+
+    - igualdade: campo → valor normalizado → conjunto de IDs
+    - intervalo: campo numérico → lista ordenada de (valor, chave do ID, ID)
+    - ordenacao: campo numérico → lista ordenada de (valor, chave do ID, ID)
+    A ordenação padrão é pelo ID. As listas ordenadas são mantidas com
+    busca binária, sem reordenar a coleção a cada consulta.
+
+    Example:
+        >>> indice = IndiceSecundario("jogadoras", igualdade=["posicao"], ordenacao=["gols_carreira"])
+        >>> ids, cursor, total = indice.consultar({"posicao": "Atacante"}, ordenar_por="gols_carreira", limite=10)
+    """
+
+    def __init__(self, collection_name: str, campo_id: str = "id",
+                 igualdade: Iterable[str] = (), intervalo: Iterable[str] = (), ordenacao: Iterable[str] = ()):
+        self.campos_igualdade = tuple(igualdade)
+        self.campos_intervalo = tuple(intervalo)
+        self.campos_ordenacao = tuple(ordenacao)
+        self._campos_numericos = tuple(dict.fromkeys(self.campos_intervalo + self.campos_ordenacao))
+        super().__init__(collection_name, campo_id)
+        self._limpar()
+
+    def _limpar(self) -> None:
+        self._igualdade: Dict[str, Dict[str, set]] = {campo: {} for campo in self.campos_igualdade}
+        self._ordenados: Dict[str, List[Tuple[float, Tuple[int, int, str], str]]] = {
+            campo: [] for campo in self._campos_numericos
+        }
+        self._por_id: Dict[str, Dict[str, Tuple[float, Tuple[int, int, str], str]]] = {
+            campo: {} for campo in self._campos_numericos
+        }
+        self._ids: List[Tuple[Tuple[int, int, str], str]] = []
+
+    def _construir(self, dados: List[Dict[str, Any]]) -> None:
+        """Carga em lote: ordena cada lista uma única vez em vez de inserir uma a uma"""
+        self._limpar()
+        for registro in dados:
+            if registro.get(self.campo_id) is None:
+                continue
+            registro_id = str(registro[self.campo_id])
+
+            for campo in self.campos_igualdade:
+                valor = normalizar_valor(registro.get(campo))
+                if valor is not None:
+                    self._igualdade[campo].setdefault(valor, set()).add(registro_id)
+
+            for campo in self._campos_numericos:
+                entrada = self._entrada_ordenada(campo, registro)
+                if entrada is not None:
+                    self._ordenados[campo].append(entrada)
+                    self._por_id[campo][registro_id] = entrada
+
+            self._ids.append((chave_id(registro_id), registro_id))
+
+        for lista in self._ordenados.values():
+            lista.sort()
+        self._ids.sort()
+
+    def _entrada_ordenada(self, campo: str, registro: Dict[str, Any]) -> Optional[Tuple[float, Tuple[int, int, str], str]]:
+        """Entrada do registro na lista ordenada de um campo (None se sem valor)"""
+        valor = numero(registro.get(campo))
+        if valor is None:
+            # Sem valor: entra na ordenação como 0, mas não em filtros de intervalo
+            if campo not in self.campos_ordenacao:
+                return None
+            valor = 0.0
+        registro_id = str(registro.get(self.campo_id))
+        return (valor, chave_id(registro_id), registro_id)
+
+    def _adicionar(self, registro: Dict[str, Any]) -> None:
+        if registro.get(self.campo_id) is None:
+            return
+        registro_id = str(registro[self.campo_id])
+
+        for campo in self.campos_igualdade:
+            valor = normalizar_valor(registro.get(campo))
+            if valor is not None:
+                self._igualdade[campo].setdefault(valor, set()).add(registro_id)
+
+        for campo in self._campos_numericos:
+            entrada = self._entrada_ordenada(campo, registro)
+            if entrada is not None:
+                insort(self._ordenados[campo], entrada)
+                self._por_id[campo][registro_id] = entrada
+
+        insort(self._ids, (chave_id(registro_id), registro_id))
+
+    def _remover(self, registro: Dict[str, Any]) -> None:
+        if registro.get(self.campo_id) is None:
+            return
+        registro_id = str(registro[self.campo_id])
+
+        for campo in self.campos_igualdade:
+            valor = normalizar_valor(registro.get(campo))
+            ids = self._igualdade[campo].get(valor)
+            if ids is not None:
+                ids.discard(registro_id)
+                if not ids:
+                    del self._igualdade[campo][valor]
+
+        for campo in self._campos_numericos:
+            _remover_ordenado(self._ordenados[campo], self._por_id[campo].pop(registro_id, None))
+
+        _remover_ordenado(self._ids, (chave_id(registro_id), registro_id))
+
+    def _candidatos(self, filtros: Dict[str, Any], intervalos: Dict[str, Tuple[Optional[float], Optional[float]]]) -> Optional[set]:
+        """Conjunto de IDs que satisfazem os filtros (None se não houver filtros)"""
+        conjuntos = []
+        for campo, valor in filtros.items():
+            if valor is None:
+                continue
+            conjuntos.append(self._igualdade[campo].get(normalizar_valor(valor), set()))
+
+        # Fatias das listas ordenadas que atendem cada intervalo
+        fatias = []
+        for campo, (minimo, maximo) in intervalos.items():
+            if minimo is None and maximo is None:
+                continue
+            lista = self._ordenados[campo]
+            inicio = bisect_left(lista, (minimo,)) if minimo is not None else 0
+            fim = bisect_right(lista, (maximo, (2,))) if maximo is not None else len(lista)
+            fatias.append((campo, minimo, maximo, inicio, max(fim, inicio)))
+
+        if not conjuntos and not fatias:
+            return None
+
+        conjuntos.sort(key=len)
+        resultado = None
+        if conjuntos:
+            resultado = set(conjuntos[0])
+            for conjunto in conjuntos[1:]:
+                resultado &= conjunto
+                if not resultado:
+                    return resultado
+
+        for campo, minimo, maximo, inicio, fim in sorted(fatias, key=lambda f: f[4] - f[3]):
+            if resultado is not None and len(resultado) < fim - inicio:
+                # Poucos candidatos: conferir o valor de cada um em vez de
+                # materializar a fatia inteira
+                por_id = self._por_id[campo]
+                resultado = {
+                    registro_id for registro_id in resultado
+                    if registro_id in por_id
+                    and (minimo is None or por_id[registro_id][0] >= minimo)
+                    and (maximo is None or por_id[registro_id][0] <= maximo)
+                }
+            else:
+                fatia = {entrada[2] for entrada in self._ordenados[campo][inicio:fim]}
+                resultado = fatia if resultado is None else resultado & fatia
+            if not resultado:
+                break
+        return resultado
+
+    def consultar(self, filtros: Optional[Dict[str, Any]] = None,
+                  intervalos: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+                  ordenar_por: Optional[str] = None, decrescente: bool = True,
+                  limite: int = 50, cursor: Optional[str] = None) -> Tuple[List[str], Optional[str], int]:
+        """
+        Consulta paginada por cursor
+
+        Args:
+            filtros (Dict): campo de igualdade → valor
+            intervalos (Dict): campo de intervalo → (mínimo, máximo)
+            ordenar_por (str): campo de ordenação (None = ordem dos IDs)
+            decrescente (bool): sentido da ordenação
+            limite (int): tamanho da página
+            cursor (str): cursor retornado pela página anterior
+
+        Returns:
+            Tuple: (IDs da página, cursor da próxima página ou None, total filtrado)
+
+        Raises:
+            CursorInvalido: se o cursor não puder ser interpretado
+        """
+        filtros = {c: v for c, v in (filtros or {}).items() if c in self.campos_igualdade}
+        intervalos = {c: v for c, v in (intervalos or {}).items() if c in self.campos_intervalo}
+        if ordenar_por is not None and ordenar_por not in self.campos_ordenacao:
+            raise ValueError(f"Campo de ordenação inválido: {ordenar_por}")
+
+        # Posição do cursor, no mesmo formato das entradas da lista ordenada
+        inicio = None
+        if cursor is not None:
+            valores = decodificar_cursor(cursor)
+            try:
+                if ordenar_por is None:
+                    inicio = (chave_id(valores[0]), str(valores[0]))
+                else:
+                    inicio = (float(valores[0]), chave_id(valores[1]), str(valores[1]))
+            except (IndexError, TypeError, ValueError):
+                raise CursorInvalido("Cursor inválido")
+
+        self.garantir_construido()
+        with self._lock:
+            ordenada = self._ids if ordenar_por is None else self._ordenados[ordenar_por]
+            candidatos = self._candidatos(filtros, intervalos)
+            total = len(ordenada) if candidatos is None else len(candidatos)
+            pagina = self._pagina(ordenada, ordenar_por, candidatos, inicio, decrescente, limite)
+
+        proximo = None
+        if len(pagina) > limite:
+            pagina = pagina[:limite]
+            ultima = pagina[-1]
+            proximo = codificar_cursor([ultima[-1]] if ordenar_por is None else [ultima[0], ultima[-1]])
+        return [entrada[-1] for entrada in pagina], proximo, total
+
+    def _pagina(self, ordenada: list, ordenar_por: Optional[str], candidatos: Optional[set],
+                inicio: Optional[tuple], decrescente: bool, limite: int) -> list:
+        """
+        Seleciona até limite + 1 entradas após o cursor. Com filtros, escolhe
+        entre percorrer a lista ordenada (filtros pouco seletivos) ou ordenar
+        apenas os candidatos (filtros seletivos)
+        """
+        if candidatos is not None:
+            if not candidatos:
+                return []
+
+            # Custo estimado de percorrer a lista até achar limite + 1 candidatos
+            percorrer = (limite + 1) * len(ordenada) / len(candidatos)
+            if len(candidatos) * max(len(candidatos).bit_length(), 1) < percorrer:
+                if ordenar_por is None:
+                    entradas = [(chave_id(registro_id), registro_id) for registro_id in candidatos]
+                else:
+                    por_id = self._por_id[ordenar_por]
+                    entradas = [por_id[registro_id] for registro_id in candidatos if registro_id in por_id]
+                if inicio is not None:
+                    if decrescente:
+                        entradas = [e for e in entradas if e < inicio]
+                    else:
+                        entradas = [e for e in entradas if e > inicio]
+                entradas.sort(reverse=decrescente)
+                return entradas[:limite + 1]
+
+        # Percorrer a lista ordenada a partir do cursor
+        if decrescente:
+            fim = bisect_left(ordenada, inicio) if inicio is not None else len(ordenada)
+            posicoes = range(fim - 1, -1, -1)
+        else:
+            comeco = bisect_right(ordenada, inicio) if inicio is not None else 0
+            posicoes = range(comeco, len(ordenada))
+
+        pagina = []
+        for posicao in posicoes:
+            entrada = ordenada[posicao]
+            if candidatos is None or entrada[-1] in candidatos:
+                pagina.append(entrada)
+                if len(pagina) > limite:
+                    break
+        return pagina
+
+
+class ListaOrdenada:
+    """
+    Lista ordenada em blocos, com inserção e remoção em O(log n)
+
+    Os elementos ficam em blocos de até 2 * CARGA itens; uma busca binária
+    sobre o maior elemento de cada bloco encontra o bloco, e só ele é
+    alterado, em vez de deslocar a lista inteira a cada inserção.
+
+    Example:
+        >>> lista = ListaOrdenada([3, 1, 2])
+        >>> lista.adicionar(0)
+        >>> list(lista)
+        [0, 1, 2, 3]
+    """
+
+    CARGA = 512
+
+    def __init__(self, valores: Iterable[Any] = (), ordenados: bool = False):
+        ordenados = list(valores) if ordenados else sorted(valores)
+        self._blocos: List[list] = [
+            ordenados[i:i + self.CARGA] for i in range(0, len(ordenados), self.CARGA)
+        ]
+        self._maximos: List[Any] = [bloco[-1] for bloco in self._blocos]
+        self._tamanho = len(ordenados)
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def __iter__(self) -> Iterator[Any]:
+        for bloco in self._blocos:
+            yield from bloco
+
+    def adicionar(self, valor: Any) -> None:
+        """Insere mantendo a ordem"""
+        if not self._blocos:
+            self._blocos.append([valor])
+            self._maximos.append(valor)
+            self._tamanho = 1
+            return
+
+        posicao = bisect_left(self._maximos, valor)
+        if posicao == len(self._blocos):
+            posicao -= 1
+        bloco = self._blocos[posicao]
+        insort(bloco, valor)
+        self._maximos[posicao] = bloco[-1]
+        self._tamanho += 1
+
+        if len(bloco) > 2 * self.CARGA:
+            # Dividir o bloco cheio em dois
+            metade = bloco[self.CARGA:]
+            del bloco[self.CARGA:]
+            self._blocos.insert(posicao + 1, metade)
+            self._maximos[posicao] = bloco[-1]
+            self._maximos.insert(posicao + 1, metade[-1])
+
+    def remover(self, valor: Any) -> bool:
+        """Remove uma ocorrência do valor (False se não estiver na lista)"""
+        posicao = bisect_left(self._maximos, valor)
+        if posicao == len(self._blocos):
+            return False
+        bloco = self._blocos[posicao]
+        indice = bisect_left(bloco, valor)
+        if indice == len(bloco) or bloco[indice] != valor:
+            return False
+
+        del bloco[indice]
+        self._tamanho -= 1
+        if bloco:
+            self._maximos[posicao] = bloco[-1]
+        else:
+            del self._blocos[posicao]
+            del self._maximos[posicao]
+        return True
+
+    def posicao(self, valor: Any, incluir_iguais: bool = False) -> int:
+        """Quantidade de elementos menores que valor (ou menores ou iguais)"""
+        busca = bisect_right if incluir_iguais else bisect_left
+        bloco = busca(self._maximos, valor)
+        anteriores = sum(map(len, self._blocos[:bloco]))
+        if bloco < len(self._blocos):
+            anteriores += busca(self._blocos[bloco], valor)
+        return anteriores
+
+    def iterar(self, inicio: Any = None, incluir_inicio: bool = True,
+               decrescente: bool = False) -> Iterator[Any]:
+        """
+        Percorre a lista a partir de um valor, sem passar pelos anteriores
+
+        Args:
+            inicio: valor de partida (None = começo, ou fim se decrescente)
+            incluir_inicio (bool): incluir elementos iguais ao valor de partida
+            decrescente (bool): percorrer do maior para o menor
+
+        Example:
+            >>> list(ListaOrdenada([1, 2, 3, 4]).iterar(2, decrescente=True))
+            [2, 1]
+        """
+        blocos = self._blocos
+        if not decrescente:
+            if inicio is None:
+                posicao, indice = 0, 0
+            else:
+                busca = bisect_left if incluir_inicio else bisect_right
+                posicao = busca(self._maximos, inicio)
+                indice = busca(blocos[posicao], inicio) if posicao < len(blocos) else 0
+            for numero_bloco in range(posicao, len(blocos)):
+                bloco = blocos[numero_bloco]
+                yield from (bloco[indice:] if indice else bloco)
+                indice = 0
+        else:
+            if inicio is None:
+                posicao = len(blocos) - 1
+                indice = len(blocos[posicao]) if blocos else 0
+            else:
+                busca = bisect_right if incluir_inicio else bisect_left
+                posicao = min(busca(self._maximos, inicio), len(blocos) - 1)
+                indice = busca(blocos[posicao], inicio) if posicao >= 0 else 0
+            for numero_bloco in range(posicao, -1, -1):
+                bloco = blocos[numero_bloco]
+                for item in range(indice - 1, -1, -1):
+                    yield bloco[item]
+                if numero_bloco:
+                    indice = len(blocos[numero_bloco - 1])
+
+
+class Ranking(IndiceIncremental):
+    """
+    Rankings (top-K) de métricas de uma coleção, opcionalmente por grupo
+
+    Cada métrica é uma função do registro que retorna o valor (ou None
+    para ficar fora do ranking). Para cada métrica há uma ListaOrdenada
+    geral e uma por valor de cada campo de agrupamento, atualizadas em
+    O(log n) a cada mutação; o top-K é lido do início da lista, sem
+    reordenar a coleção.
+
+    Example:
+        >>> ranking = Ranking("jogadoras", {"gols": lambda j: j.get("gols_carreira")}, grupos=["posicao"])
+        >>> ranking.top("gols", limite=3)
+        [('1', 115.0), ('5', 97.0), ('3', 96.0)]
+    """
+
+    def __init__(self, collection_name: str, metricas: Dict[str, Callable[[Dict[str, Any]], Any]],
+                 grupos: Iterable[str] = (), campo_id: str = "id"):
+        self.metricas = dict(metricas)
+        self.campos_grupo = tuple(grupos)
+        super().__init__(collection_name, campo_id)
+        self._limpar()
+
+    def _limpar(self) -> None:
+        # (métrica, campo do grupo, valor do grupo) → entradas (-valor, chave do ID, ID)
+        self._listas: Dict[Tuple[str, Optional[str], Optional[str]], ListaOrdenada] = {}
+        # ID → (grupos do registro, entrada de cada métrica), para a remoção
+        self._registros: Dict[str, Tuple[tuple, tuple]] = {}
+
+    def _posicionar(self, registro: Dict[str, Any]) -> Tuple[tuple, tuple]:
+        """Grupos (campo, valor) e entradas (métrica, entrada) de um registro"""
+        registro_id = str(registro[self.campo_id])
+        grupos = []
+        for campo in self.campos_grupo:
+            valor = registro.get(campo)
+            if valor is not None and str(valor).strip():
+                grupos.append((campo, str(valor).strip()))
+
+        chave = chave_id(registro_id)
+        entradas = []
+        for metrica, calcular in self.metricas.items():
+            valor = numero(calcular(registro))
+            if valor is not None:
+                entradas.append((metrica, (-valor, chave, registro_id)))
+        return tuple(grupos), tuple(entradas)
+
+    def _construir(self, dados: List[Dict[str, Any]]) -> None:
+        """
+        Carga em lote: ordena uma vez a lista geral de cada métrica e a
+        distribui, já em ordem, entre as listas dos grupos
+        """
+        self._limpar()
+        gerais: Dict[str, list] = {metrica: [] for metrica in self.metricas}
+        for registro in dados:
+            if registro.get(self.campo_id) is None:
+                continue
+            grupos, entradas = self._posicionar(registro)
+            self._registros[str(registro[self.campo_id])] = (grupos, entradas)
+            for metrica, entrada in entradas:
+                gerais[metrica].append(entrada)
+
+        for metrica, geral in gerais.items():
+            geral.sort()
+            por_grupo: Dict[Tuple[str, Optional[str], Optional[str]], list] = {}
+            for entrada in geral:
+                for campo, valor_grupo in self._registros[entrada[2]][0]:
+                    por_grupo.setdefault((metrica, campo, valor_grupo), []).append(entrada)
+            if geral:
+                self._listas[(metrica, None, None)] = ListaOrdenada(geral, ordenados=True)
+            for chave, lista in por_grupo.items():
+                self._listas[chave] = ListaOrdenada(lista, ordenados=True)
+
+    def _adicionar(self, registro: Dict[str, Any]) -> None:
+        if registro.get(self.campo_id) is None:
+            return
+        grupos, entradas = self._posicionar(registro)
+        self._registros[str(registro[self.campo_id])] = (grupos, entradas)
+        for metrica, entrada in entradas:
+            for campo, valor_grupo in ((None, None),) + grupos:
+                lista = self._listas.get((metrica, campo, valor_grupo))
+                if lista is None:
+                    lista = self._listas[(metrica, campo, valor_grupo)] = ListaOrdenada()
+                lista.adicionar(entrada)
+
+    def _remover(self, registro: Dict[str, Any]) -> None:
+        if registro.get(self.campo_id) is None:
+            return
+        grupos, entradas = self._registros.pop(str(registro[self.campo_id]), ((), ()))
+        for metrica, entrada in entradas:
+            for campo, valor_grupo in ((None, None),) + grupos:
+                lista = self._listas.get((metrica, campo, valor_grupo))
+                if lista is not None:
+                    lista.remover(entrada)
+                    if not lista:
+                        del self._listas[(metrica, campo, valor_grupo)]
+
+    def top(self, metrica: str, limite: int = 10, agrupar_por: Optional[str] = None,
+            grupo: Optional[str] = None) -> Any:
+        """
+        Top-K de uma métrica
+
+        Args:
+            metrica (str): nome da métrica
+            limite (int): tamanho do ranking
+            agrupar_por (str): campo de agrupamento (None = ranking geral)
+            grupo (str): valor do grupo (None = todos os grupos)
+
+        Returns:
+            List[Tuple]: (ID, valor) em ordem decrescente, ou Dict de grupo →
+            lista quando agrupar_por é informado sem grupo
+
+        Raises:
+            ValueError: se a métrica ou o campo de agrupamento forem inválidos
+        """
+        if metrica not in self.metricas:
+            raise ValueError(f"Métrica inválida: {metrica}")
+        if agrupar_por is not None and agrupar_por not in self.campos_grupo:
+            raise ValueError(f"Campo de agrupamento inválido: {agrupar_por}")
+
+        self.garantir_construido()
+        with self._lock:
+            if agrupar_por is None:
+                return self._primeiros(self._listas.get((metrica, None, None)), limite)
+            if grupo is not None:
+                return self._primeiros(self._listas.get((metrica, agrupar_por, grupo.strip())), limite)
+            grupos = sorted(
+                (valor_grupo, lista) for (nome, campo, valor_grupo), lista in self._listas.items()
+                if nome == metrica and campo == agrupar_por
+            )
+            return {valor_grupo: self._primeiros(lista, limite) for valor_grupo, lista in grupos}
+
+    @staticmethod
+    def _primeiros(lista: Optional[ListaOrdenada], limite: int) -> List[Tuple[str, float]]:
+        if lista is None:
+            return []
+        # Valores inteiros (gols, partidas) voltam como int
+        return [
+            (registro_id, int(-negado) if float(negado).is_integer() else -negado)
+            for negado, _, registro_id in islice(lista, limite)
+        ]
+
+
+# Datas e horários dos registros são locais deste fuso ("próximos" e
+# "passados" são relativos ao horário atual nele)
+FUSO_HORARIO = os.getenv("FUSO_HORARIO", "America/Sao_Paulo")
+
+_DATA_ISO = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+_DATA_BR = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+_HORARIO = re.compile(r"(\d{1,2})(?::|h)(\d{2})(?::\d{2})?")
+_INSTANTE = re.compile(r"(\d{4}-\d{1,2}-\d{1,2})(?:[T ](\d{1,2}:\d{2}(?::\d{2})?))?")
+
+
+@lru_cache(maxsize=8192)
+def _normalizar_data(texto: str) -> Optional[str]:
+    """"AAAA-MM-DD" ou "DD/MM/AAAA" → "AAAA-MM-DD" (None se inválida)"""
+    encontrada = _DATA_ISO.fullmatch(texto)
+    if encontrada is not None:
+        ano, mes, dia = (int(parte) for parte in encontrada.groups())
+    else:
+        encontrada = _DATA_BR.fullmatch(texto)
+        if encontrada is None:
+            return None
+        dia, mes, ano = (int(parte) for parte in encontrada.groups())
+    if not (1 <= mes <= 12 and 1 <= dia <= monthrange(ano, mes)[1]):
+        return None
+    return f"{ano:04d}-{mes:02d}-{dia:02d}"
+
+
+@lru_cache(maxsize=2048)
+def _normalizar_horario(texto: str) -> Optional[str]:
+    """"HH:MM", "HH:MM:SS" ou "HHhMM" → "HH:MM" (None se inválido)"""
+    encontrado = _HORARIO.fullmatch(texto)
+    if encontrado is None:
+        return None
+    hora, minuto = int(encontrado.group(1)), int(encontrado.group(2))
+    if hora > 23 or minuto > 59:
+        return None
+    return f"{hora:02d}:{minuto:02d}"
+
+
+def instante_evento(data: Any, horario: Any = None) -> Optional[str]:
+    """
+    Instante normalizado ("AAAA-MM-DDTHH:MM") de uma data e um horário
+
+    Aceita data "AAAA-MM-DD" ou "DD/MM/AAAA" e horário "HH:MM", "HH:MM:SS"
+    ou "HHhMM"; sem horário, vale o início do dia. A forma normalizada
+    ordena como texto na mesma ordem cronológica. Datas e horários se
+    repetem muito entre registros, então cada parte é interpretada uma
+    vez e memorizada.
+
+    Returns:
+        str: instante, ou None se a data (ou o horário informado) for inválida
+
+    Example:
+        >>> instante_evento("15/03/2025", "9:30")
+        '2025-03-15T09:30'
+    """
+    if data is None:
+        return None
+    dia = _normalizar_data(str(data).strip())
+    if dia is None:
+        return None
+    texto = str(horario).strip() if horario is not None else ""
+    if not texto:
+        return dia + "T00:00"
+    hora = _normalizar_horario(texto)
+    return dia + "T" + hora if hora is not None else None
+
+
+def limite_intervalo(valor: str, fim: bool = False) -> str:
+    """
+    Instante normalizado de um limite de consulta ("AAAA-MM-DD" ou
+    "AAAA-MM-DDTHH:MM"); uma data sem horário como fim inclui o dia todo
+
+    Raises:
+        ValueError: se o valor não for uma data válida
+    """
+    encontrado = _INSTANTE.fullmatch(valor.strip())
+    instante = None
+    if encontrado is not None:
+        instante = instante_evento(encontrado.group(1), encontrado.group(2))
+    if instante is None:
+        raise ValueError(f"Data inválida: {valor} (use AAAA-MM-DD ou AAAA-MM-DDTHH:MM)")
+    if fim and encontrado.group(2) is None:
+        instante = instante[:11] + "23:59"
+    return instante
+
+
+@lru_cache(maxsize=1)
+def _fuso() -> Optional[ZoneInfo]:
+    try:
+        return ZoneInfo(FUSO_HORARIO)
+    except (ZoneInfoNotFoundError, ValueError):
+        # Sem base de fusos no sistema: horário local do servidor
+        return None
+
+
+def agora_local() -> str:
+    """Instante atual, normalizado, no fuso dos registros"""
+    return datetime.now(_fuso()).strftime("%Y-%m-%dT%H:%M")
+
+
+def segundos_ate(instante: str) -> float:
+    """Segundos de agora até um instante normalizado (negativo se já passou)"""
+    fuso = _fuso()
+    alvo = datetime.strptime(instante, "%Y-%m-%dT%H:%M").replace(tzinfo=fuso)
+    return (alvo - datetime.now(fuso)).total_seconds()
+
+
+# Maior que qualquer chave_id: (instante, _APOS_IDS) fica depois de todas as
+# entradas daquele instante
+_APOS_IDS = (2,)
+
+
+class IndiceTemporal(IndiceIncremental):
+    """
+    Registros em ordem cronológica (data + horário), para consultas por período
+
+    A data e o horário de cada registro são interpretados uma única vez
+    (instante_evento) e guardados como entradas (instante, chave do ID, ID)
+    em uma ListaOrdenada: um período é encontrado por busca binária e
+    percorrido em ordem, e criar/editar/excluir um registro move só a
+    entrada dele. Registros sem data válida ficam fora do índice.
+
+    Example:
+        >>> calendario = IndiceTemporal("eventos")
+        >>> calendario.consultar(inicio="2025-12-01", fim="2025-12-31", limite=2)
+        (['4', '9'], 'WyIyMDI1LTEy...', 7)
+    """
+
+    def __init__(self, collection_name: str, campo_data: str = "data",
+                 campo_horario: Optional[str] = "horario", campo_id: str = "id"):
+        self.campo_data = campo_data
+        self.campo_horario = campo_horario
+        super().__init__(collection_name, campo_id)
+        self._limpar()
+
+    def _limpar(self) -> None:
+        self._ordenados = ListaOrdenada()
+        # ID → entrada, para a remoção
+        self._entradas: Dict[str, Tuple[str, Tuple[int, int, str], str]] = {}
+
+    def _entrada(self, registro: Dict[str, Any]) -> Optional[Tuple[str, Tuple[int, int, str], str]]:
+        if registro.get(self.campo_id) is None:
+            return None
+        horario = registro.get(self.campo_horario) if self.campo_horario else None
+        instante = instante_evento(registro.get(self.campo_data), horario)
+        if instante is None:
+            return None
+        registro_id = str(registro[self.campo_id])
+        return (instante, chave_id(registro_id), registro_id)
+
+    def _construir(self, dados: List[Dict[str, Any]]) -> None:
+        """Carga em lote: uma única ordenação de todas as entradas"""
+        self._limpar()
+        for registro in dados:
+            entrada = self._entrada(registro)
+            if entrada is not None and entrada[2] not in self._entradas:
+                self._entradas[entrada[2]] = entrada
+        self._ordenados = ListaOrdenada(self._entradas.values())
+
+    def _adicionar(self, registro: Dict[str, Any]) -> None:
+        entrada = self._entrada(registro)
+        if entrada is None or entrada[2] in self._entradas:
+            return
+        self._entradas[entrada[2]] = entrada
+        self._ordenados.adicionar(entrada)
+
+    def _remover(self, registro: Dict[str, Any]) -> None:
+        if registro.get(self.campo_id) is None:
+            return
+        entrada = self._entradas.pop(str(registro[self.campo_id]), None)
+        if entrada is not None:
+            self._ordenados.remover(entrada)
+
+    def instante(self, registro_id: str) -> Optional[str]:
+        """Instante normalizado de um registro (None se fora do índice)"""
+        self.garantir_construido()
+        with self._lock:
+            entrada = self._entradas.get(str(registro_id))
+        return entrada[0] if entrada is not None else None
+
+    def consultar(self, inicio: Optional[str] = None, fim: Optional[str] = None,
+                  decrescente: bool = False, limite: int = 50,
+                  cursor: Optional[str] = None) -> Tuple[List[str], Optional[str], int]:
+        """
+        Registros de um período, em ordem cronológica, paginados por cursor
+
+        Args:
+            inicio (str): instante normalizado inicial, inclusivo (None = sem limite)
+            fim (str): instante normalizado final, inclusivo (None = sem limite)
+            decrescente (bool): do mais recente para o mais antigo
+            limite (int): tamanho da página
+            cursor (str): cursor retornado pela página anterior
+
+        Returns:
+            Tuple: (IDs da página, cursor da próxima página ou None, total do período)
+
+        Raises:
+            CursorInvalido: se o cursor não puder ser interpretado
+        """
+        posicao = None
+        if cursor is not None:
+            valores = decodificar_cursor(cursor)
+            try:
+                posicao = (str(valores[0]), chave_id(valores[1]), str(valores[1]))
+            except (IndexError, TypeError):
+                raise CursorInvalido("Cursor inválido")
+
+        minimo = (inicio,) if inicio is not None else None
+        maximo = (fim, _APOS_IDS) if fim is not None else None
+
+        self.garantir_construido()
+        with self._lock:
+            ordenados = self._ordenados
+            if inicio is not None and fim is not None and inicio > fim:
+                return [], None, 0
+            total = (
+                (ordenados.posicao(maximo) if maximo is not None else len(ordenados))
+                - (ordenados.posicao(minimo) if minimo is not None else 0)
+            )
+
+            if not decrescente:
+                partida, parada = minimo, maximo
+                dentro = (lambda entrada: entrada < parada) if parada is not None else None
+            else:
+                partida, parada = maximo, minimo
+                dentro = (lambda entrada: entrada > parada) if parada is not None else None
+            # Continua após o cursor, a menos que ele seja anterior ao período
+            if posicao is not None and (partida is None or (posicao < partida if decrescente else posicao > partida)):
+                entradas = ordenados.iterar(posicao, incluir_inicio=False, decrescente=decrescente)
+            else:
+                entradas = ordenados.iterar(partida, decrescente=decrescente)
+
+            pagina = []
+            for entrada in entradas:
+                if dentro is not None and not dentro(entrada):
+                    break
+                pagina.append(entrada)
+                if len(pagina) > limite:
+                    break
+
+        proximo = None
+        if len(pagina) > limite:
+            pagina = pagina[:limite]
+            proximo = codificar_cursor([pagina[-1][0], pagina[-1][2]])
+        return [entrada[2] for entrada in pagina], proximo, total
+
+
+def _remover_ordenado(lista: list, entrada) -> None:
+    """Remove uma entrada de uma lista ordenada (busca binária)"""
+    if entrada is None:
+        return
+    posicao = bisect_left(lista, entrada)
+    if posicao < len(lista) and lista[posicao] == entrada:
+        del lista[posicao]
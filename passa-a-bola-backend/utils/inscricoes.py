@@ -0,0 +1,333 @@
+"""
+Inscrições em Eventos
+Reserva de vagas sob concorrência: um lock por evento, decremento atômico
+de vagas_disponiveis e registro das inscrições em um arquivo só de anexação
+(uma linha JSON por inscrição), sem regravar o arquivo de eventos a cada uma
+"""
+
+import json
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.indices import normalizar_valor
+from utils.persistence import (
+    BACKEND_ARMAZENAMENTO,
+    DATABASE_DIR,
+    MODO_JOURNAL,
+    colecoes_lock,
+    gravar_adiadas,
+    modificar_registro_json,
+    registrar_log,
+    registrar_observador
+)
+
+ARQUIVO_INSCRICOES = DATABASE_DIR / "inscricoes_eventos.log"
+
+# Campo do evento com o número de sequência da última inscrição refletida em
+# vagas_disponiveis; muda junto com as vagas e vai para o snapshot com elas
+CAMPO_SEQUENCIA = "sequencia_inscricoes"
+
+# Só o modo JSON sem journal pode perder a gravação adiada das vagas (o
+# journal e o SQLite gravam cada reserva); só nele o saldo é reaplicado
+REAPLICAR_SALDOS = not MODO_JOURNAL and BACKEND_ARMAZENAMENTO == "json"
+
+
+class InscricaoRecusada(Exception):
+    """Inscrição não aceita (a mensagem explica o motivo)"""
+
+
+class EventoNaoEncontrado(InscricaoRecusada):
+    """O evento não existe"""
+
+
+class InscricoesEncerradas(InscricaoRecusada):
+    """Inscrições fechadas ou sem vagas disponíveis"""
+
+
+class InscricaoDuplicada(InscricaoRecusada):
+    """O email já está inscrito no evento"""
+
+
+class ControleInscricoes:
+    """
+    Inscrições dos eventos de uma coleção
+
+    Inscrições no mesmo evento são serializadas por um lock do evento
+    (eventos diferentes não disputam entre si). A vaga é reservada com
+    modificar_registro_json: o teste de vagas e o decremento acontecem
+    juntos, então não há atualização perdida nem vaga vendida duas vezes.
+    A inscrição é anexada ao arquivo de inscrições; o contador do evento
+    muda no cache na hora e o arquivo de eventos é regravado pela gravação
+    adiada. No modo JSON padrão essa gravação ainda é o snapshot inteiro
+    de eventos, só que uma vez a cada PERSISTENCIA_GRAVACAO_ADIADA_SEGUNDOS
+    (0.2 s) por rajada de inscrições, e na hora quando as vagas acabam.
+
+    Cada reserva avança o número de sequência do evento (CAMPO_SEQUENCIA),
+    gravado no evento junto com as vagas, e cada linha do arquivo guarda a
+    sequência e o saldo de vagas após a inscrição. Se o processo parar
+    antes da gravação adiada, a carga da coleção reaplica o saldo das
+    linhas com sequência maior que a do snapshot, antes que qualquer
+    leitura ou escrita veja o evento; uma escrita posterior no evento
+    (ex.: vagas alteradas pelo admin) mantém a sequência e prevalece sobre
+    o saldo do arquivo. A remoção de um evento anexa uma linha de remoção,
+    para que um ID reaproveitado não herde as inscrições antigas.
+
+    Example:
+        >>> controle = ControleInscricoes("eventos")
+        >>> inscricao, evento = controle.inscrever("1", {"nome": "Ana Souza", "email": "ana@email.com"})
+        >>> evento["vagas_disponiveis"]
+        146
+    """
+
+    def __init__(self, collection_name: str = "eventos", arquivo: Path = ARQUIVO_INSCRICOES,
+                 campo_id: str = "id"):
+        self.collection_name = collection_name
+        self.arquivo = arquivo
+        self.campo_id = campo_id
+        self._lock = threading.Lock()
+        self._arquivo_lock = threading.Lock()
+        self._locks_eventos: Dict[str, threading.Lock] = {}
+        self._carregado = False
+        # Evento → emails inscritos (normalizados), para recusar duplicadas
+        self._emails: Dict[str, set] = {}
+        # Evento → (sequência, saldo de vagas) da última inscrição no arquivo
+        self._saldos: Dict[str, Tuple[Optional[int], Optional[int]]] = {}
+        self._quantidade = 0
+        # Última linha do arquivo sem quebra (gravação interrompida)
+        self._linha_incompleta = False
+        self._estatisticas = {"aceitas": 0, "encerradas": 0, "duplicadas": 0}
+        registrar_observador(collection_name, self._ao_alterar)
+
+    def _lock_evento(self, evento_id: str) -> threading.Lock:
+        with self._lock:
+            lock = self._locks_eventos.get(evento_id)
+            if lock is None:
+                lock = self._locks_eventos[evento_id] = threading.Lock()
+            return lock
+
+    def _garantir_carregado(self) -> None:
+        """
+        Lê o arquivo de inscrições uma vez por processo (na carga da coleção
+        ou na primeira inscrição) e reaplica os saldos pendentes
+        """
+        if self._carregado:
+            return
+        # Mesma ordem de locks das notificações: coleções → controle
+        with colecoes_lock:
+            with self._lock:
+                if self._carregado:
+                    return
+                self._ler_arquivo()
+                self._carregado = True
+            self._reaplicar_saldos()
+
+    def _ler_arquivo(self) -> None:
+        """Lê emails inscritos e saldos de vagas do arquivo de inscrições"""
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                for numero_linha, linha in enumerate(f, start=1):
+                    self._linha_incompleta = not linha.endswith("\n")
+                    try:
+                        entrada = json.loads(linha)
+                        if "evento_removido" in entrada:
+                            evento_id = str(entrada["evento_removido"])
+                            self._emails.pop(evento_id, None)
+                            self._saldos.pop(evento_id, None)
+                            continue
+                        inscricao = entrada["inscricao"]
+                        evento_id = str(inscricao["evento_id"])
+                    except (ValueError, KeyError, TypeError):
+                        # Linha incompleta (ex.: queda durante a gravação)
+                        registrar_log(f"⚠ Linha inválida ignorada em {self.arquivo.name}: {numero_linha}")
+                        continue
+                    self._emails.setdefault(evento_id, set()).add(normalizar_valor(inscricao.get("email")))
+                    self._saldos[evento_id] = (entrada.get("sequencia"), entrada.get("vagas_disponiveis"))
+                    self._quantidade += 1
+        except FileNotFoundError:
+            pass
+
+    def _reaplicar_saldos(self) -> None:
+        """
+        Reaplica o saldo de vagas das inscrições que a coleção carregada
+        ainda não reflete (sequência da última linha maior que a do evento:
+        gravação adiada que não chegou ao disco). Chamada com colecoes_lock
+        adquirido, na carga da coleção
+        """
+        if not REAPLICAR_SALDOS:
+            return
+
+        for evento_id, (sequencia, saldo) in list(self._saldos.items()):
+            if sequencia is None or saldo is None:
+                continue
+            aplicado = []
+
+            def aplicar(evento: Dict[str, Any], sequencia: int = sequencia, saldo: int = saldo) -> Optional[Dict[str, Any]]:
+                if int(evento.get(CAMPO_SEQUENCIA) or 0) >= sequencia:
+                    return None
+                aplicado.append(True)
+                return {
+                    "vagas_disponiveis": saldo,
+                    "inscricoes_abertas": saldo > 0 and evento.get("inscricoes_abertas", True),
+                    CAMPO_SEQUENCIA: sequencia
+                }
+
+            modificar_registro_json(self.collection_name, evento_id, aplicar, self.campo_id, adiar_gravacao=True)
+            if aplicado:
+                registrar_log(f"✓ Saldo de vagas reaplicado: evento {evento_id} ({saldo} vagas, inscrição {sequencia})")
+
+    def _ao_alterar(self, operacao: str, antigo: Optional[Dict[str, Any]], novo: Optional[Dict[str, Any]]) -> None:
+        """
+        Observador: coleção carregada → saldos pendentes reaplicados;
+        evento removido → linha de remoção e emails esquecidos
+        """
+        if operacao == "recarregar" and REAPLICAR_SALDOS:
+            if self._carregado:
+                self._reaplicar_saldos()
+            else:
+                self._garantir_carregado()
+            return
+        if operacao != "deletar" or antigo is None or antigo.get(self.campo_id) is None:
+            return
+        evento_id = str(antigo[self.campo_id])
+        try:
+            with self._arquivo_lock:
+                self._anexar_linha({"evento_removido": evento_id})
+        except OSError as e:
+            registrar_log(f"✗ ERRO ao registrar remoção do evento {evento_id} nas inscrições: {str(e)}")
+        self._emails.pop(evento_id, None)
+        self._saldos.pop(evento_id, None)
+
+    @staticmethod
+    def _reservar(evento: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Campos do evento após reservar uma vaga (lança InscricoesEncerradas se não houver)"""
+        if not evento.get("inscricoes_abertas", True):
+            raise InscricoesEncerradas("Inscrições encerradas para este evento")
+        vagas = evento.get("vagas_disponiveis")
+        if vagas is None:
+            # Evento sem limite de vagas
+            return None
+        vagas = int(vagas)
+        if vagas <= 0:
+            raise InscricoesEncerradas("Não há vagas disponíveis para este evento")
+        return {
+            "vagas_disponiveis": vagas - 1,
+            "inscricoes_abertas": vagas > 1,
+            CAMPO_SEQUENCIA: int(evento.get(CAMPO_SEQUENCIA) or 0) + 1
+        }
+
+    @staticmethod
+    def _devolver(evento: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Campos do evento após devolver uma vaga reservada"""
+        vagas = evento.get("vagas_disponiveis")
+        if vagas is None:
+            return None
+        return {
+            "vagas_disponiveis": int(vagas) + 1,
+            "inscricoes_abertas": True,
+            CAMPO_SEQUENCIA: max(int(evento.get(CAMPO_SEQUENCIA) or 0) - 1, 0)
+        }
+
+    def _anexar_linha(self, entrada: Dict[str, Any]) -> None:
+        """Anexa uma linha JSON ao arquivo (chamada com _arquivo_lock adquirido)"""
+        if not self._carregado and not self._linha_incompleta:
+            # Arquivo ainda não lido: confere se a última linha ficou sem quebra
+            try:
+                with open(self.arquivo, 'rb') as f:
+                    f.seek(0, 2)
+                    if f.tell() > 0:
+                        f.seek(-1, 2)
+                        self._linha_incompleta = f.read(1) != b"\n"
+            except FileNotFoundError:
+                pass
+        linha = json.dumps(entrada, ensure_ascii=False, default=str)
+        with open(self.arquivo, 'a', encoding='utf-8') as f:
+            f.write(("\n" if self._linha_incompleta else "") + linha + "\n")
+        self._linha_incompleta = False
+
+    def _anexar(self, inscricao: Dict[str, Any], vagas_disponiveis: Optional[int],
+                sequencia: Optional[int]) -> Dict[str, Any]:
+        """Numera a inscrição e anexa sua linha ao arquivo"""
+        with self._arquivo_lock:
+            inscricao = {"id": str(self._quantidade + 1), **inscricao}
+            self._anexar_linha({"inscricao": inscricao, "vagas_disponiveis": vagas_disponiveis, "sequencia": sequencia})
+            self._saldos[str(inscricao["evento_id"])] = (sequencia, vagas_disponiveis)
+            self._quantidade += 1
+        return inscricao
+
+    def inscrever(self, evento_id: str, dados: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Inscreve uma pessoa em um evento, reservando uma vaga
+
+        Args:
+            evento_id (str): ID do evento
+            dados (Dict): dados da inscrição (nome, email, ...)
+
+        Returns:
+            Tuple: (inscrição gravada, evento após a reserva)
+
+        Raises:
+            EventoNaoEncontrado: se o evento não existir
+            InscricoesEncerradas: se as inscrições estiverem fechadas ou sem vagas
+            InscricaoDuplicada: se o email já estiver inscrito no evento
+        """
+        self._garantir_carregado()
+        evento_id = str(evento_id)
+        email = normalizar_valor(dados.get("email"))
+
+        with self._lock_evento(evento_id):
+            emails = self._emails.get(evento_id)
+            if email and emails is not None and email in emails:
+                with self._lock:
+                    self._estatisticas["duplicadas"] += 1
+                raise InscricaoDuplicada("Este email já está inscrito no evento")
+
+            try:
+                evento = modificar_registro_json(
+                    self.collection_name, evento_id, self._reservar, self.campo_id, adiar_gravacao=True
+                )
+            except InscricoesEncerradas:
+                with self._lock:
+                    self._estatisticas["encerradas"] += 1
+                raise
+            if evento is None:
+                raise EventoNaoEncontrado(f"Evento com ID {evento_id} não encontrado")
+
+            try:
+                inscricao = self._anexar(
+                    {"evento_id": evento_id, **dados, "criado_em": datetime.now().isoformat(timespec="seconds")},
+                    evento.get("vagas_disponiveis"),
+                    evento.get(CAMPO_SEQUENCIA) if evento.get("vagas_disponiveis") is not None else None
+                )
+            except Exception:
+                # Sem a inscrição gravada, a vaga volta para o evento
+                modificar_registro_json(self.collection_name, evento_id, self._devolver, self.campo_id, adiar_gravacao=True)
+                raise
+
+            self._emails.setdefault(evento_id, set()).add(email)
+            with self._lock:
+                self._estatisticas["aceitas"] += 1
+
+        # Fechamento das inscrições vai para o disco na hora
+        if not evento.get("inscricoes_abertas", True):
+            gravar_adiadas()
+            registrar_log(f"✓ Inscrições encerradas (vagas esgotadas): evento {evento_id}")
+
+        return inscricao, evento
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Contadores de inscrições
+
+        Returns:
+            Dict: aceitas, recusadas por falta de vagas/encerramento,
+            duplicadas e total de inscrições no arquivo
+        """
+        with self._lock:
+            estatisticas = dict(self._estatisticas)
+            estatisticas["total_arquivo"] = self._quantidade
+        return estatisticas
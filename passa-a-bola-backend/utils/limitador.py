@@ -0,0 +1,115 @@
+"""
+Limitador de Taxa (Token Bucket)
+Limita tentativas por chave (IP do cliente, email...) antes de trabalho
+caro, como o bcrypt do login, com memória constante por chave ativa
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class LimitadorTaxa:
+    """
+    Token bucket por chave
+
+    Cada chave tem até `rajada` fichas, repostas a `por_minuto` por minuto;
+    cada tentativa consome uma. O estado de uma chave é só (fichas,
+    instante da última tentativa), reposto de forma preguiçosa a cada
+    consulta, sem timers. As chaves ficam em ordem de último acesso: a
+    cada tentativa, as mais antigas cujo balde já teria enchido de novo
+    (ociosas, equivalentes a uma chave nova) são descartadas. Acima de
+    max_chaves, as mais antigas saem mesmo sem ter enchido.
+
+    Example:
+        >>> limitador = LimitadorTaxa("ip", rajada=20, por_minuto=10)
+        >>> limitador.consumir("203.0.113.7")
+        0.0
+        >>> limitador.consumir("203.0.113.7")  # após 20 tentativas seguidas
+        5.2
+    """
+
+    def __init__(self, nome: str, rajada: int, por_minuto: float, max_chaves: int = 100_000):
+        self.nome = nome
+        self.rajada = rajada
+        self.por_segundo = por_minuto / 60.0
+        self.max_chaves = max_chaves
+        # Chave → (fichas, instante da última tentativa)
+        self._baldes: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._estatisticas = {"permitidas": 0, "bloqueadas": 0, "ociosas_descartadas": 0, "descartes": 0}
+
+    @property
+    def ativo(self) -> bool:
+        return self.rajada > 0 and self.por_segundo > 0
+
+    def _descartar_ociosas(self, agora: float) -> None:
+        """Remove as chaves menos usadas cujo balde já teria enchido (O(1) amortizado)"""
+        baldes = self._baldes
+        while baldes:
+            chave, (fichas, instante) = next(iter(baldes.items()))
+            if fichas + (agora - instante) * self.por_segundo < self.rajada:
+                break
+            del baldes[chave]
+            self._estatisticas["ociosas_descartadas"] += 1
+
+    def consumir(self, chave: Hashable, agora: Optional[float] = None) -> float:
+        """
+        Registra uma tentativa da chave
+
+        Args:
+            chave (Hashable): Chave limitada (ex.: IP do cliente)
+            agora (float): Instante (time.monotonic), para testes
+
+        Returns:
+            float: 0.0 se a tentativa é permitida; senão, segundos até
+            haver uma ficha (a tentativa não consome nada)
+        """
+        if not self.ativo:
+            return 0.0
+        if agora is None:
+            agora = time.monotonic()
+
+        with self._lock:
+            self._descartar_ociosas(agora)
+            balde = self._baldes.get(chave)
+            if balde is None:
+                fichas = float(self.rajada)
+            else:
+                fichas = min(float(self.rajada), balde[0] + (agora - balde[1]) * self.por_segundo)
+
+            if fichas < 1.0:
+                self._baldes[chave] = (fichas, agora)
+                self._baldes.move_to_end(chave)
+                self._estatisticas["bloqueadas"] += 1
+                return (1.0 - fichas) / self.por_segundo
+
+            self._baldes[chave] = (fichas - 1.0, agora)
+            self._baldes.move_to_end(chave)
+            while len(self._baldes) > self.max_chaves:
+                self._baldes.popitem(last=False)
+                self._estatisticas["descartes"] += 1
+            self._estatisticas["permitidas"] += 1
+            return 0.0
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Contadores do limitador
+
+        Returns:
+            Dict: tentativas permitidas e bloqueadas, chaves ativas, chaves
+            ociosas descartadas, descartes por capacidade e configuração
+        """
+        with self._lock:
+            estatisticas: Dict[str, Any] = dict(self._estatisticas)
+            estatisticas["chaves"] = len(self._baldes)
+        estatisticas["rajada"] = self.rajada
+        estatisticas["por_minuto"] = round(self.por_segundo * 60, 4)
+        return estatisticas
+
+
+def segundos_retry_after(espera: float) -> str:
+    """Valor do header Retry-After (segundos inteiros, no mínimo 1)"""
+    return str(max(1, math.ceil(espera)))
@@ -0,0 +1,246 @@
+"""
+Métricas (formato texto do Prometheus)
+Contadores e histogramas com rótulos, registrados sem lock no caminho
+quente, e o middleware ASGI que mede as requisições HTTP por rota
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+
+# Limites (segundos) dos histogramas de latência
+LIMITES_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes: Tuple[str, ...], valores: Tuple[str, ...], extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(str(valor))}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatar_numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+
+class _MetricaFragmentada:
+    """
+    Base das métricas: cada thread grava no próprio fragmento
+
+    Registrar é só uma operação de dicionário no fragmento da thread atual,
+    sem lock (o lock só é usado quando uma thread grava pela primeira vez).
+    A exportação soma os fragmentos de todas as threads; cada fragmento é
+    copiado com list(dict.items()), que o interpretador executa sem trocar
+    de thread no meio.
+    """
+
+    def __init__(self, nome: str, descricao: str, rotulos: Tuple[str, ...] = ()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self._local = threading.local()
+        self._fragmentos: List[Dict[Tuple[str, ...], Any]] = []
+        self._lock = threading.Lock()
+
+    def _fragmento(self) -> Dict[Tuple[str, ...], Any]:
+        try:
+            return self._local.fragmento
+        except AttributeError:
+            fragmento: Dict[Tuple[str, ...], Any] = {}
+            with self._lock:
+                self._fragmentos.append(fragmento)
+            self._local.fragmento = fragmento
+            return fragmento
+
+    def _copiar_fragmentos(self) -> List[List[Tuple[Tuple[str, ...], Any]]]:
+        with self._lock:
+            fragmentos = list(self._fragmentos)
+        return [list(fragmento.items()) for fragmento in fragmentos]
+
+
+class Contador(_MetricaFragmentada):
+    """
+    Contador monotônico com rótulos
+
+    Example:
+        >>> leituras = Contador("passabola_leituras_total", "Leituras", ("colecao",))
+        >>> leituras.incrementar(("jogadoras",))
+        >>> leituras.incrementar(("jogadoras",), 1024)
+    """
+
+    tipo = "counter"
+
+    def incrementar(self, rotulos: Tuple[str, ...] = (), valor: float = 1) -> None:
+        fragmento = self._fragmento()
+        fragmento[rotulos] = fragmento.get(rotulos, 0) + valor
+
+    def valores(self) -> Dict[Tuple[str, ...], float]:
+        """Totais por combinação de rótulos (soma de todas as threads)"""
+        totais: Dict[Tuple[str, ...], float] = {}
+        for itens in self._copiar_fragmentos():
+            for rotulos, valor in itens:
+                totais[rotulos] = totais.get(rotulos, 0) + valor
+        return totais
+
+    def exportar(self) -> List[str]:
+        return [
+            f"{self.nome}{_formatar_rotulos(self.rotulos, rotulos)} {_formatar_numero(valor)}"
+            for rotulos, valor in sorted(self.valores().items())
+        ]
+
+
+class Histograma(_MetricaFragmentada):
+    """
+    Histograma com rótulos: contagem por faixa (limites fixos), soma e total
+
+    Example:
+        >>> duracao = Histograma("passabola_duracao_segundos", "Duração", ("rota",))
+        >>> duracao.observar(0.012, ("/api/players/",))
+    """
+
+    tipo = "histogram"
+
+    def __init__(self, nome: str, descricao: str, rotulos: Tuple[str, ...] = (),
+                 limites: Tuple[float, ...] = LIMITES_LATENCIA):
+        super().__init__(nome, descricao, rotulos)
+        self.limites = tuple(sorted(limites))
+
+    def observar(self, valor: float, rotulos: Tuple[str, ...] = ()) -> None:
+        fragmento = self._fragmento()
+        faixas = fragmento.get(rotulos)
+        if faixas is None:
+            # Uma posição por limite, uma para +Inf e a soma no final
+            faixas = fragmento[rotulos] = [0] * (len(self.limites) + 1) + [0.0]
+        faixas[bisect_left(self.limites, valor)] += 1
+        faixas[-1] += valor
+
+    def valores(self) -> Dict[Tuple[str, ...], List[float]]:
+        """Faixas (não acumuladas) e soma por combinação de rótulos"""
+        totais: Dict[Tuple[str, ...], List[float]] = {}
+        for itens in self._copiar_fragmentos():
+            for rotulos, faixas in itens:
+                faixas = list(faixas)
+                atual = totais.get(rotulos)
+                if atual is None:
+                    totais[rotulos] = faixas
+                else:
+                    for posicao, valor in enumerate(faixas):
+                        atual[posicao] += valor
+        return totais
+
+    def exportar(self) -> List[str]:
+        linhas = []
+        for rotulos, faixas in sorted(self.valores().items()):
+            acumulado = 0
+            for limite, quantidade in zip(self.limites + (float("inf"),), faixas):
+                acumulado += quantidade
+                le = "+Inf" if limite == float("inf") else _formatar_numero(limite)
+                faixa = _formatar_rotulos(self.rotulos, rotulos, 'le="' + le + '"')
+                linhas.append(f"{self.nome}_bucket{faixa} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_formatar_rotulos(self.rotulos, rotulos)} {_formatar_numero(faixas[-1])}")
+            linhas.append(f"{self.nome}_count{_formatar_rotulos(self.rotulos, rotulos)} {acumulado}")
+        return linhas
+
+
+class RegistroMetricas:
+    """
+    Conjunto de métricas exportadas juntas em /metrics
+
+    Example:
+        >>> registro = RegistroMetricas()
+        >>> erros = registro.contador("passabola_erros_total", "Erros", ("tipo",))
+        >>> registro.exportar()
+        '# HELP passabola_erros_total Erros\\n# TYPE passabola_erros_total counter\\n'
+    """
+
+    def __init__(self):
+        self._metricas: Dict[str, _MetricaFragmentada] = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica: _MetricaFragmentada) -> Any:
+        with self._lock:
+            existente = self._metricas.get(metrica.nome)
+            if existente is not None:
+                if type(existente) is not type(metrica) or existente.rotulos != metrica.rotulos:
+                    raise ValueError(f"Métrica já registrada com outro tipo ou rótulos: {metrica.nome}")
+                return existente
+            self._metricas[metrica.nome] = metrica
+            return metrica
+
+    def contador(self, nome: str, descricao: str, rotulos: Tuple[str, ...] = ()) -> Contador:
+        """Registra (ou retorna, se já existir) um contador"""
+        return self._registrar(Contador(nome, descricao, rotulos))
+
+    def histograma(self, nome: str, descricao: str, rotulos: Tuple[str, ...] = (),
+                   limites: Tuple[float, ...] = LIMITES_LATENCIA) -> Histograma:
+        """Registra (ou retorna, se já existir) um histograma"""
+        return self._registrar(Histograma(nome, descricao, rotulos, limites))
+
+    def exportar(self) -> str:
+        """
+        Todas as métricas no formato texto do Prometheus (versão 0.0.4)
+
+        Returns:
+            str: texto com HELP, TYPE e as amostras de cada métrica
+        """
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas = []
+        for metrica in metricas:
+            linhas.append(f"# HELP {metrica.nome} {metrica.descricao}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+
+registro_metricas = RegistroMetricas()
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI: contagem, status e latência das requisições HTTP
+
+    A rota é o caminho declarado (ex.: /api/players/{jogadora_id}), não a
+    URL, para que o número de séries não cresça com os IDs; requisições
+    que não casaram com nenhuma rota aparecem como "sem_rota". A latência
+    vai do recebimento até o fim do envio da resposta.
+
+    Example:
+        >>> app.add_middleware(MiddlewareMetricas)
+    """
+
+    def __init__(self, app, registro: RegistroMetricas = registro_metricas):
+        self.app = app
+        self.requisicoes = registro.contador(
+            "passabola_http_requisicoes_total", "Requisições HTTP respondidas", ("metodo", "rota", "status")
+        )
+        self.duracao = registro.histograma(
+            "passabola_http_duracao_segundos", "Latência das requisições HTTP", ("metodo", "rota")
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        status = [500]
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                status[0] = mensagem["status"]
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            rota = scope.get("route")
+            caminho = getattr(rota, "path", None) or "sem_rota"
+            metodo = scope["method"]
+            self.requisicoes.incrementar((metodo, caminho, str(status[0])))
+            self.duracao.observar(time.perf_counter() - inicio, (metodo, caminho))
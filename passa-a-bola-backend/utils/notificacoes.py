@@ -0,0 +1,338 @@
+"""
+Notificações em Tempo Real (Pub/Sub em Processo)
+Mutações das coleções, recebidas pelos observadores de utils/persistence.py,
+são publicadas para os assinantes de um stream (Server-Sent Events), cada
+um com um buffer limitado; assinantes lentos são desconectados
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Response
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.persistence import registrar_observador
+
+# Mensagens pendentes por assinante; quem acumula mais que isso é descartado
+CAPACIDADE_ASSINANTE = int(os.getenv("SSE_CAPACIDADE_ASSINANTE", "256"))
+
+# Máximo de assinantes simultâneos (os demais recebem 503)
+MAXIMO_ASSINANTES = int(os.getenv("SSE_MAXIMO_ASSINANTES", "20000"))
+
+# Mensagens recentes guardadas para retomar após reconexão (Last-Event-ID)
+TAMANHO_HISTORICO = int(os.getenv("SSE_HISTORICO", "1024"))
+
+# Comentário enviado a todos periodicamente, para proxies não fecharem
+# conexões ociosas
+INTERVALO_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT_SEGUNDOS", "15"))
+
+_HEARTBEAT = b": ping\n\n"
+_DESCONECTADO = b"event: desconectado\ndata: {}\n\n"
+
+# Pedido ao navegador: tempo de espera antes de reconectar (ms)
+INTERVALO_RECONEXAO_MS = 3000
+
+
+class LimiteAssinantes(Exception):
+    """Não há lugar para mais assinantes"""
+
+
+def _quadro(mensagem_id: int, topico: str, dados: Dict[str, Any]) -> bytes:
+    """Mensagem no formato Server-Sent Events (serializada uma vez por publicação)"""
+    texto = json.dumps(dados, ensure_ascii=False, separators=(",", ":"), default=str)
+    return f"id: {mensagem_id}\nevent: {topico}\ndata: {texto}\n\n".encode("utf-8")
+
+
+def _alteracoes(operacao: str, antigo: Optional[Dict[str, Any]], novo: Optional[Dict[str, Any]],
+                campo_id: str) -> Dict[str, Any]:
+    """Conteúdo publicado para uma mutação: operação, ID e campos novos ou alterados"""
+    registro = novo if novo is not None else antigo
+    conteudo: Dict[str, Any] = {"op": operacao}
+    if registro is not None:
+        conteudo["id"] = registro.get(campo_id)
+    if operacao == "inserir":
+        conteudo["dados"] = novo
+    elif operacao == "atualizar" and antigo is not None and novo is not None:
+        conteudo["dados"] = {campo: valor for campo, valor in novo.items() if campo not in antigo or antigo[campo] != valor}
+    return conteudo
+
+
+class Assinante:
+    """Conexão inscrita em tópicos: mensagens pendentes e a espera por novas"""
+
+    __slots__ = ("topicos", "pendentes", "espera", "descartado")
+
+    def __init__(self, topicos: Tuple[str, ...]):
+        self.topicos = topicos
+        self.pendentes: List[bytes] = []
+        self.espera: Optional[asyncio.Future] = None
+        self.descartado = False
+
+
+class Barramento:
+    """
+    Pub/sub em processo entre as escritas (threads das rotas) e os streams
+    (loop de eventos)
+
+    publicar() pode ser chamada de qualquer thread: numera a mensagem, guarda
+    no histórico e agenda uma única distribuição no loop, que serializa a
+    mensagem uma vez e a entrega a todos os assinantes do tópico. Cada
+    assinante tem no máximo `capacidade` mensagens pendentes: um consumidor
+    lento é descartado (e reconecta com Last-Event-ID) em vez de fazer a
+    memória crescer. Um assinante ocioso custa só uma lista vazia e um
+    Future; o heartbeat é um único timer para todos.
+
+    Example:
+        >>> barramento = Barramento()
+        >>> barramento.acompanhar("eventos", campo_id="id")
+        >>> assinante = barramento.assinar(["eventos"])
+        >>> await barramento.proximas(assinante)
+        b'id: 1\\nevent: eventos\\ndata: {"op":"atualizar","id":"1",...}\\n\\n'
+    """
+
+    def __init__(self, capacidade: int = CAPACIDADE_ASSINANTE, maximo: int = MAXIMO_ASSINANTES,
+                 historico: int = TAMANHO_HISTORICO, intervalo_heartbeat: float = INTERVALO_HEARTBEAT):
+        self.capacidade = capacidade
+        self.maximo = maximo
+        self.intervalo_heartbeat = intervalo_heartbeat
+        self._lock = threading.Lock()
+        self._sequencia = 0
+        # (ID, tópico, conteúdo, quadro serializado ou None)
+        self._historico: deque = deque(maxlen=historico)
+        self._por_topico: Dict[str, set] = {}
+        self._quantidade = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._estatisticas = {"publicadas": 0, "entregues": 0, "descartados": 0, "recusados": 0}
+
+    def acompanhar(self, collection_name: str, topico: Optional[str] = None, campo_id: str = "_id") -> None:
+        """Publica as mutações de uma coleção no tópico (padrão: o nome da coleção)"""
+        topico = topico or collection_name
+
+        def observador(operacao: str, antigo: Optional[Dict[str, Any]], novo: Optional[Dict[str, Any]]) -> None:
+            self.publicar(topico, _alteracoes(operacao, antigo, novo, campo_id))
+
+        registrar_observador(collection_name, observador)
+
+    def publicar(self, topico: str, conteudo: Dict[str, Any]) -> None:
+        """Publica uma mensagem (thread-safe; barata quando não há assinantes)"""
+        with self._lock:
+            self._sequencia += 1
+            mensagem = [self._sequencia, topico, conteudo, None]
+            self._historico.append(mensagem)
+            self._estatisticas["publicadas"] += 1
+            loop = self._loop if self._por_topico.get(topico) else None
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._distribuir, mensagem)
+
+    @staticmethod
+    def _serializada(mensagem: list) -> bytes:
+        if mensagem[3] is None:
+            mensagem[3] = _quadro(mensagem[0], mensagem[1], mensagem[2])
+        return mensagem[3]
+
+    def _entregar(self, assinante: Assinante, quadro: bytes) -> None:
+        """Enfileira para um assinante ou o descarta se o buffer estiver cheio (no loop)"""
+        if assinante.descartado:
+            return
+        if len(assinante.pendentes) >= self.capacidade:
+            self._descartar(assinante)
+            self._estatisticas["descartados"] += 1
+        else:
+            assinante.pendentes.append(quadro)
+            self._estatisticas["entregues"] += 1
+        espera = assinante.espera
+        if espera is not None and not espera.done():
+            espera.set_result(None)
+
+    def _distribuir(self, mensagem: list) -> None:
+        """Entrega uma mensagem a todos os assinantes do tópico (no loop)"""
+        assinantes = self._por_topico.get(mensagem[1])
+        if not assinantes:
+            return
+        quadro = self._serializada(mensagem)
+        for assinante in list(assinantes):
+            self._entregar(assinante, quadro)
+
+    async def _loop_heartbeat(self) -> None:
+        """Envia o heartbeat a todos os assinantes (um único timer)"""
+        while True:
+            await asyncio.sleep(self.intervalo_heartbeat)
+            vistos = set()
+            for assinantes in list(self._por_topico.values()):
+                for assinante in list(assinantes):
+                    if id(assinante) not in vistos:
+                        vistos.add(id(assinante))
+                        self._entregar(assinante, _HEARTBEAT)
+
+    def assinar(self, topicos: Iterable[str], ultimo_id: Optional[int] = None) -> Assinante:
+        """
+        Inscreve um novo assinante (deve ser chamada no loop de eventos)
+
+        Args:
+            topicos (Iterable[str]): tópicos desejados
+            ultimo_id (int): ID da última mensagem recebida (reconexão); as
+                mensagens seguintes ainda no histórico são reenviadas
+
+        Returns:
+            Assinante: a ser lido com proximas() e removido com cancelar()
+
+        Raises:
+            LimiteAssinantes: se o máximo de assinantes foi atingido
+        """
+        loop = asyncio.get_running_loop()
+        topicos = tuple(dict.fromkeys(topicos))
+        assinante = Assinante(topicos)
+        with self._lock:
+            if self._quantidade >= self.maximo:
+                self._estatisticas["recusados"] += 1
+                raise LimiteAssinantes("Limite de conexões de notificações atingido")
+            self._loop = loop
+            self._quantidade += 1
+            for topico in topicos:
+                self._por_topico.setdefault(topico, set()).add(assinante)
+            historico = list(self._historico) if ultimo_id is not None else []
+            sequencia = self._sequencia
+
+        if ultimo_id is not None:
+            primeiro = historico[0][0] if historico else sequencia + 1
+            if ultimo_id > sequencia or primeiro > ultimo_id + 1:
+                # O que foi perdido já saiu do histórico (ou o ID é de outra
+                # execução do servidor): o cliente deve recarregar os dados
+                assinante.pendentes.append(
+                    f"event: reiniciar\ndata: {json.dumps({'ultimo_id': sequencia})}\n\n".encode("utf-8")
+                )
+            for mensagem in historico:
+                if mensagem[0] > ultimo_id and mensagem[1] in topicos:
+                    assinante.pendentes.append(self._serializada(mensagem))
+
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = loop.create_task(self._loop_heartbeat())
+        return assinante
+
+    def _descartar(self, assinante: Assinante) -> None:
+        """Remove um assinante dos tópicos"""
+        with self._lock:
+            if assinante.descartado:
+                return
+            assinante.descartado = True
+            self._quantidade -= 1
+            for topico in assinante.topicos:
+                assinantes = self._por_topico.get(topico)
+                if assinantes is not None:
+                    assinantes.discard(assinante)
+                    if not assinantes:
+                        del self._por_topico[topico]
+        assinante.pendentes = []
+
+    def cancelar(self, assinante: Assinante) -> None:
+        """Remove um assinante (conexão encerrada) e encerra sua espera"""
+        self._descartar(assinante)
+        espera = assinante.espera
+        if espera is not None and not espera.done():
+            espera.set_result(None)
+
+    async def proximas(self, assinante: Assinante) -> Optional[bytes]:
+        """
+        Espera e retorna as mensagens pendentes, concatenadas
+
+        Returns:
+            bytes: mensagens prontas para enviar, ou None se o assinante foi
+            descartado (consumidor lento ou encerramento)
+        """
+        while not assinante.pendentes:
+            if assinante.descartado:
+                return None
+            assinante.espera = asyncio.get_running_loop().create_future()
+            try:
+                await assinante.espera
+            finally:
+                assinante.espera = None
+        pendentes, assinante.pendentes = assinante.pendentes, []
+        return b"".join(pendentes)
+
+    def encerrar(self) -> None:
+        """Desconecta todos os assinantes (shutdown da API)"""
+        with self._lock:
+            assinantes = {assinante for grupo in self._por_topico.values() for assinante in grupo}
+        for assinante in assinantes:
+            self._descartar(assinante)
+            espera = assinante.espera
+            if espera is not None and not espera.done():
+                espera.get_loop().call_soon_threadsafe(espera.set_result, None)
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+
+    def estatisticas(self) -> Dict[str, int]:
+        """
+        Contadores do barramento
+
+        Returns:
+            Dict: mensagens publicadas, entregas, assinantes descartados por
+            lentidão, conexões recusadas pelo limite e assinantes atuais
+        """
+        with self._lock:
+            estatisticas = dict(self._estatisticas)
+            estatisticas["assinantes"] = self._quantidade
+            estatisticas["ultimo_id"] = self._sequencia
+        return estatisticas
+
+
+class RespostaStream(Response):
+    """
+    Resposta text/event-stream de um assinante
+
+    Mais enxuta que um StreamingResponse (que mantém um grupo de tarefas por
+    conexão): a única tarefa extra é a espera pela desconexão do cliente,
+    que remove o assinante na hora. O corpo é escrito direto no send do
+    ASGI, com as mensagens pendentes concatenadas em um único envio.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(self, barramento: Barramento, assinante: Assinante):
+        # Como no StreamingResponse: sem corpo, sem Content-Length
+        self.status_code = 200
+        self.background = None
+        self.init_headers({"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        self.barramento = barramento
+        self.assinante = assinante
+
+    async def __call__(self, scope, receive, send) -> None:
+        assinante = self.assinante
+
+        async def esperar_desconexao() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        desconexao = asyncio.ensure_future(esperar_desconexao())
+        desconexao.add_done_callback(lambda _: self.barramento.cancelar(assinante))
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({
+                "type": "http.response.body",
+                "body": f"retry: {INTERVALO_RECONEXAO_MS}\n\n".encode("utf-8"),
+                "more_body": True
+            })
+            while True:
+                mensagens = await self.barramento.proximas(assinante)
+                if mensagens is None:
+                    break
+                await send({"type": "http.response.body", "body": mensagens, "more_body": True})
+            if not desconexao.done():
+                # Descartado (consumidor lento ou encerramento da API)
+                await send({"type": "http.response.body", "body": _DESCONECTADO, "more_body": False})
+        except OSError:
+            # Cliente desconectou durante o envio
+            pass
+        finally:
+            desconexao.cancel()
+            self.barramento.cancelar(assinante)
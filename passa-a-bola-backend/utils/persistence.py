@@ -4,39 +4,1238 @@ Funções para salvar, carregar e fazer backup de dados em arquivos
 Registra todas as operações em arquivo de log
 """
 
+import atexit
+import itertools
 import json
 import os
+import queue
+import shutil
+import threading
+import time
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from pathlib import Path
 
+from utils.metricas import registro_metricas
+
 # Diretório base para armazenamento de dados
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATABASE_DIR = BASE_DIR / "database"
 
-# Criar diretório database se não existir
-DATABASE_DIR.mkdir(exist_ok=True)
+# O diretório database é criado na primeira gravação, não no import
+# (início rápido em ambientes serverless)
+_diretorio_criado = False
+
+# Cache em memória das coleções: cada coleção é lida do disco uma única vez
+# e invalidada quando o arquivo muda (mtime/tamanho)
+_cache_colecoes: Dict[str, Dict[str, Any]] = {}
+_cache_lock = threading.RLock()
+_estatisticas_cache = {"hits": 0, "misses": 0, "recargas": 0}
+
+# Lock público das coleções: as notificações de mutação são feitas com ele
+# adquirido. Quem mantém estruturas derivadas (índices) deve adquiri-lo
+# antes do próprio lock ao ler a coleção inteira
+colecoes_lock = _cache_lock
+
+# Observadores de mutações por coleção: callback(operacao, antigo, novo)
+# operacao: "inserir", "atualizar", "deletar" ou "recarregar" (coleção
+# substituída ou relida do disco; antigo e novo são None)
+_observadores: Dict[str, List[Callable[[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]], None]]] = {}
+
+# Chaves únicas por coleção: campo → função de normalização do valor.
+# Verificadas com _cache_lock adquirido nas inserções e atualizações, então
+# duas escritas concorrentes com o mesmo valor não são aceitas ambas
+_chaves_unicas: Dict[str, Dict[str, Callable[[Any], Optional[str]]]] = {}
+
+# Campo de ID declarado por coleção (registrar_campo_id). O backend SQLite
+# usa como chave primária; sem declaração, vale o campo_id da primeira escrita
+_campos_id: Dict[str, str] = {}
+
+# Dados iniciais por coleção: gravados no primeiro acesso se ela estiver
+# vazia (uma vez por processo; a entrada sai daqui ao ser verificada)
+_dados_iniciais: Dict[str, Callable[[], List[Dict[str, Any]]]] = {}
+
+# Versões das coleções e dos registros, para GET condicional (ETag).
+# Um contador monotônico do processo: cada mutação recebe o próximo valor,
+# que vira a versão da coleção e dos registros afetados. Registros sem
+# versão própria usam a "base" (versão da última carga ou substituição da
+# coleção). O prefixo da geração muda a cada início do processo, para que
+# ETags de uma execução anterior nunca coincidam com as atuais
+_GERACAO_VERSOES = format(time.time_ns() // 1_000_000, "x")
+_contador_versoes = itertools.count(1)
+_versoes: Dict[str, Dict[str, Any]] = {}
+
+# Modo journal: cada mutação é anexada a <colecao>_journal.log (uma linha JSON)
+# e o snapshot <colecao>_backup.json é regenerado por compactação periódica
+MODO_JOURNAL = os.getenv("PERSISTENCIA_JOURNAL", "0") == "1"
+INTERVALO_COMPACTACAO = float(os.getenv("PERSISTENCIA_COMPACTACAO_SEGUNDOS", "30"))
+LIMITE_JOURNAL = int(os.getenv("PERSISTENCIA_JOURNAL_LIMITE", "10000"))
+
+_journal_pendentes: Dict[str, int] = {}
+_compactacao_lock = threading.Lock()
+_compactacao_solicitada = threading.Event()
+_compactador_parar = threading.Event()
+_compactador: Optional[threading.Thread] = None
+
+# Gravação adiada (adiar_gravacao=True, fora do modo journal): a mutação vai
+# para o cache na hora e o snapshot é regravado uma única vez por intervalo,
+# agrupando as mutações feitas nele (rajadas de atualizações do mesmo campo)
+INTERVALO_GRAVACAO_ADIADA = float(os.getenv("PERSISTENCIA_GRAVACAO_ADIADA_SEGUNDOS", "0.2"))
+
+_gravacoes_adiadas: set = set()
+_gravacao_adiada_solicitada = threading.Event()
+_gravador_parar = threading.Event()
+_gravador: Optional[threading.Thread] = None
+
+# Backend de armazenamento: "json" (arquivos, padrão) ou "sqlite"
+# (utils/armazenamento_sqlite.py). As funções públicas deste módulo
+# delegam para o backend ativo, então as rotas não precisam conhecê-lo
+BACKEND_ARMAZENAMENTO = os.getenv("PERSISTENCIA_BACKEND", "json").lower()
+_backend = None
+_backend_lock = threading.Lock()
+
+# Log assíncrono: registrar_log apenas enfileira a mensagem; uma thread
+# grava as mensagens em lotes no arquivo logs.txt (com rotação por tamanho)
+LOG_FILE = DATABASE_DIR / "logs.txt"
+LOG_CAPACIDADE_FILA = int(os.getenv("LOG_CAPACIDADE_FILA", "10000"))
+LOG_INTERVALO_FLUSH = float(os.getenv("LOG_INTERVALO_FLUSH", "0.5"))
+LOG_TAMANHO_MAXIMO = int(os.getenv("LOG_TAMANHO_MAXIMO", str(5 * 1024 * 1024)))
+LOG_ARQUIVOS_ROTACIONADOS = int(os.getenv("LOG_ARQUIVOS_ROTACIONADOS", "3"))
+
+_fila_log: "queue.Queue[Tuple[float, str]]" = queue.Queue(maxsize=LOG_CAPACIDADE_FILA)
+_estatisticas_log = {"gravadas": 0, "descartadas": 0, "lotes": 0, "rotacoes": 0}
+# Métricas de E/S (exportadas em /metrics; registro sem lock por thread)
+_metrica_bytes_lidos = registro_metricas.contador(
+    "passabola_persistencia_bytes_lidos_total", "Bytes lidos de snapshots e journals", ("colecao", "arquivo")
+)
+_metrica_bytes_gravados = registro_metricas.contador(
+    "passabola_persistencia_bytes_gravados_total", "Bytes gravados em snapshots e journals", ("colecao", "arquivo")
+)
+_metrica_carregamentos = registro_metricas.contador(
+    "passabola_persistencia_carregamentos_total", "Coleções lidas do disco (primeiro acesso ou arquivo alterado)", ("colecao",)
+)
+_metrica_parse_json = registro_metricas.histograma(
+    "passabola_persistencia_parse_json_segundos", "Tempo de decodificação do JSON dos snapshots", ("colecao",)
+)
+_metrica_lotes_log = registro_metricas.contador("passabola_log_lotes_total", "Gravações em lote no logs.txt")
+_metrica_mensagens_log = registro_metricas.contador("passabola_log_mensagens_total", "Mensagens gravadas no logs.txt")
+_metrica_bytes_log = registro_metricas.contador("passabola_log_bytes_gravados_total", "Bytes gravados no logs.txt")
+
+# Cabeçalho gravado quando logs.txt é criado
+_CABECALHO_LOG = (
+    "=" * 50,
+    "Sistema de Persistência Iniciado",
+    "Passa a Bola - Backend API",
+    "Desenvolvido por: Calçada LTDA",
+    "=" * 50,
+)
+_log_lock = threading.Lock()
+_gravacao_log_lock = threading.Lock()
+_flush_log_solicitado = threading.Event()
+_escritor_log_parar = threading.Event()
+_escritor_log: Optional[threading.Thread] = None
+
+
+def _garantir_diretorio() -> None:
+    """Cria o diretório database antes da primeira gravação"""
+    global _diretorio_criado
+    if not _diretorio_criado:
+        DATABASE_DIR.mkdir(parents=True, exist_ok=True)
+        _diretorio_criado = True
 
 
 def registrar_log(mensagem: str) -> None:
     """
     Registra ações em arquivo de log TXT (REQUISITO OBRIGATÓRIO)
     
+    A mensagem é apenas enfileirada (com o horário da chamada); a gravação
+    em logs.txt é feita em lotes por uma thread em segundo plano. Se a fila
+    estiver cheia, a mensagem é descartada e contabilizada
+    
     Args:
         mensagem (str): Mensagem a ser registrada no log
         
     Example:
         >>> registrar_log("Novo usuário criado: joao@email.com")
     """
+    if _escritor_log is None or not _escritor_log.is_alive():
+        _iniciar_escritor_log()
+    
     try:
-        log_file = DATABASE_DIR / "logs.txt"
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        _fila_log.put_nowait((time.time(), mensagem))
+    except queue.Full:
+        with _log_lock:
+            _estatisticas_log["descartadas"] += 1
+        _flush_log_solicitado.set()
+        return
+    
+    # Fila passando da metade: antecipar o próximo lote
+    if _fila_log.qsize() >= LOG_CAPACIDADE_FILA // 2:
+        _flush_log_solicitado.set()
+
+
+def _rotacionar_log() -> None:
+    """Rotaciona logs.txt → logs.txt.1 → logs.txt.2 ... (mantém os mais recentes)"""
+    for numero in range(LOG_ARQUIVOS_ROTACIONADOS - 1, 0, -1):
+        origem = LOG_FILE.with_name(f"{LOG_FILE.name}.{numero}")
+        if origem.exists():
+            os.replace(origem, LOG_FILE.with_name(f"{LOG_FILE.name}.{numero + 1}"))
+    if LOG_ARQUIVOS_ROTACIONADOS > 0:
+        os.replace(LOG_FILE, LOG_FILE.with_name(f"{LOG_FILE.name}.1"))
+    else:
+        LOG_FILE.unlink()
+    _estatisticas_log["rotacoes"] += 1
+
+
+def _gravar_lote_log() -> int:
+    """
+    Esvazia a fila de log e grava todas as mensagens em uma única escrita
+    Retorna a quantidade de mensagens gravadas
+    """
+    with _gravacao_log_lock:
+        linhas = []
+        segundo_anterior = None
+        timestamp = ""
         
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(f"[{timestamp}] {mensagem}\n")
+        while True:
+            try:
+                instante, mensagem = _fila_log.get_nowait()
+            except queue.Empty:
+                break
             
-    except IOError as e:
-        print(f"ERRO ao registrar log: {e}")
+            # Formatar o horário uma vez por segundo, não por mensagem
+            segundo = int(instante)
+            if segundo != segundo_anterior:
+                timestamp = datetime.fromtimestamp(segundo).strftime("%Y-%m-%d %H:%M:%S")
+                segundo_anterior = segundo
+            linhas.append(f"[{timestamp}] {mensagem}\n")
+        
+        if not linhas:
+            return 0
+        
+        try:
+            conteudo = "".join(linhas)
+            _garantir_diretorio()
+            if not LOG_FILE.exists():
+                # Arquivo novo: cabeçalho com o horário da primeira mensagem do lote
+                inicio = linhas[0][:linhas[0].index("]") + 1]
+                conteudo = "".join(f"{inicio} {linha}\n" for linha in _CABECALHO_LOG) + conteudo
+            conteudo_bytes = conteudo.encode('utf-8')
+            if LOG_FILE.exists() and LOG_FILE.stat().st_size + len(conteudo_bytes) > LOG_TAMANHO_MAXIMO:
+                _rotacionar_log()
+            
+            with open(LOG_FILE, 'ab') as f:
+                f.write(conteudo_bytes)
+            
+            with _log_lock:
+                _estatisticas_log["gravadas"] += len(linhas)
+                _estatisticas_log["lotes"] += 1
+            _metrica_lotes_log.incrementar()
+            _metrica_mensagens_log.incrementar(valor=len(linhas))
+            _metrica_bytes_log.incrementar(valor=len(conteudo_bytes))
+                
+        except IOError as e:
+            print(f"ERRO ao registrar log: {e}")
+        
+        return len(linhas)
+
+
+def _loop_escritor_log() -> None:
+    """Thread que grava a fila de log a cada LOG_INTERVALO_FLUSH segundos"""
+    while not _escritor_log_parar.is_set():
+        _flush_log_solicitado.wait(LOG_INTERVALO_FLUSH)
+        _flush_log_solicitado.clear()
+        _gravar_lote_log()
+
+
+def _iniciar_escritor_log() -> None:
+    """Inicia a thread de gravação do log (na primeira mensagem)"""
+    global _escritor_log
+    with _log_lock:
+        if _escritor_log is not None and _escritor_log.is_alive():
+            return
+        _escritor_log_parar.clear()
+        _escritor_log = threading.Thread(target=_loop_escritor_log, name="escritor-log", daemon=True)
+        _escritor_log.start()
+
+
+def encerrar_log() -> None:
+    """
+    Para a thread de log e grava todas as mensagens ainda na fila
+    Chamada no shutdown da API (e automaticamente ao encerrar o processo)
+    """
+    global _escritor_log
+    _escritor_log_parar.set()
+    _flush_log_solicitado.set()
+    
+    escritor = _escritor_log
+    if escritor is not None and escritor is not threading.current_thread():
+        escritor.join(timeout=max(LOG_INTERVALO_FLUSH, 1.0) * 2)
+    _escritor_log = None
+    
+    _gravar_lote_log()
+
+
+def estatisticas_log() -> Dict[str, int]:
+    """
+    Retorna os contadores do log assíncrono
+    
+    Returns:
+        Dict: profundidade e capacidade da fila, mensagens gravadas,
+        descartadas (fila cheia), lotes gravados e rotações do arquivo
+        
+    Example:
+        >>> estatisticas_log()
+        {'gravadas': 530, 'descartadas': 0, 'lotes': 41, 'rotacoes': 0, 'profundidade_fila': 2, 'capacidade_fila': 10000}
+    """
+    with _log_lock:
+        estatisticas = dict(_estatisticas_log)
+    estatisticas["profundidade_fila"] = _fila_log.qsize()
+    estatisticas["capacidade_fila"] = LOG_CAPACIDADE_FILA
+    return estatisticas
+
+
+atexit.register(encerrar_log)
+
+
+def registrar_observador(collection_name: str, callback: Callable[[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]], None]) -> None:
+    """
+    Registra uma função chamada a cada mutação da coleção
+    
+    Args:
+        collection_name (str): Nome da coleção
+        callback (Callable): Recebe (operacao, registro_antigo, registro_novo)
+        
+    Example:
+        >>> registrar_observador("jogadoras", lambda op, antigo, novo: print(op))
+    """
+    with _cache_lock:
+        _observadores.setdefault(collection_name, []).append(callback)
+
+
+def registrar_dados_iniciais(collection_name: str, fornecedor: Callable[[], List[Dict[str, Any]]]) -> None:
+    """
+    Registra os dados iniciais (seed) de uma coleção
+    
+    Nada é lido nem gravado agora: no primeiro acesso à coleção, se ela não
+    existir ou estiver vazia, o fornecedor é chamado e o resultado gravado
+    como snapshot antes da leitura ou escrita que a acessou. Com o backend
+    SQLite, a verificação acontece quando o backend é aberto.
+    
+    Args:
+        collection_name (str): Nome da coleção
+        fornecedor (Callable): Retorna a lista de registros iniciais
+        
+    Example:
+        >>> registrar_dados_iniciais("users", lambda: [usuario_teste])
+        >>> carregar_backup_json("users")  # coleção vazia: grava o seed
+        [{'_id': '1', 'email': 'teste@passabola.com', ...}]
+    """
+    with _cache_lock:
+        _dados_iniciais[collection_name] = fornecedor
+
+
+def _gerar_dados_iniciais(collection_name: str) -> Optional[List[Dict[str, Any]]]:
+    """Chama o fornecedor registrado para a coleção (None se não houver ou falhar)"""
+    fornecedor = _dados_iniciais.pop(collection_name, None)
+    if fornecedor is None:
+        return None
+    try:
+        return fornecedor() or None
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao gerar dados iniciais de {collection_name}: {str(e)}")
+        return None
+
+
+def _notificar(collection_name: str, operacao: str,
+               antigo: Optional[Dict[str, Any]] = None, novo: Optional[Dict[str, Any]] = None) -> None:
+    """Avisa os observadores de uma coleção (chamada com _cache_lock adquirido)"""
+    for callback in _observadores.get(collection_name, ()):
+        try:
+            callback(operacao, antigo, novo)
+        except Exception as e:
+            registrar_log(f"✗ ERRO em observador de {collection_name}: {str(e)}")
+
+
+def _avancar_versao(collection_name: str, registro_ids: Optional[List[str]] = None) -> None:
+    """
+    Avança a versão da coleção após uma mutação (chamada com _cache_lock
+    adquirido). Com registro_ids, só esses registros mudam de versão
+    (removidos também, para que um ETag antigo não valha para um 404);
+    sem registro_ids, a coleção inteira foi substituída ou relida
+    """
+    versao = next(_contador_versoes)
+    agora = time.time()
+    estado = _versoes.get(collection_name)
+    if estado is None or registro_ids is None:
+        _versoes[collection_name] = {
+            "versao": versao, "modificado": agora,
+            "base": versao, "base_modificado": agora,
+            "registros": {}
+        }
+        return
+    
+    estado["versao"] = versao
+    estado["modificado"] = agora
+    registros = estado["registros"]
+    for registro_id in registro_ids:
+        registros[str(registro_id)] = (versao, agora)
+
+
+def versao_colecao(collection_name: str, registro_id: Optional[str] = None) -> Tuple[str, float]:
+    """
+    Versão atual de uma coleção (ou de um registro dela), para ETag e
+    Last-Modified
+    
+    Não copia nem serializa dados: com a coleção em cache, custa um stat
+    do arquivo (para detectar alterações externas) e consultas a dicionários.
+    A versão só cresce; qualquer mutação da coleção muda a versão da
+    coleção, e a de um registro muda quando ele é alterado ou removido
+    
+    Args:
+        collection_name (str): Nome da coleção
+        registro_id (str, optional): ID do registro
+        
+    Returns:
+        Tuple: (versão opaca, instante da última modificação em epoch)
+        
+    Example:
+        >>> versao_colecao("jogadoras")
+        ('192a7c3e1f0-57', 1760790000.123)
+        >>> versao_colecao("jogadoras", "7")
+        ('192a7c3e1f0-12', 1760789000.456)
+    """
+    with _cache_lock:
+        if _backend_ativo() is None:
+            # Detecta alteração externa do arquivo (relê e avança a versão)
+            _entrada_colecao(collection_name)
+        
+        estado = _versoes.get(collection_name)
+        if estado is None:
+            _avancar_versao(collection_name)
+            estado = _versoes[collection_name]
+        
+        return _versao_estado(estado, registro_id)
+
+
+def _versao_estado(estado: Dict[str, Any], registro_id: Optional[str]) -> Tuple[str, float]:
+    """Versão e instante da coleção (ou do registro) no estado de versões"""
+    if registro_id is None:
+        versao, modificado = estado["versao"], estado["modificado"]
+    else:
+        versao, modificado = estado["registros"].get(
+            str(registro_id), (estado["base"], estado["base_modificado"])
+        )
+    return f"{_GERACAO_VERSOES}-{versao}", modificado
+
+
+def versao_colecao_imediata(collection_name: str, registro_id: Optional[str] = None) -> Optional[Tuple[str, float]]:
+    """
+    versao_colecao sem esperar pelo lock das coleções (para o loop de eventos)
+    
+    Só responde com a coleção em cache e o arquivo inalterado; não lê o
+    disco e não bloqueia. Retorna None quando o lock está ocupado ou a
+    coleção precisaria ser (re)lida: use versao_colecao fora do loop.
+    
+    Example:
+        >>> versao_colecao_imediata("jogadoras", "7")
+        ('192a7c3e1f0-12', 1760789000.456)
+    """
+    if not _cache_lock.acquire(blocking=False):
+        return None
+    try:
+        estado = _versoes.get(collection_name)
+        if estado is None or _entrada_em_cache(collection_name) is None:
+            return None
+        return _versao_estado(estado, registro_id)
+    finally:
+        _cache_lock.release()
+
+
+def _arquivo_colecao(collection_name: str) -> Path:
+    """Retorna o caminho do arquivo de backup de uma coleção"""
+    return DATABASE_DIR / f"{collection_name}_backup.json"
+
+
+def _arquivo_journal(collection_name: str) -> Path:
+    """Retorna o caminho do journal de mutações de uma coleção"""
+    return DATABASE_DIR / f"{collection_name}_journal.log"
+
+
+def _arquivo_journal_compactando(collection_name: str) -> Path:
+    """Journal separado durante a compactação (reproduzido antes do atual)"""
+    return DATABASE_DIR / f"{collection_name}_journal.log.compactando"
+
+
+def _assinatura_arquivo(stat_result: os.stat_result) -> Tuple[int, int]:
+    """Assinatura usada para detectar alterações no arquivo (mtime, tamanho)"""
+    return (stat_result.st_mtime_ns, stat_result.st_size)
+
+
+def _assinatura_atual(collection_name: str) -> Optional[Tuple[int, int]]:
+    """Assinatura do snapshot em disco, ou None se o arquivo não existir"""
+    try:
+        return _assinatura_arquivo(os.stat(_arquivo_colecao(collection_name)))
+    except FileNotFoundError:
+        return None
+
+
+def estatisticas_cache() -> Dict[str, int]:
+    """
+    Retorna os contadores do cache de coleções
+    
+    Returns:
+        Dict: hits, misses, recargas, número de coleções em memória e
+        entradas de journal ainda não compactadas
+        
+    Example:
+        >>> estatisticas_cache()
+        {'hits': 120, 'misses': 3, 'recargas': 0, 'colecoes': 3, 'journal_pendentes': 0}
+    """
+    with _cache_lock:
+        estatisticas = dict(_estatisticas_cache)
+        estatisticas["colecoes"] = len(_cache_colecoes)
+        estatisticas["journal_pendentes"] = sum(_journal_pendentes.values())
+    return estatisticas
+
+
+def _entrada_em_cache(collection_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Entrada de cache da coleção se ainda valer para o arquivo em disco
+    (backend JSON), sem nunca ler o arquivo; None caso contrário.
+    Deve ser chamada com _cache_lock adquirido
+    """
+    if BACKEND_ARMAZENAMENTO != "json":
+        return None
+    entrada = _cache_colecoes.get(collection_name)
+    if entrada is None or entrada["assinatura"] != _assinatura_atual(collection_name):
+        return None
+    return entrada
+
+
+def consultar_indice_imediato(collection_name: str, campo: str, valor: Any,
+                              unico: bool = False) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Consulta O(1) a um índice já montado, sem esperar pelo lock das
+    coleções (para o loop de eventos)
+    
+    Não lê o disco, não monta índices e não bloqueia: com o lock ocupado,
+    a coleção fora do cache (ou alterada em disco) ou o índice ainda não
+    montado, a consulta não é respondida e deve ser feita com
+    buscar_registro_json / buscar_por_chave_unica fora do loop.
+    
+    Args:
+        collection_name (str): Nome da coleção
+        campo (str): Campo de ID ou chave única
+        valor (Any): ID ou valor da chave única (normalizado aqui)
+        unico (bool): campo é uma chave única (registrar_chave_unica)
+        
+    Returns:
+        Tuple: (respondida, registro encontrado ou None)
+        
+    Example:
+        >>> consultar_indice_imediato("jogadoras", "id", "7")
+        (True, {'id': '7', 'nome': 'Marta', ...})
+        >>> consultar_indice_imediato("users", "email", "TESTE@passabola.com", unico=True)
+        (True, {'_id': '1', 'email': 'teste@passabola.com', ...})
+    """
+    if not _cache_lock.acquire(blocking=False):
+        return False, None
+    try:
+        entrada = _entrada_em_cache(collection_name)
+        if entrada is None:
+            return False, None
+        
+        if unico:
+            indice = entrada.get("unicos", {}).get(campo)
+            if indice is None:
+                return False, None
+            normalizar, indice = indice
+            chave = normalizar(valor)
+        else:
+            indice = entrada.get("indices", {}).get(campo)
+            if indice is None:
+                return False, None
+            chave = str(valor)
+        
+        posicao = indice.get(chave) if chave is not None else None
+        return True, (entrada["dados"][posicao] if posicao is not None else None)
+    finally:
+        _cache_lock.release()
+
+
+def limpar_cache(collection_name: Optional[str] = None) -> None:
+    """
+    Descarta o cache de uma coleção (ou de todas)
+    
+    Args:
+        collection_name (str, optional): Coleção a descartar. Se None, limpa tudo
+    """
+    with _cache_lock:
+        if collection_name is None:
+            _cache_colecoes.clear()
+        else:
+            _cache_colecoes.pop(collection_name, None)
+
+
+def _escrever_snapshot_temporario(collection_name: str, data: List[Dict[str, Any]]) -> Path:
+    """Grava o snapshot completo em um arquivo temporário e retorna seu caminho"""
+    filename = _arquivo_colecao(collection_name)
+    temporario = filename.with_name(filename.name + ".tmp")
+    
+    _garantir_diretorio()
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+    _metrica_bytes_gravados.incrementar((collection_name, "snapshot"), os.stat(temporario).st_size)
+    return temporario
+
+
+def _publicar_snapshot(collection_name: str, temporario: Path) -> Tuple[int, int]:
+    """Substitui o snapshot de forma atômica (rename) e retorna sua assinatura"""
+    filename = _arquivo_colecao(collection_name)
+    os.replace(temporario, filename)
+    return _assinatura_arquivo(os.stat(filename))
+
+
+def _gravar_snapshot(collection_name: str, data: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Grava o snapshot completo da coleção de forma atômica (arquivo temporário
+    + rename) e retorna a assinatura do arquivo gravado
+    """
+    temporario = _escrever_snapshot_temporario(collection_name, data)
+    return _publicar_snapshot(collection_name, temporario)
+
+
+def _nova_entrada(dados: List[Dict[str, Any]], assinatura: Optional[Tuple[int, int]]) -> Dict[str, Any]:
+    """
+    Entrada de cache de uma coleção: registros por posição (dict na ordem
+    da coleção), assinatura do arquivo e índices. A posição de um registro
+    não muda enquanto ele existe: remoções e substituições não deslocam os
+    demais, e inserções recebem a próxima posição livre
+    """
+    return {
+        "dados": dict(enumerate(dados)),
+        "proxima_posicao": len(dados),
+        "assinatura": assinatura,
+        "indices": {}
+    }
+
+
+def _registros(entrada: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Registros da entrada de cache, na ordem da coleção (lista nova)"""
+    return list(entrada["dados"].values())
+
+
+def _indice_colecao(entrada: Dict[str, Any], campo: str) -> Dict[str, int]:
+    """
+    Retorna o índice ID → posição de uma coleção em cache para o campo
+    informado. O índice é montado na primeira consulta e depois mantido
+    incrementalmente a cada inserção/atualização/remoção
+    """
+    indices = entrada.setdefault("indices", {})
+    indice = indices.get(campo)
+    if indice is None:
+        indice = {}
+        for posicao, item in entrada["dados"].items():
+            if campo in item:
+                _indexar(entrada, campo, indice, str(item[campo]), posicao)
+        indices[campo] = indice
+    return indice
+
+
+def _indexar(entrada: Dict[str, Any], nome: Any, indice: Dict[str, int], chave: str, posicao: int) -> None:
+    """
+    Indexa a chave na posição, se ainda não estiver no índice (vale o
+    primeiro registro). Chaves repetidas (dados antigos) marcam o índice,
+    para que a remoção procure o próximo registro com a mesma chave
+    """
+    if indice.setdefault(chave, posicao) != posicao:
+        entrada.setdefault("repetidos", set()).add(nome)
+
+
+def _desindexar(entrada: Dict[str, Any], nome: Any, indice: Dict[str, int], chave: str, posicao: int,
+                chave_do: Callable[[Dict[str, Any]], Optional[str]]) -> None:
+    """
+    Retira a chave do índice se ela aponta para a posição. Em índices com
+    chaves repetidas, o próximo registro com a mesma chave assume o lugar
+    (varredura, só nesses índices)
+    """
+    if indice.get(chave) != posicao:
+        return
+    del indice[chave]
+    if nome in entrada.get("repetidos", ()):
+        for outra, item in entrada["dados"].items():
+            if outra != posicao and chave_do(item) == chave:
+                indice[chave] = outra
+                break
+
+
+def _cache_inserir(entrada: Dict[str, Any], registro: Dict[str, Any]) -> None:
+    """Anexa um registro à coleção em cache e atualiza os índices"""
+    posicao = entrada["proxima_posicao"]
+    entrada["proxima_posicao"] = posicao + 1
+    entrada["dados"][posicao] = registro
+    
+    for campo, indice in entrada.get("indices", {}).items():
+        if campo in registro:
+            _indexar(entrada, campo, indice, str(registro[campo]), posicao)
+    
+    for campo, (normalizar, indice) in entrada.get("unicos", {}).items():
+        chave = normalizar(registro.get(campo))
+        if chave is not None:
+            _indexar(entrada, ("unico", campo), indice, chave, posicao)
+
+
+def _cache_substituir(entrada: Dict[str, Any], posicao: int, novo: Dict[str, Any]) -> None:
+    """Substitui o registro de uma posição e ajusta os índices afetados"""
+    dados = entrada["dados"]
+    antigo = dados[posicao]
+    dados[posicao] = novo
+    
+    for campo, indice in entrada.get("indices", {}).items():
+        chave_antiga = str(antigo[campo]) if campo in antigo else None
+        chave_nova = str(novo[campo]) if campo in novo else None
+        if chave_antiga != chave_nova and chave_antiga is not None:
+            _desindexar(entrada, campo, indice, chave_antiga, posicao,
+                        lambda item, campo=campo: str(item[campo]) if campo in item else None)
+        if chave_nova is not None:
+            _indexar(entrada, campo, indice, chave_nova, posicao)
+    
+    for campo, (normalizar, indice) in entrada.get("unicos", {}).items():
+        chave_antiga, chave_nova = normalizar(antigo.get(campo)), normalizar(novo.get(campo))
+        if chave_antiga != chave_nova and chave_antiga is not None:
+            _desindexar(entrada, ("unico", campo), indice, chave_antiga, posicao,
+                        lambda item, campo=campo, normalizar=normalizar: normalizar(item.get(campo)))
+        if chave_nova is not None:
+            _indexar(entrada, ("unico", campo), indice, chave_nova, posicao)
+
+
+def _cache_remover(entrada: Dict[str, Any], posicao: int) -> None:
+    """
+    Remove o registro de uma posição em O(1): os demais mantêm a ordem e a
+    posição, então só as chaves do removido saem dos índices
+    """
+    removido = entrada["dados"].pop(posicao)
+    
+    for campo, indice in entrada.get("indices", {}).items():
+        if campo in removido:
+            _desindexar(entrada, campo, indice, str(removido[campo]), posicao,
+                        lambda item, campo=campo: str(item[campo]) if campo in item else None)
+    
+    for campo, (normalizar, indice) in entrada.get("unicos", {}).items():
+        chave = normalizar(removido.get(campo))
+        if chave is not None:
+            _desindexar(entrada, ("unico", campo), indice, chave, posicao,
+                        lambda item, campo=campo, normalizar=normalizar: normalizar(item.get(campo)))
+
+
+def normalizar_chave(valor: Any) -> Optional[str]:
+    """Normalização padrão das chaves únicas (sem espaços nas pontas e sem diferenciar maiúsculas)"""
+    if valor is None:
+        return None
+    return str(valor).strip().casefold() or None
+
+
+class ChaveDuplicada(ValueError):
+    """Escrita recusada: o valor de uma chave única já existe na coleção"""
+
+    def __init__(self, collection_name: str, campo: str, valor: Any):
+        super().__init__(f"Valor duplicado para {campo} em {collection_name}: {valor}")
+        self.collection_name = collection_name
+        self.campo = campo
+        self.valor = valor
+
+
+def registrar_chave_unica(collection_name: str, campo: str,
+                          normalizar: Callable[[Any], Optional[str]] = normalizar_chave) -> None:
+    """
+    Declara um campo da coleção como chave única
+    
+    Os valores são comparados normalizados (por padrão sem diferenciar
+    maiúsculas). Inserções (inclusive em lote), atualizações e
+    modificar_registro_json com um valor já existente lançam ChaveDuplicada;
+    a verificação e a escrita acontecem com o lock das coleções, sem janela
+    entre elas. Registros sem o campo não participam.
+    
+    Args:
+        collection_name (str): Nome da coleção
+        campo (str): Campo único (ex: "email")
+        normalizar (Callable): Valor → chave comparada (None = sem chave)
+        
+    Example:
+        >>> registrar_chave_unica("users", "email")
+        >>> buscar_por_chave_unica("users", "email", " Teste@PassaBola.com")
+        {'_id': '1', 'email': 'teste@passabola.com', ...}
+    """
+    with _cache_lock:
+        _chaves_unicas.setdefault(collection_name, {})[campo] = normalizar
+        entrada = _cache_colecoes.get(collection_name)
+        if entrada is not None:
+            # Remontado na próxima consulta com a nova normalização
+            entrada.get("unicos", {}).pop(campo, None)
+
+
+def registrar_campo_id(collection_name: str, campo: str) -> None:
+    """
+    Declara o campo de ID de uma coleção ("_id" ou "id")
+    
+    No backend SQLite o campo declarado é a chave primária da coleção,
+    fixada já na primeira leitura; um banco em que a coleção foi
+    registrada com outro campo é migrado no primeiro acesso. Sem
+    declaração, a chave é o campo_id da primeira escrita. No backend JSON
+    o campo continua sendo informado em cada chamada.
+    
+    Args:
+        collection_name (str): Nome da coleção
+        campo (str): Campo de ID
+        
+    Example:
+        >>> registrar_campo_id("jogadoras", "id")
+    """
+    with _cache_lock:
+        _campos_id[collection_name] = campo
+
+
+def campo_id_declarado(collection_name: str) -> Optional[str]:
+    """Campo de ID declarado com registrar_campo_id (None se não houver)"""
+    return _campos_id.get(collection_name)
+
+
+def _normalizador(collection_name: str, campo: str) -> Callable[[Any], Optional[str]]:
+    return _chaves_unicas.get(collection_name, {}).get(campo, normalizar_chave)
+
+
+def _indice_unico(entrada: Dict[str, Any], campo: str, normalizar: Callable[[Any], Optional[str]]) -> Dict[str, int]:
+    """
+    Retorna o índice valor normalizado → posição de uma coleção em cache,
+    montado na primeira consulta e mantido junto com os demais índices
+    (valores repetidos de dados antigos: vale o primeiro registro)
+    """
+    unicos = entrada.setdefault("unicos", {})
+    if campo not in unicos:
+        indice: Dict[str, int] = {}
+        for posicao, item in entrada["dados"].items():
+            chave = normalizar(item.get(campo))
+            if chave is not None:
+                _indexar(entrada, ("unico", campo), indice, chave, posicao)
+        unicos[campo] = (normalizar, indice)
+    return unicos[campo][1]
+
+
+def _verificar_chaves_unicas(collection_name: str, registros: List[Dict[str, Any]],
+                             entrada: Optional[Dict[str, Any]] = None, backend: Any = None,
+                             posicao: Optional[int] = None, registro_id: Optional[str] = None,
+                             campo_id: str = "_id") -> None:
+    """
+    Lança ChaveDuplicada se algum registro repetir uma chave única já
+    existente (ou de outro registro da lista). posicao/registro_id
+    identificam o próprio registro em uma atualização. Deve ser chamada
+    com _cache_lock adquirido, antes de alterar a coleção
+    """
+    for campo, normalizar in _chaves_unicas.get(collection_name, {}).items():
+        vistas = set()
+        for registro in registros:
+            chave = normalizar(registro.get(campo))
+            if chave is None:
+                continue
+            if chave in vistas:
+                raise ChaveDuplicada(collection_name, campo, registro.get(campo))
+            vistas.add(chave)
+            
+            if backend is not None:
+                existentes = backend.buscar_por_chave(collection_name, campo, chave, normalizar)
+                duplicada = any(registro_id is None or str(item.get(campo_id)) != str(registro_id) for item in existentes)
+            else:
+                existente = _indice_unico(entrada, campo, normalizar).get(chave) if entrada is not None else None
+                duplicada = existente is not None and existente != posicao
+            if duplicada:
+                raise ChaveDuplicada(collection_name, campo, registro.get(campo))
+
+
+def _aplicar_entrada_journal(entrada_cache: Dict[str, Any], entrada: Dict[str, Any]) -> None:
+    """
+    Reaplica uma mutação do journal sobre a coleção
+    A operação é idempotente por ID, então reaplicar entradas já presentes
+    no snapshot não altera o resultado
+    """
+    campo = entrada.get("campo", "_id")
+    indice = _indice_colecao(entrada_cache, campo)
+    operacao = entrada.get("op")
+    
+    if operacao == "inserir":
+        registro = entrada["registro"]
+        posicao = indice.get(str(registro.get(campo)))
+        if posicao is None:
+            _cache_inserir(entrada_cache, registro)
+        else:
+            _cache_substituir(entrada_cache, posicao, registro)
+    elif operacao == "inserir_lote":
+        # Lote inteiro em uma única linha: ou é reaplicado todo, ou nada
+        for registro in entrada["registros"]:
+            posicao = indice.get(str(registro.get(campo)))
+            if posicao is None:
+                _cache_inserir(entrada_cache, registro)
+            else:
+                _cache_substituir(entrada_cache, posicao, registro)
+    elif operacao == "atualizar":
+        posicao = indice.get(str(entrada["id"]))
+        if posicao is not None:
+            atual = entrada_cache["dados"][posicao]
+            _cache_substituir(entrada_cache, posicao, {**atual, **entrada["dados"]})
+    elif operacao == "atualizar_lote":
+        for registro_id, dados in entrada["alteracoes"].items():
+            posicao = indice.get(str(registro_id))
+            if posicao is not None:
+                atual = entrada_cache["dados"][posicao]
+                _cache_substituir(entrada_cache, posicao, {**atual, **dados})
+    elif operacao == "deletar":
+        posicao = indice.get(str(entrada["id"]))
+        if posicao is not None:
+            _cache_remover(entrada_cache, posicao)
+
+
+def _reproduzir_journal(collection_name: str, entrada_cache: Dict[str, Any]) -> int:
+    """
+    Reproduz o journal (e um journal em compactação interrompida) sobre os
+    dados do snapshot. Retorna a quantidade de entradas aplicadas
+    """
+    aplicadas = 0
+    
+    for arquivo in (_arquivo_journal_compactando(collection_name), _arquivo_journal(collection_name)):
+        if not arquivo.exists():
+            continue
+        
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            _metrica_bytes_lidos.incrementar((collection_name, "journal"), os.fstat(f.fileno()).st_size)
+            for numero, linha in enumerate(f, start=1):
+                if not linha.strip():
+                    continue
+                try:
+                    entrada = json.loads(linha)
+                except json.JSONDecodeError:
+                    # Linha parcial de uma gravação interrompida
+                    registrar_log(f"⚠ Entrada inválida ignorada no journal {arquivo.name}: linha {numero}")
+                    continue
+                
+                _aplicar_entrada_journal(entrada_cache, entrada)
+                aplicadas += 1
+    
+    return aplicadas
+
+
+def _ler_colecao(collection_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Lê a coleção do disco (snapshot + journal, se ativo) e retorna a
+    entrada de cache correspondente, ou None se a coleção não existir
+    """
+    filename = _arquivo_colecao(collection_name)
+    entrada_cache = _nova_entrada([], None)
+    
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            assinatura = _assinatura_arquivo(os.fstat(f.fileno()))
+            conteudo = f.read()
+        _metrica_bytes_lidos.incrementar((collection_name, "snapshot"), assinatura[1])
+        inicio = time.perf_counter()
+        entrada_cache = _nova_entrada(json.loads(conteudo), assinatura)
+        _metrica_parse_json.observar(time.perf_counter() - inicio, (collection_name,))
+        del conteudo
+    except FileNotFoundError:
+        if not MODO_JOURNAL:
+            return None
+    
+    if MODO_JOURNAL:
+        aplicadas = _reproduzir_journal(collection_name, entrada_cache)
+        if entrada_cache["assinatura"] is None and aplicadas == 0:
+            return None
+        if aplicadas:
+            _journal_pendentes[collection_name] = aplicadas
+            registrar_log(f"✓ Journal reproduzido: {collection_name} ({aplicadas} entradas)")
+    
+    _metrica_carregamentos.incrementar((collection_name,))
+    return entrada_cache
+
+
+def _entrada_colecao(collection_name: str, criar: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Retorna a entrada de cache da coleção (dados, assinatura e índices),
+    carregando do disco quando necessário. Com criar=True, uma coleção
+    inexistente é criada vazia. Deve ser chamada com _cache_lock adquirido
+    """
+    assinatura = _assinatura_atual(collection_name)
+    entrada = _cache_colecoes.get(collection_name)
+    if entrada is not None and entrada["assinatura"] == assinatura:
+        _estatisticas_cache["hits"] += 1
+        return entrada
+    
+    nova = _ler_colecao(collection_name)
+    if collection_name in _dados_iniciais:
+        nova = _semear_colecao(collection_name, nova)
+    if nova is None:
+        if _cache_colecoes.pop(collection_name, None) is not None:
+            _avancar_versao(collection_name)
+        if not criar:
+            return None
+        nova = _nova_entrada([], None)
+        _cache_colecoes[collection_name] = nova
+        return nova
+    
+    if entrada is None:
+        _estatisticas_cache["misses"] += 1
+    else:
+        _estatisticas_cache["recargas"] += 1
+    _cache_colecoes[collection_name] = nova
+    _avancar_versao(collection_name)
+    _notificar(collection_name, "recarregar")
+    
+    registrar_log(f"✓ Backup carregado: {collection_name} ({len(nova['dados'])} registros)")
+    return nova
+
+
+def _semear_colecao(collection_name: str, nova: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Primeiro acesso a uma coleção com dados iniciais registrados: se ela
+    estiver vazia (sem snapshot ou sem registros, e sem journal pendente),
+    grava os dados iniciais e retorna a nova entrada de cache.
+    Deve ser chamada com _cache_lock adquirido
+    """
+    if (nova is not None and nova["dados"]) or _journal_pendentes.get(collection_name):
+        _dados_iniciais.pop(collection_name, None)
+        return nova
+    
+    dados = _gerar_dados_iniciais(collection_name)
+    if dados is None:
+        return nova
+    try:
+        assinatura = _gravar_snapshot(collection_name, dados)
+    except (IOError, TypeError, ValueError) as e:
+        registrar_log(f"✗ ERRO ao gravar dados iniciais de {collection_name}: {str(e)}")
+        return nova
+    
+    registrar_log(f"✓ Dados iniciais gravados: {collection_name} ({len(dados)} registros)")
+    return _nova_entrada(dados, assinatura)
+
+
+def _dados_colecao(collection_name: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Retorna uma lista com os registros da coleção mantida em cache,
+    carregando do disco quando necessário. Deve ser chamada com _cache_lock
+    adquirido
+    """
+    entrada = _entrada_colecao(collection_name)
+    return _registros(entrada) if entrada is not None else None
+
+
+def _gerar_id(entrada: Dict[str, Any], campo_id: str) -> str:
+    """Gera o próximo ID numérico livre da coleção (tamanho + 1 em diante)"""
+    indice = _indice_colecao(entrada, campo_id)
+    proximo = len(entrada["dados"]) + 1
+    while str(proximo) in indice:
+        proximo += 1
+    return str(proximo)
+
+
+def _persistir_mutacao(collection_name: str, entrada: Dict[str, Any], quantidade: int = 1,
+                       adiar: bool = False) -> None:
+    """
+    Persiste uma mutação já aplicada ao cache: no modo journal anexa uma
+    linha ao journal (O(tamanho do registro)); caso contrário regrava o
+    snapshot completo, ou só agenda a regravação (adiar=True). quantidade
+    é o número de registros afetados (conta para o limite de compactação).
+    Deve ser chamada com _cache_lock adquirido
+    """
+    try:
+        if MODO_JOURNAL:
+            linha = (json.dumps(entrada, ensure_ascii=False, default=str) + "\n").encode('utf-8')
+            _garantir_diretorio()
+            with open(_arquivo_journal(collection_name), 'ab') as f:
+                f.write(linha)
+            _metrica_bytes_gravados.incrementar((collection_name, "journal"), len(linha))
+            
+            pendentes = _journal_pendentes.get(collection_name, 0) + quantidade
+            _journal_pendentes[collection_name] = pendentes
+            _iniciar_compactador()
+            if pendentes >= LIMITE_JOURNAL:
+                _compactacao_solicitada.set()
+        elif adiar:
+            _gravacoes_adiadas.add(collection_name)
+            _iniciar_gravador()
+            _gravacao_adiada_solicitada.set()
+        else:
+            cache = _cache_colecoes[collection_name]
+            cache["assinatura"] = _gravar_snapshot(collection_name, _registros(cache))
+            # O snapshot completo inclui as mutações adiadas
+            _gravacoes_adiadas.discard(collection_name)
+    except Exception:
+        # Cache pode estar à frente do disco: força releitura
+        _cache_colecoes.pop(collection_name, None)
+        raise
+
+
+def compactar_journal(collection_name: str) -> bool:
+    """
+    Compacta o journal de uma coleção: grava o snapshot completo em
+    <colecao>_backup.json e descarta as entradas já incorporadas.
+    As escritas continuam sendo aceitas enquanto o snapshot é gravado
+    
+    Args:
+        collection_name (str): Nome da coleção
+        
+    Returns:
+        bool: True se compactou (ou não havia nada a compactar)
+    """
+    try:
+        with _compactacao_lock:
+            with _cache_lock:
+                entrada = _cache_colecoes.get(collection_name)
+                pendentes = _journal_pendentes.get(collection_name, 0)
+                if entrada is None or pendentes == 0:
+                    return True
+                
+                dados = _registros(entrada)
+                journal = _arquivo_journal(collection_name)
+                compactando = _arquivo_journal_compactando(collection_name)
+                
+                # Separar o journal atual: novas mutações vão para um arquivo novo
+                if journal.exists():
+                    if compactando.exists():
+                        with open(journal, 'r', encoding='utf-8') as origem, \
+                                open(compactando, 'a', encoding='utf-8') as destino:
+                            shutil.copyfileobj(origem, destino)
+                        journal.unlink()
+                    else:
+                        os.replace(journal, compactando)
+                _journal_pendentes[collection_name] = 0
+            
+            try:
+                temporario = _escrever_snapshot_temporario(collection_name, dados)
+                
+                # Publicar o snapshot e atualizar a assinatura juntos, para
+                # que leitores não vejam o arquivo novo como alteração externa
+                with _cache_lock:
+                    assinatura = _publicar_snapshot(collection_name, temporario)
+                    if _cache_colecoes.get(collection_name) is entrada:
+                        entrada["assinatura"] = assinatura
+            except Exception:
+                with _cache_lock:
+                    _journal_pendentes[collection_name] = _journal_pendentes.get(collection_name, 0) + pendentes
+                raise
+            compactando.unlink(missing_ok=True)
+        
+        registrar_log(f"✓ Journal compactado: {collection_name} ({pendentes} entradas, {len(dados)} registros)")
+        return True
+        
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao compactar journal {collection_name}: {str(e)}")
+        return False
+
+
+def _loop_compactador() -> None:
+    """Thread de compactação periódica do journal"""
+    while not _compactador_parar.is_set():
+        _compactacao_solicitada.wait(INTERVALO_COMPACTACAO)
+        _compactacao_solicitada.clear()
+        
+        with _cache_lock:
+            colecoes = [nome for nome, pendentes in _journal_pendentes.items() if pendentes]
+        for nome in colecoes:
+            compactar_journal(nome)
+
+
+def _iniciar_compactador() -> None:
+    """Inicia a thread de compactação na primeira mutação em modo journal"""
+    global _compactador
+    if _compactador is None or not _compactador.is_alive():
+        _compactador_parar.clear()
+        _compactador = threading.Thread(target=_loop_compactador, name="compactador-journal", daemon=True)
+        _compactador.start()
+
+
+def gravar_adiadas() -> None:
+    """Grava os snapshots das coleções com gravação adiada pendente"""
+    with _cache_lock:
+        colecoes = list(_gravacoes_adiadas)
+        _gravacoes_adiadas.clear()
+        for nome in colecoes:
+            cache = _cache_colecoes.get(nome)
+            if cache is None:
+                continue
+            try:
+                cache["assinatura"] = _gravar_snapshot(nome, _registros(cache))
+            except Exception as e:
+                # Tentar de novo no próximo ciclo
+                _gravacoes_adiadas.add(nome)
+                registrar_log(f"✗ ERRO na gravação adiada de {nome}: {str(e)}")
+
+
+def _loop_gravador() -> None:
+    """Thread das gravações adiadas: espera uma mutação, agrupa por um intervalo e grava"""
+    while not _gravador_parar.is_set():
+        _gravacao_adiada_solicitada.wait()
+        _gravador_parar.wait(INTERVALO_GRAVACAO_ADIADA)
+        _gravacao_adiada_solicitada.clear()
+        gravar_adiadas()
+
+
+def _iniciar_gravador() -> None:
+    """Inicia a thread de gravações adiadas na primeira mutação adiada"""
+    global _gravador
+    if _gravador is None or not _gravador.is_alive():
+        _gravador_parar.clear()
+        _gravador = threading.Thread(target=_loop_gravador, name="gravador-adiado", daemon=True)
+        _gravador.start()
+
+
+def _backend_ativo():
+    """
+    Retorna o backend alternativo em uso (criado na primeira chamada),
+    ou None quando o armazenamento é o JSON deste módulo
+    """
+    global _backend
+    if _backend is None and BACKEND_ARMAZENAMENTO == "sqlite":
+        with _backend_lock:
+            if _backend is None:
+                from utils.armazenamento_sqlite import BackendSQLite
+                backend = BackendSQLite()
+                for collection_name in list(_dados_iniciais):
+                    if not backend.vazia(collection_name):
+                        _dados_iniciais.pop(collection_name, None)
+                        continue
+                    dados = _gerar_dados_iniciais(collection_name)
+                    if dados is not None and backend.salvar(collection_name, dados):
+                        registrar_log(f"✓ Dados iniciais gravados: {collection_name} ({len(dados)} registros)")
+                _backend = backend
+    return _backend
+
+
+def encerrar_persistencia() -> None:
+    """
+    Encerra a persistência: para a compactação em segundo plano,
+    compacta todos os journals pendentes e grava as gravações adiadas
+    (chamada no shutdown da API).
+    Com o backend SQLite, exporta os backups JSON pendentes
+    """
+    global _compactador, _gravador
+    if _backend is not None:
+        _backend.encerrar()
+    
+    _gravador_parar.set()
+    _gravacao_adiada_solicitada.set()
+    if _gravador is not None:
+        _gravador.join(timeout=1)
+        _gravador = None
+    gravar_adiadas()
+    
+    _compactador_parar.set()
+    _compactacao_solicitada.set()
+    if _compactador is not None:
+        _compactador.join(timeout=INTERVALO_COMPACTACAO)
+        _compactador = None
+    
+    with _cache_lock:
+        colecoes = [nome for nome, pendentes in _journal_pendentes.items() if pendentes]
+    for nome in colecoes:
+        compactar_journal(nome)
 
 
 def salvar_backup_json(collection_name: str, data: List[Dict[str, Any]]) -> bool:
@@ -56,7 +1255,14 @@ def salvar_backup_json(collection_name: str, data: List[Dict[str, Any]]) -> bool
         True
     """
     try:
-        filename = DATABASE_DIR / f"{collection_name}_backup.json"
+        backend = _backend_ativo()
+        if backend is not None:
+            with _cache_lock:
+                salvo = backend.salvar(collection_name, data)
+                if salvo:
+                    _avancar_versao(collection_name)
+                    _notificar(collection_name, "recarregar")
+            return salvo
         
         # Converter ObjectId do MongoDB para string se existir
         data_serializable = []
@@ -66,8 +1272,19 @@ def salvar_backup_json(collection_name: str, data: List[Dict[str, Any]]) -> bool
                 item_copy['_id'] = str(item_copy['_id'])
             data_serializable.append(item_copy)
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data_serializable, f, ensure_ascii=False, indent=2, default=str)
+        with _compactacao_lock, _cache_lock:
+            assinatura = _gravar_snapshot(collection_name, data_serializable)
+            
+            # O snapshot completo substitui qualquer journal pendente
+            if MODO_JOURNAL:
+                _arquivo_journal(collection_name).unlink(missing_ok=True)
+                _arquivo_journal_compactando(collection_name).unlink(missing_ok=True)
+                _journal_pendentes[collection_name] = 0
+            
+            # Write-through: o cache passa a refletir o que foi gravado
+            _cache_colecoes[collection_name] = _nova_entrada(data_serializable, assinatura)
+            _avancar_versao(collection_name)
+            _notificar(collection_name, "recarregar")
         
         registrar_log(f"✓ Backup salvo: {collection_name} ({len(data)} registros)")
         return True
@@ -84,6 +1301,12 @@ def carregar_backup_json(collection_name: str) -> List[Dict[str, Any]]:
     """
     Carrega backup dos dados do arquivo JSON (REQUISITO OBRIGATÓRIO)
     
+    A coleção é lida do disco apenas na primeira chamada ou quando o arquivo
+    foi alterado (mtime/tamanho diferentes); nas demais é servida do cache.
+    No modo journal, o journal é reproduzido sobre o snapshot na leitura.
+    A lista retornada é uma cópia; os registros são compartilhados com o
+    cache e não devem ser alterados diretamente.
+    
     Args:
         collection_name (str): Nome da coleção
         
@@ -96,19 +1319,20 @@ def carregar_backup_json(collection_name: str) -> List[Dict[str, Any]]:
         10
     """
     try:
-        filename = DATABASE_DIR / f"{collection_name}_backup.json"
+        backend = _backend_ativo()
+        if backend is not None:
+            return backend.carregar(collection_name)
         
-        if not filename.exists():
-            registrar_log(f"⚠ Arquivo de backup não encontrado: {collection_name}")
-            return []
-        
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with _cache_lock:
+            dados = _dados_colecao(collection_name)
+            if dados is not None:
+                return dados
         
-        registrar_log(f"✓ Backup carregado: {collection_name} ({len(data)} registros)")
-        return data
+        registrar_log(f"⚠ Arquivo de backup não encontrado: {collection_name}")
+        return []
         
     except FileNotFoundError:
+        limpar_cache(collection_name)
         registrar_log(f"⚠ Arquivo não encontrado: {collection_name}")
         return []
     except json.JSONDecodeError as e:
@@ -119,37 +1343,292 @@ def carregar_backup_json(collection_name: str) -> List[Dict[str, Any]]:
         return []
 
 
-def inserir_registro_json(collection_name: str, registro: Dict[str, Any]) -> bool:
+def buscar_por_chave_unica(collection_name: str, campo: str, valor: Any) -> Optional[Dict[str, Any]]:
+    """
+    Busca um registro pelo valor normalizado de uma chave única (CRUD - READ)
+    
+    Consulta direta no índice da chave (montado na primeira busca), sem
+    percorrer a coleção. No backend SQLite, email é consultado por índice.
+    
+    Args:
+        collection_name (str): Nome da coleção
+        campo (str): Campo declarado com registrar_chave_unica (ex: "email")
+        valor (Any): Valor procurado (normalizado antes da busca)
+        
+    Returns:
+        Dict: Registro encontrado ou None
+        
+    Example:
+        >>> buscar_por_chave_unica("users", "email", "TESTE@passabola.com")
+        {'_id': '1', 'nome': 'Usuária Teste', 'email': 'teste@passabola.com', ...}
+    """
+    try:
+        normalizar = _normalizador(collection_name, campo)
+        chave = normalizar(valor)
+        if chave is None:
+            return None
+        
+        backend = _backend_ativo()
+        if backend is not None:
+            encontrados = backend.buscar_por_chave(collection_name, campo, chave, normalizar)
+            return encontrados[0] if encontrados else None
+        
+        with _cache_lock:
+            entrada = _entrada_colecao(collection_name)
+            if entrada is None:
+                return None
+            
+            posicao = _indice_unico(entrada, campo, normalizar).get(chave)
+            return entrada["dados"][posicao] if posicao is not None else None
+        
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao buscar registro em {collection_name}: {str(e)}")
+        return None
+
+
+def gerar_id_json(collection_name: str, campo_id: str = "_id") -> str:
+    """
+    Gera um ID ainda não usado na coleção
+    
+    O ID não fica reservado: para criar um registro, deixe o ID de fora
+    e use o registro retornado por inserir_registro_json, que gera o ID
+    junto com a inserção
+    
+    Args:
+        collection_name (str): Nome da coleção
+        campo_id (str): Campo usado como ID ("_id" ou "id")
+        
+    Returns:
+        str: Novo ID (numérico, em texto)
+        
+    Example:
+        >>> gerar_id_json("jogadoras", campo_id="id")
+        '13'
+    """
+    backend = _backend_ativo()
+    if backend is not None:
+        return backend.gerar_id(collection_name, campo_id)
+    
+    with _cache_lock:
+        return _gerar_id(_entrada_colecao(collection_name, criar=True), campo_id)
+
+
+def buscar_registro_json(collection_name: str, registro_id: str, campo_id: str = "_id") -> Optional[Dict[str, Any]]:
+    """
+    Busca um registro pelo ID usando o índice da coleção (CRUD - READ)
+    
+    Args:
+        collection_name (str): Nome da coleção
+        registro_id (str): ID do registro
+        campo_id (str): Campo usado como ID ("_id" ou "id")
+        
+    Returns:
+        Dict: Registro encontrado ou None
+    """
+    try:
+        backend = _backend_ativo()
+        if backend is not None:
+            return backend.buscar(collection_name, registro_id, campo_id)
+        
+        with _cache_lock:
+            entrada = _entrada_colecao(collection_name)
+            if entrada is None:
+                return None
+            
+            posicao = _indice_colecao(entrada, campo_id).get(str(registro_id))
+            return entrada["dados"][posicao] if posicao is not None else None
+        
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao buscar registro em {collection_name}: {str(e)}")
+        return None
+
+
+def buscar_registros_por_campo(collection_name: str, campo: str, valor: Any) -> List[Dict[str, Any]]:
+    """
+    Busca os registros cujo campo é igual ao valor informado (CRUD - READ)
+    No backend SQLite, email, posicao e data são consultados por índice
+    
+    Args:
+        collection_name (str): Nome da coleção
+        campo (str): Campo a comparar (ex: "email")
+        valor (Any): Valor procurado
+        
+    Returns:
+        List[Dict]: Registros encontrados (vazia se nenhum)
+        
+    Example:
+        >>> buscar_registros_por_campo("users", "email", "teste@passabola.com")
+        [{'_id': '1', 'nome': 'Usuária Teste', ...}]
+    """
+    try:
+        backend = _backend_ativo()
+        if backend is not None:
+            return backend.buscar_por_campo(collection_name, campo, valor)
+        
+        with _cache_lock:
+            entrada = _entrada_colecao(collection_name)
+            dados = entrada["dados"].values() if entrada is not None else ()
+            return [item for item in dados if item.get(campo) == valor]
+        
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao buscar registros em {collection_name}: {str(e)}")
+        return []
+
+
+def inserir_registro_json(collection_name: str, registro: Dict[str, Any], campo_id: str = "_id") -> Optional[Dict[str, Any]]:
     """
     Insere um novo registro no arquivo JSON (CRUD - CREATE)
     
+    Sem o campo de ID no registro, o ID é gerado com o lock das coleções
+    adquirido, junto com a inserção: duas inserções simultâneas nunca
+    recebem o mesmo ID.
+    
     Args:
         collection_name (str): Nome da coleção
         registro (Dict): Dados do registro a inserir
+        campo_id (str): Campo usado como ID; gerado se não vier no registro
         
     Returns:
-        bool: True se inseriu com sucesso
+        Dict: Registro inserido, com o ID (None se falhar ou se o ID já existir)
+        
+    Raises:
+        ChaveDuplicada: se repetir o valor de uma chave única da coleção
+        
+    Example:
+        >>> nova = inserir_registro_json("jogadoras", {"nome": "Marta"}, campo_id="id")
+        >>> nova["id"]
+        '13'
     """
     try:
-        # Carregar dados existentes
-        dados = carregar_backup_json(collection_name)
+        with _cache_lock:
+            backend = _backend_ativo()
+            if backend is not None:
+                _verificar_chaves_unicas(collection_name, [registro], backend=backend)
+                novo = backend.inserir(collection_name, registro, campo_id)
+                if novo is None:
+                    return None
+            else:
+                entrada = _entrada_colecao(collection_name, criar=True)
+                _verificar_chaves_unicas(collection_name, [registro], entrada)
+                
+                # Adicionar novo registro
+                if campo_id not in registro:
+                    novo = {campo_id: _gerar_id(entrada, campo_id), **registro}
+                elif str(registro[campo_id]) in _indice_colecao(entrada, campo_id):
+                    registrar_log(f"⚠ ID duplicado ao inserir em {collection_name}: {registro[campo_id]}")
+                    return None
+                else:
+                    novo = dict(registro)
+                _cache_inserir(entrada, novo)
+                
+                _persistir_mutacao(collection_name, {"op": "inserir", "campo": campo_id, "registro": novo})
+            
+            _avancar_versao(collection_name, [novo.get(campo_id)])
+            _notificar(collection_name, "inserir", None, novo)
         
-        # Adicionar novo registro
-        registro['_id'] = str(len(dados) + 1)  # ID simples
-        dados.append(registro)
+        registrar_log(f"✓ Registro inserido em {collection_name}: {registro.get('nome', registro.get('email', 'N/A'))}")
+        return dict(novo)
         
-        # Salvar de volta
-        salvar_backup_json(collection_name, dados)
+    except ChaveDuplicada:
+        raise
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao inserir registro em {collection_name}: {str(e)}")
+        return None
+
+
+def inserir_registros_json(collection_name: str, registros: List[Dict[str, Any]], campo_id: str = "_id") -> bool:
+    """
+    Insere vários registros com uma única gravação (CRUD - CREATE em lote)
+    
+    Registros sem o campo de ID recebem IDs sequenciais. O lote é gravado
+    inteiro ou não é gravado: uma linha no journal, um snapshot ou uma
+    transação no SQLite.
+    
+    Args:
+        collection_name (str): Nome da coleção
+        registros (List[Dict]): Registros a inserir
+        campo_id (str): Campo usado como ID; gerado se não vier no registro
         
-        registrar_log(f"✓ Registro inserido em {collection_name}: {registro.get('nome', registro.get('email', 'N/A'))}")
+    Returns:
+        bool: True se inseriu o lote (False se algum ID já existir ou se
+        repetir dentro do lote)
+        
+    Raises:
+        ChaveDuplicada: se algum registro repetir o valor de uma chave
+        única (da coleção ou de outro registro do lote); nada é gravado
+        
+    Example:
+        >>> inserir_registros_json("jogadoras", [{"nome": "Marta"}, {"nome": "Formiga"}], campo_id="id")
+        True
+    """
+    if not registros:
+        return True
+    
+    try:
+        with _cache_lock:
+            backend = _backend_ativo()
+            if backend is not None:
+                _verificar_chaves_unicas(collection_name, registros, backend=backend)
+                novos = backend.inserir_lote(collection_name, registros, campo_id)
+                if novos is None:
+                    return False
+                existentes = None
+            else:
+                entrada = _entrada_colecao(collection_name, criar=True)
+                _verificar_chaves_unicas(collection_name, registros, entrada)
+                indice = _indice_colecao(entrada, campo_id)
+                existentes = len(entrada["dados"])
+                
+                # Validar IDs informados antes de alterar o cache
+                informados = set()
+                for registro in registros:
+                    if campo_id in registro:
+                        chave = str(registro[campo_id])
+                        if chave in indice or chave in informados:
+                            registrar_log(f"⚠ ID duplicado na importação em {collection_name}: {chave}")
+                            return False
+                        informados.add(chave)
+                
+                proximo = existentes + 1
+                novos = []
+                for registro in registros:
+                    # Cópia gravada: o ID gerado não altera o dict recebido
+                    novo = {campo_id: None, **registro}
+                    if campo_id not in registro:
+                        while str(proximo) in indice or str(proximo) in informados:
+                            proximo += 1
+                        novo[campo_id] = str(proximo)
+                        proximo += 1
+                    _cache_inserir(entrada, novo)
+                    novos.append(novo)
+                
+                _persistir_mutacao(
+                    collection_name,
+                    {"op": "inserir_lote", "campo": campo_id, "registros": novos},
+                    quantidade=len(novos)
+                )
+            
+            _avancar_versao(collection_name, [novo.get(campo_id) for novo in novos])
+            
+            # Lotes grandes em relação à coleção: remontar os índices uma vez
+            # sai mais barato que aplicar cada inserção
+            if existentes is not None and len(novos) * 10 > existentes:
+                _notificar(collection_name, "recarregar")
+            else:
+                for novo in novos:
+                    _notificar(collection_name, "inserir", None, novo)
+        
+        registrar_log(f"✓ Lote inserido em {collection_name}: {len(novos)} registros")
         return True
         
+    except ChaveDuplicada:
+        raise
     except Exception as e:
-        registrar_log(f"✗ ERRO ao inserir registro em {collection_name}: {str(e)}")
+        registrar_log(f"✗ ERRO ao inserir lote em {collection_name}: {str(e)}")
         return False
 
 
-def atualizar_registro_json(collection_name: str, registro_id: str, novos_dados: Dict[str, Any]) -> bool:
+def atualizar_registro_json(collection_name: str, registro_id: str, novos_dados: Dict[str, Any], campo_id: str = "_id") -> bool:
     """
     Atualiza um registro no arquivo JSON (CRUD - UPDATE)
     
@@ -157,59 +1636,273 @@ def atualizar_registro_json(collection_name: str, registro_id: str, novos_dados:
         collection_name (str): Nome da coleção
         registro_id (str): ID do registro
         novos_dados (Dict): Novos dados
+        campo_id (str): Campo usado como ID ("_id" ou "id")
         
     Returns:
         bool: True se atualizou com sucesso
+        
+    Raises:
+        ChaveDuplicada: se o novo valor de uma chave única já pertencer a
+        outro registro
     """
     try:
-        dados = carregar_backup_json(collection_name)
-        
-        # Encontrar e atualizar registro
-        encontrado = False
-        for i, item in enumerate(dados):
-            if str(item.get('_id')) == str(registro_id):
-                dados[i].update(novos_dados)
-                encontrado = True
-                break
-        
-        if not encontrado:
-            registrar_log(f"⚠ Registro não encontrado para atualizar: {collection_name} ID {registro_id}")
-            return False
-        
-        # Salvar de volta
-        salvar_backup_json(collection_name, dados)
+        with _cache_lock:
+            backend = _backend_ativo()
+            unicos = any(campo in novos_dados for campo in _chaves_unicas.get(collection_name, ()))
+            if backend is not None:
+                if unicos:
+                    _verificar_chaves_unicas(collection_name, [novos_dados], backend=backend,
+                                             registro_id=registro_id, campo_id=campo_id)
+                atual = backend.buscar(collection_name, registro_id, campo_id) if _observadores.get(collection_name) else None
+                if not backend.atualizar(collection_name, registro_id, novos_dados, campo_id):
+                    registrar_log(f"⚠ Registro não encontrado para atualizar: {collection_name} ID {registro_id}")
+                    return False
+                novo = {**atual, **novos_dados} if atual is not None else None
+            else:
+                entrada = _entrada_colecao(collection_name)
+                posicao = _indice_colecao(entrada, campo_id).get(str(registro_id)) if entrada else None
+                
+                if posicao is None:
+                    registrar_log(f"⚠ Registro não encontrado para atualizar: {collection_name} ID {registro_id}")
+                    return False
+                
+                # Substituir por uma cópia: leitores podem estar serializando a
+                # versão anterior do registro
+                atual = entrada["dados"][posicao]
+                novo = {**atual, **novos_dados}
+                if unicos:
+                    _verificar_chaves_unicas(collection_name, [novo], entrada, posicao=posicao)
+                _cache_substituir(entrada, posicao, novo)
+                
+                _persistir_mutacao(collection_name, {
+                    "op": "atualizar", "campo": campo_id, "id": str(registro_id), "dados": novos_dados
+                })
+            
+            _avancar_versao(collection_name, [registro_id])
+            if atual is not None:
+                _notificar(collection_name, "atualizar", atual, novo)
         
         registrar_log(f"✓ Registro atualizado em {collection_name}: ID {registro_id}")
         return True
         
+    except ChaveDuplicada:
+        raise
     except Exception as e:
         registrar_log(f"✗ ERRO ao atualizar registro em {collection_name}: {str(e)}")
         return False
 
 
-def deletar_registro_json(collection_name: str, registro_id: str) -> bool:
+class _ModificacaoRecusada(Exception):
+    """Exceção lançada pela função de modificar_registro_json (repassada a quem chamou)"""
+
+    def __init__(self, erro: Exception):
+        super().__init__(str(erro))
+        self.erro = erro
+
+
+def modificar_registro_json(collection_name: str, registro_id: str,
+                            modificar: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+                            campo_id: str = "_id", adiar_gravacao: bool = False) -> Optional[Dict[str, Any]]:
     """
-    Deleta um registro do arquivo JSON (CRUD - DELETE)
+    Atualiza um registro a partir do seu valor atual, de forma atômica (CRUD - UPDATE)
+    
+    A leitura, a função e a gravação acontecem com o lock das coleções, então
+    nenhuma outra escrita se intercala entre elas (ex.: decrementar um
+    contador sem perder atualizações concorrentes). Uma exceção lançada pela
+    função é repassada sem alterar nada.
     
     Args:
         collection_name (str): Nome da coleção
         registro_id (str): ID do registro
+        modificar (Callable): Recebe uma cópia do registro atual e retorna os
+            campos a alterar (None ou vazio = nada a alterar)
+        campo_id (str): Campo usado como ID ("_id" ou "id")
+        adiar_gravacao (bool): Aplicar no cache agora e regravar o snapshot
+            no próximo ciclo de gravação adiada, junto com as demais
+            mutações (sem efeito no modo journal e no SQLite, que não
+            regravam a coleção inteira)
         
     Returns:
-        bool: True se deletou com sucesso
+        Dict: registro resultante, ou None se não existir ou a gravação falhar
+        
+    Raises:
+        ChaveDuplicada: se a alteração repetir o valor de uma chave única
+        
+    Example:
+        >>> modificar_registro_json("eventos", "1", lambda e: {"vagas_disponiveis": e["vagas_disponiveis"] - 1}, campo_id="id")
+        {'id': '1', ..., 'vagas_disponiveis': 146}
     """
     try:
-        dados = carregar_backup_json(collection_name)
+        with _cache_lock:
+            backend = _backend_ativo()
+            if backend is not None:
+                atual = backend.buscar(collection_name, registro_id, campo_id)
+            else:
+                entrada = _entrada_colecao(collection_name)
+                posicao = _indice_colecao(entrada, campo_id).get(str(registro_id)) if entrada else None
+                atual = entrada["dados"][posicao] if posicao is not None else None
+            
+            if atual is None:
+                registrar_log(f"⚠ Registro não encontrado para atualizar: {collection_name} ID {registro_id}")
+                return None
+            
+            try:
+                alteracoes = modificar(dict(atual))
+            except Exception as e:
+                raise _ModificacaoRecusada(e)
+            if not alteracoes:
+                return atual
+            
+            novo = {**atual, **alteracoes}
+            if any(campo in alteracoes for campo in _chaves_unicas.get(collection_name, ())):
+                _verificar_chaves_unicas(collection_name, [novo], entrada if backend is None else None, backend,
+                                         posicao=posicao if backend is None else None,
+                                         registro_id=registro_id, campo_id=campo_id)
+            if backend is not None:
+                if not backend.atualizar(collection_name, registro_id, alteracoes, campo_id):
+                    return None
+            else:
+                _cache_substituir(entrada, posicao, novo)
+                _persistir_mutacao(collection_name, {
+                    "op": "atualizar", "campo": campo_id, "id": str(registro_id), "dados": alteracoes
+                }, adiar=adiar_gravacao)
+            
+            _avancar_versao(collection_name, [registro_id])
+            _notificar(collection_name, "atualizar", atual, novo)
         
-        # Filtrar removendo o registro
-        dados_filtrados = [item for item in dados if str(item.get('_id')) != str(registro_id)]
+        return novo
         
-        if len(dados_filtrados) == len(dados):
-            registrar_log(f"⚠ Registro não encontrado para deletar: {collection_name} ID {registro_id}")
-            return False
+    except _ModificacaoRecusada as recusa:
+        raise recusa.erro
+    except ChaveDuplicada:
+        raise
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao atualizar registro em {collection_name}: {str(e)}")
+        return None
+
+
+def modificar_registros_json(collection_name: str, registro_ids: List[str],
+                             modificar: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+                             campo_id: str = "_id") -> List[Dict[str, Any]]:
+    """
+    Atualiza vários registros a partir dos seus valores atuais, com uma
+    única gravação (CRUD - UPDATE em lote)
+    
+    Como modificar_registro_json, mas com o lock das coleções adquirido uma
+    vez para todo o lote e uma única gravação: uma linha no journal, um
+    snapshot ou uma transação no SQLite. As alterações são calculadas antes
+    de qualquer mudança, então uma exceção da função não altera nada.
+    
+    Args:
+        collection_name (str): Nome da coleção
+        registro_ids (List[str]): IDs dos registros
+        modificar (Callable): Recebe uma cópia de cada registro e retorna os
+            campos a alterar (None ou vazio = nada a alterar)
+        campo_id (str): Campo usado como ID ("_id" ou "id")
         
-        # Salvar de volta
-        salvar_backup_json(collection_name, dados_filtrados)
+    Returns:
+        List[Dict]: registros alterados (IDs inexistentes e registros sem
+        alterações ficam de fora; lista vazia se a gravação falhar)
+        
+    Example:
+        >>> modificar_registros_json("eventos", ["1", "2"], lambda e: {"inscricoes_abertas": False}, campo_id="id")
+        [{'id': '1', ..., 'inscricoes_abertas': False}, {'id': '2', ...}]
+    """
+    try:
+        with _cache_lock:
+            backend = _backend_ativo()
+            entrada = None
+            # (ID, posição no cache, registro atual, alterações)
+            alterados: List[Tuple[str, Optional[int], Dict[str, Any], Dict[str, Any]]] = []
+            if backend is not None:
+                for registro_id in registro_ids:
+                    atual = backend.buscar(collection_name, registro_id, campo_id)
+                    alteracoes = modificar(dict(atual)) if atual is not None else None
+                    if alteracoes:
+                        alterados.append((str(registro_id), None, atual, alteracoes))
+            else:
+                entrada = _entrada_colecao(collection_name)
+                if entrada is None:
+                    return []
+                indice = _indice_colecao(entrada, campo_id)
+                for registro_id in registro_ids:
+                    posicao = indice.get(str(registro_id))
+                    if posicao is None:
+                        continue
+                    alteracoes = modificar(dict(entrada["dados"][posicao]))
+                    if alteracoes:
+                        alterados.append((str(registro_id), posicao, entrada["dados"][posicao], alteracoes))
+            
+            if not alterados:
+                return []
+            
+            lote = {registro_id: alteracoes for registro_id, _, _, alteracoes in alterados}
+            novos = [{**atual, **alteracoes} for _, _, atual, alteracoes in alterados]
+            if backend is not None:
+                backend.atualizar_lote(collection_name, lote, campo_id)
+            else:
+                for (_, posicao, _, _), novo in zip(alterados, novos):
+                    _cache_substituir(entrada, posicao, novo)
+                _persistir_mutacao(
+                    collection_name,
+                    {"op": "atualizar_lote", "campo": campo_id, "alteracoes": lote},
+                    quantidade=len(alterados)
+                )
+            
+            _avancar_versao(collection_name, list(lote))
+            
+            # Lotes grandes em relação à coleção: remontar os índices uma vez
+            # sai mais barato que aplicar cada atualização
+            if entrada is not None and len(alterados) * 10 > len(entrada["dados"]):
+                _notificar(collection_name, "recarregar")
+            else:
+                for (_, _, atual, _), novo in zip(alterados, novos):
+                    _notificar(collection_name, "atualizar", atual, novo)
+        
+        registrar_log(f"✓ Lote atualizado em {collection_name}: {len(novos)} registros")
+        return novos
+        
+    except Exception as e:
+        registrar_log(f"✗ ERRO ao atualizar lote em {collection_name}: {str(e)}")
+        return []
+
+
+def deletar_registro_json(collection_name: str, registro_id: str, campo_id: str = "_id") -> bool:
+    """
+    Deleta um registro do arquivo JSON (CRUD - DELETE)
+    Os demais registros mantêm a ordem da coleção
+    
+    Args:
+        collection_name (str): Nome da coleção
+        registro_id (str): ID do registro
+        campo_id (str): Campo usado como ID ("_id" ou "id")
+        
+    Returns:
+        bool: True se deletou com sucesso
+    """
+    try:
+        with _cache_lock:
+            backend = _backend_ativo()
+            if backend is not None:
+                removido = backend.buscar(collection_name, registro_id, campo_id) if _observadores.get(collection_name) else None
+                if not backend.deletar(collection_name, registro_id, campo_id):
+                    registrar_log(f"⚠ Registro não encontrado para deletar: {collection_name} ID {registro_id}")
+                    return False
+            else:
+                entrada = _entrada_colecao(collection_name)
+                posicao = _indice_colecao(entrada, campo_id).get(str(registro_id)) if entrada else None
+                
+                if posicao is None:
+                    registrar_log(f"⚠ Registro não encontrado para deletar: {collection_name} ID {registro_id}")
+                    return False
+                
+                removido = entrada["dados"][posicao]
+                _cache_remover(entrada, posicao)
+                _persistir_mutacao(collection_name, {"op": "deletar", "campo": campo_id, "id": str(registro_id)})
+            
+            _avancar_versao(collection_name, [registro_id])
+            if removido is not None:
+                _notificar(collection_name, "deletar", removido, None)
         
         registrar_log(f"✓ Registro deletado de {collection_name}: ID {registro_id}")
         return True
@@ -230,13 +1923,3 @@ def listar_registros_json(collection_name: str) -> List[Dict[str, Any]]:
         List[Dict]: Lista de registros
     """
     return carregar_backup_json(collection_name)
-
-
-# Inicializar arquivo de log
-if not (DATABASE_DIR / "logs.txt").exists():
-    registrar_log("=" * 50)
-    registrar_log("Sistema de Persistência Iniciado")
-    registrar_log("Passa a Bola - Backend API")
-    registrar_log("Desenvolvido por: Calçada LTDA")
-    registrar_log("=" * 50)
-
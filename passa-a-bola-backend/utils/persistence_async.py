@@ -0,0 +1,264 @@
+"""
+Persistência Assíncrona
+Variantes async das funções de utils/persistence.py, para rotas async def:
+consultas O(1) a índices em cache respondidas no loop de eventos e as
+demais leituras e gravações em threads dedicadas, com filas limitadas
+(503 quando cheias)
+"""
+
+import asyncio
+import functools
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.persistence import (
+    atualizar_registro_json,
+    buscar_por_chave_unica,
+    buscar_registro_json,
+    buscar_registros_por_campo,
+    carregar_backup_json,
+    consultar_indice_imediato,
+    deletar_registro_json,
+    inserir_registro_json,
+    inserir_registros_json,
+    modificar_registro_json,
+    salvar_backup_json,
+    versao_colecao,
+    versao_colecao_imediata
+)
+
+# Threads e limite de operações (em andamento + na fila) de cada fila.
+# Acima do limite a operação é recusada com 503, em vez de acumular
+# requisições esperando o disco
+THREADS_LEITURA = int(os.getenv("PERSISTENCIA_THREADS_LEITURA", "4"))
+THREADS_ESCRITA = int(os.getenv("PERSISTENCIA_THREADS_ESCRITA", "2"))
+FILA_MAXIMA_LEITURAS = int(os.getenv("PERSISTENCIA_FILA_LEITURAS", "2048"))
+FILA_MAXIMA_ESCRITAS = int(os.getenv("PERSISTENCIA_FILA_ESCRITAS", "256"))
+
+
+class PersistenciaSaturada(HTTPException):
+    """Fila de leituras ou gravações cheia (503 com Retry-After)"""
+
+    def __init__(self, fila: str, limite: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Servidor ocupado: fila de {fila} cheia ({limite} operações). Tente novamente.",
+            headers={"Retry-After": "1"}
+        )
+
+
+class FilaPersistencia:
+    """
+    Threads dedicadas a operações de persistência, com limite de operações
+
+    As rotas não ocupam o threadpool do FastAPI (compartilhado por todas
+    as rotas def) nem bloqueiam o loop de eventos: a operação roda em uma
+    das threads da fila e a corrotina só aguarda o resultado. Com o
+    limite atingido, lança PersistenciaSaturada na hora. Os contadores só
+    são alterados no loop de eventos, sem lock: a corrotina nunca espera
+    por um lock de thread.
+
+    Example:
+        >>> fila = FilaPersistencia("gravações", threads=2, limite=256)
+        >>> await fila.executar(inserir_registros_json, "jogadoras", jogadoras, "id")
+        True
+    """
+
+    def __init__(self, nome: str, threads: int, limite: int):
+        self.nome = nome
+        self.threads = max(threads, 1)
+        self.limite = limite
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._em_andamento = 0
+        self._estatisticas = {"executadas": 0, "recusadas": 0, "pico": 0}
+
+    def _obter_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.threads, thread_name_prefix=f"persistencia-{self.nome}"
+                )
+            return self._executor
+
+    async def executar(self, funcao: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Executa a função em uma thread da fila
+
+        Raises:
+            PersistenciaSaturada: se o limite de operações foi atingido
+        """
+        if self._em_andamento >= self.limite:
+            self._estatisticas["recusadas"] += 1
+            raise PersistenciaSaturada(self.nome, self.limite)
+        self._em_andamento += 1
+        self._estatisticas["pico"] = max(self._estatisticas["pico"], self._em_andamento)
+        try:
+            executor = self._executor or self._obter_executor()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, functools.partial(funcao, *args, **kwargs))
+        finally:
+            self._em_andamento -= 1
+            self._estatisticas["executadas"] += 1
+
+    def encerrar(self) -> None:
+        """Aguarda as operações em andamento e encerra as threads (shutdown da API)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Contadores da fila
+
+        Returns:
+            Dict: operações executadas, recusadas, em andamento, pico e limite
+        """
+        estatisticas: Dict[str, Any] = dict(self._estatisticas)
+        estatisticas["em_andamento"] = self._em_andamento
+        estatisticas["limite"] = self.limite
+        estatisticas["threads"] = self.threads
+        return estatisticas
+
+
+fila_leituras = FilaPersistencia("leituras", THREADS_LEITURA, FILA_MAXIMA_LEITURAS)
+fila_escritas = FilaPersistencia("gravações", THREADS_ESCRITA, FILA_MAXIMA_ESCRITAS)
+_estatisticas_leituras = {"imediatas": 0}
+
+
+async def executar_leitura(funcao: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Executa uma leitura na fila de leituras (nunca no loop de eventos)
+
+    Para tudo que não é uma consulta O(1) a um índice pronto: listagens,
+    buscas, serialização e compressão de respostas, montagem de índices e
+    qualquer função que use locks de thread (cache de respostas, cache de
+    tokens, contadores). Rodar isso no loop o bloquearia e, segurando o
+    lock das coleções, poderia travar contra uma thread que espera por
+    ele (ex.: a geração de uma resposta no CacheRespostas).
+
+    Args:
+        funcao (Callable): Função síncrona de leitura
+
+    Returns:
+        Any: Resultado da função
+
+    Raises:
+        PersistenciaSaturada: se a fila de leituras estiver cheia
+
+    Example:
+        >>> await executar_leitura(buscar_registros_por_campo, "jogadoras", "posicao", "Atacante")
+        [{'id': '7', 'nome': 'Marta', ...}]
+    """
+    return await fila_leituras.executar(funcao, *args, **kwargs)
+
+
+async def executar_escrita(funcao: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Executa uma gravação na fila de gravações (nunca no loop de eventos)
+
+    Raises:
+        PersistenciaSaturada: se a fila de gravações estiver cheia
+    """
+    return await fila_escritas.executar(funcao, *args, **kwargs)
+
+
+async def carregar_backup_json_async(collection_name: str) -> List[Dict[str, Any]]:
+    """Variante async de carregar_backup_json"""
+    return await executar_leitura(carregar_backup_json, collection_name)
+
+
+async def buscar_registro_json_async(collection_name: str, registro_id: str, campo_id: str = "_id") -> Optional[Dict[str, Any]]:
+    """Variante async de buscar_registro_json (no loop se o índice de IDs já estiver pronto)"""
+    respondida, registro = consultar_indice_imediato(collection_name, campo_id, registro_id)
+    if respondida:
+        _estatisticas_leituras["imediatas"] += 1
+        return registro
+    return await executar_leitura(buscar_registro_json, collection_name, registro_id, campo_id)
+
+
+async def buscar_registros_por_campo_async(collection_name: str, campo: str, valor: Any) -> List[Dict[str, Any]]:
+    """Variante async de buscar_registros_por_campo"""
+    return await executar_leitura(buscar_registros_por_campo, collection_name, campo, valor)
+
+
+async def buscar_por_chave_unica_async(collection_name: str, campo: str, valor: Any) -> Optional[Dict[str, Any]]:
+    """Variante async de buscar_por_chave_unica (no loop se o índice da chave já estiver pronto)"""
+    respondida, registro = consultar_indice_imediato(collection_name, campo, valor, unico=True)
+    if respondida:
+        _estatisticas_leituras["imediatas"] += 1
+        return registro
+    return await executar_leitura(buscar_por_chave_unica, collection_name, campo, valor)
+
+
+async def versao_colecao_async(collection_name: str, registro_id: Optional[str] = None) -> Tuple[str, float]:
+    """Variante async de versao_colecao (no loop com a coleção em cache)"""
+    versao = versao_colecao_imediata(collection_name, registro_id)
+    if versao is not None:
+        _estatisticas_leituras["imediatas"] += 1
+        return versao
+    return await executar_leitura(versao_colecao, collection_name, registro_id)
+
+
+async def salvar_backup_json_async(collection_name: str, data: List[Dict[str, Any]]) -> bool:
+    """Variante async de salvar_backup_json"""
+    return await executar_escrita(salvar_backup_json, collection_name, data)
+
+
+async def inserir_registro_json_async(collection_name: str, registro: Dict[str, Any],
+                                     campo_id: str = "_id") -> Optional[Dict[str, Any]]:
+    """Variante async de inserir_registro_json (ChaveDuplicada é repassada)"""
+    return await executar_escrita(inserir_registro_json, collection_name, registro, campo_id)
+
+
+async def inserir_registros_json_async(collection_name: str, registros: List[Dict[str, Any]], campo_id: str = "_id") -> bool:
+    """Variante async de inserir_registros_json"""
+    return await executar_escrita(inserir_registros_json, collection_name, registros, campo_id)
+
+
+async def atualizar_registro_json_async(collection_name: str, registro_id: str, novos_dados: Dict[str, Any],
+                                        campo_id: str = "_id") -> bool:
+    """Variante async de atualizar_registro_json"""
+    return await executar_escrita(atualizar_registro_json, collection_name, registro_id, novos_dados, campo_id)
+
+
+async def modificar_registro_json_async(collection_name: str, registro_id: str,
+                                        modificar: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+                                        campo_id: str = "_id", adiar_gravacao: bool = False) -> Optional[Dict[str, Any]]:
+    """Variante async de modificar_registro_json (a função roda na thread de gravação)"""
+    return await executar_escrita(modificar_registro_json, collection_name, registro_id, modificar, campo_id, adiar_gravacao)
+
+
+async def deletar_registro_json_async(collection_name: str, registro_id: str, campo_id: str = "_id") -> bool:
+    """Variante async de deletar_registro_json"""
+    return await executar_escrita(deletar_registro_json, collection_name, registro_id, campo_id)
+
+
+def encerrar_filas() -> None:
+    """Encerra as filas de leitura e gravação (shutdown da API)"""
+    fila_leituras.encerrar()
+    fila_escritas.encerrar()
+
+
+def estatisticas_filas() -> Dict[str, Any]:
+    """
+    Contadores da persistência assíncrona
+
+    Returns:
+        Dict: consultas O(1) respondidas no loop de eventos e contadores das filas
+        de leitura e gravação
+    """
+    return {
+        "leituras_imediatas": _estatisticas_leituras["imediatas"],
+        "leituras": fila_leituras.estatisticas(),
+        "gravacoes": fila_escritas.estatisticas()
+    }
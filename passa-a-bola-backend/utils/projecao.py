@@ -0,0 +1,56 @@
+"""
+Projeção de Campos (?fields=)
+Recorta os registros no servidor para que as listagens devolvam só os
+campos pedidos, reaproveitando a projeção compilada entre requisições
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Nomes de campo aceitos em fields= (evita montar projeções com lixo)
+_PADRAO_CAMPO = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class CamposInvalidos(ValueError):
+    """Parâmetro fields= com nome de campo inválido"""
+
+
+@lru_cache(maxsize=256)
+def projecao_campos(fields: Optional[str], campo_id: str = "id") -> Optional[Callable[[Dict[str, Any]], Dict[str, Any]]]:
+    """
+    Compila a projeção de um parâmetro fields= (cacheada por valor)
+
+    O campo de ID sempre é incluído. Campos ausentes no registro são
+    omitidos da resposta.
+
+    Args:
+        fields (str): nomes separados por vírgula (None ou vazio = sem projeção)
+        campo_id (str): campo de ID, sempre incluído
+
+    Returns:
+        Callable: função registro → registro projetado, ou None
+
+    Raises:
+        CamposInvalidos: se algum nome não for um identificador válido
+
+    Example:
+        >>> projetar = projecao_campos("nome,posicao")
+        >>> projetar({"id": "1", "nome": "Marta", "posicao": "Atacante", "bio": "..."})
+        {'id': '1', 'nome': 'Marta', 'posicao': 'Atacante'}
+    """
+    if fields is None:
+        return None
+    nomes = [nome.strip() for nome in fields.split(",") if nome.strip()]
+    if not nomes:
+        return None
+    for nome in nomes:
+        if not _PADRAO_CAMPO.match(nome):
+            raise CamposInvalidos(f"Campo inválido em fields: {nome}")
+
+    campos: Tuple[str, ...] = tuple(dict.fromkeys([campo_id] + nomes))
+
+    def projetar(registro: Dict[str, Any]) -> Dict[str, Any]:
+        return {campo: registro[campo] for campo in campos if campo in registro}
+
+    return projetar
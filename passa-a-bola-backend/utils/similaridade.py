@@ -0,0 +1,264 @@
+"""
+Busca por Similaridade (k-NN) com NumPy
+Matriz de atributos normalizados de uma coleção, mantida incrementalmente
+pelos observadores de utils/persistence.py, para achar os registros mais
+parecidos com um registro em uma única passada vetorizada
+"""
+
+import sys
+import warnings
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.indices import IndiceIncremental, normalizar_valor, numero
+
+# Renormalizar as colunas quando a coleção mudar de tamanho por este fator
+# desde a última normalização (média e desvio deixam de representá-la)
+FATOR_RENORMALIZACAO = 1.5
+
+# Distância somada a quem não atende a um filtro (fica fora do resultado)
+EXCLUIDO = np.float32(1e30)
+
+
+class IndiceSimilaridade(IndiceIncremental):
+    """
+    Vizinhos mais próximos de um registro por atributos numéricos e categóricos
+
+    - Atributos numéricos são normalizados (z-score) e guardados em uma
+      matriz float32 por coluna (atributo × registro); atributo ausente
+      fica na média (contribui 0)
+    - Atributos categóricos viram códigos inteiros; cada atributo diferente
+      soma peso_categorico à distância ao quadrado
+    A distância ao quadrado usa ||a||² - 2a·b + ||b||², com as normas dos
+    registros pré-calculadas: um produto vetor-matriz por consulta, em
+    buffers reaproveitados entre consultas.
+
+    Example:
+        >>> indice = IndiceSimilaridade("jogadoras", ["idade", "altura"], ["posicao"])
+        >>> indice.similares("1", limite=5, filtros={"posicao": "Atacante"})
+        [('7', 0.41), ('12', 0.58)]
+    """
+
+    def __init__(self, collection_name: str, campos_numericos: Iterable[str],
+                 campos_categoricos: Iterable[str] = (), campo_id: str = "id",
+                 peso_categorico: float = 1.0):
+        self.campos_numericos = tuple(campos_numericos)
+        self.campos_categoricos = tuple(campos_categoricos)
+        self.peso_categorico = peso_categorico
+        super().__init__(collection_name, campo_id)
+        self._limpar()
+
+    def _limpar(self) -> None:
+        colunas = len(self.campos_numericos)
+        self._tamanho = 0
+        self._brutos = np.empty((0, colunas), dtype=np.float64)
+        self._normalizados = np.empty((colunas, 0), dtype=np.float32)
+        self._normas = np.empty(0, dtype=np.float32)
+        self._codigos = np.empty((len(self.campos_categoricos), 0), dtype=np.int32)
+        # Buffers das consultas (mesma capacidade das matrizes)
+        self._distancias = np.empty(0, dtype=np.float32)
+        self._auxiliar = np.empty(0, dtype=np.float32)
+        self._diferentes = np.empty(0, dtype=bool)
+        self._ids: List[str] = []
+        self._linhas: Dict[str, int] = {}
+        self._categorias: List[Dict[str, int]] = [{} for _ in self.campos_categoricos]
+        self._media = np.zeros(colunas)
+        self._desvio = np.ones(colunas)
+        self._tamanho_normalizacao = 0
+
+    def _codigo(self, posicao: int, valor: Any, criar: bool = True) -> int:
+        """Código inteiro de um valor categórico (-1 para ausente ou desconhecido)"""
+        chave = normalizar_valor(valor)
+        if not chave:
+            return -1
+        categorias = self._categorias[posicao]
+        codigo = categorias.get(chave)
+        if codigo is None:
+            if not criar:
+                return -1
+            codigo = categorias[chave] = len(categorias)
+        return codigo
+
+    def _vetores(self, registro: Dict[str, Any]) -> Tuple[List[float], List[int]]:
+        """Atributos numéricos (NaN se ausentes) e códigos categóricos do registro"""
+        valores = [numero(registro.get(campo)) for campo in self.campos_numericos]
+        return (
+            [np.nan if valor is None else valor for valor in valores],
+            [self._codigo(i, registro.get(campo)) for i, campo in enumerate(self.campos_categoricos)]
+        )
+
+    def _reservar(self, tamanho: int) -> None:
+        """Garante espaço para tamanho registros (capacidade dobra, como uma lista)"""
+        capacidade = len(self._normas)
+        if tamanho <= capacidade:
+            return
+        nova = max(tamanho, 2 * capacidade, 1024)
+
+        brutos = np.empty((nova, self._brutos.shape[1]), dtype=self._brutos.dtype)
+        brutos[:self._tamanho] = self._brutos[:self._tamanho]
+        self._brutos = brutos
+        for nome in ("_normalizados", "_codigos"):
+            atual = getattr(self, nome)
+            ampliado = np.empty((atual.shape[0], nova), dtype=atual.dtype)
+            ampliado[:, :self._tamanho] = atual[:, :self._tamanho]
+            setattr(self, nome, ampliado)
+        normas = np.empty(nova, dtype=np.float32)
+        normas[:self._tamanho] = self._normas[:self._tamanho]
+        self._normas = normas
+
+        self._distancias = np.empty(nova, dtype=np.float32)
+        self._auxiliar = np.empty(nova, dtype=np.float32)
+        self._diferentes = np.empty(nova, dtype=bool)
+
+    def _normalizar(self) -> None:
+        """Recalcula média e desvio das colunas e a matriz normalizada inteira"""
+        brutos = self._brutos[:self._tamanho]
+        if self._tamanho:
+            with warnings.catch_warnings():
+                # Coluna só com valores ausentes: média/desvio NaN, tratados abaixo
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                media = np.nanmean(brutos, axis=0)
+                desvio = np.nanstd(brutos, axis=0)
+            self._media = np.nan_to_num(media)
+            self._desvio = np.where(np.isnan(desvio) | (desvio == 0), 1.0, desvio)
+            normalizados = (brutos - self._media) / self._desvio
+            normalizados[np.isnan(normalizados)] = 0.0
+            self._normalizados[:, :self._tamanho] = normalizados.T
+            self._normas[:self._tamanho] = np.einsum("ij,ij->i", normalizados, normalizados)
+        self._tamanho_normalizacao = self._tamanho
+
+    def _gravar_linha(self, linha: int, brutos: List[float], codigos: List[int]) -> None:
+        """Grava o registro bruto e normalizado (com a média e o desvio atuais)"""
+        self._brutos[linha] = brutos
+        normalizado = (self._brutos[linha] - self._media) / self._desvio
+        normalizado[np.isnan(normalizado)] = 0.0
+        self._normalizados[:, linha] = normalizado
+        self._normas[linha] = float(np.dot(normalizado, normalizado))
+        self._codigos[:, linha] = codigos
+
+    def _construir(self, dados: List[Dict[str, Any]]) -> None:
+        """Carga em lote: monta as matrizes de uma vez e normaliza"""
+        self._limpar()
+        brutos = []
+        codigos = []
+        for registro in dados:
+            if registro.get(self.campo_id) is None:
+                continue
+            registro_id = str(registro[self.campo_id])
+            if registro_id in self._linhas:
+                continue
+            valores, codigos_registro = self._vetores(registro)
+            self._linhas[registro_id] = len(self._ids)
+            self._ids.append(registro_id)
+            brutos.append(valores)
+            codigos.append(codigos_registro)
+
+        self._reservar(len(self._ids))
+        self._tamanho = len(self._ids)
+        if self._tamanho:
+            self._brutos[:self._tamanho] = np.array(brutos, dtype=np.float64).reshape(self._tamanho, -1)
+            self._codigos[:, :self._tamanho] = np.array(codigos, dtype=np.int32).reshape(self._tamanho, -1).T
+        self._normalizar()
+
+    def _adicionar(self, registro: Dict[str, Any]) -> None:
+        if registro.get(self.campo_id) is None:
+            return
+        registro_id = str(registro[self.campo_id])
+        if registro_id in self._linhas:
+            return
+        valores, codigos = self._vetores(registro)
+        self._reservar(self._tamanho + 1)
+        linha = self._tamanho
+        self._tamanho += 1
+        self._linhas[registro_id] = linha
+        self._ids.append(registro_id)
+        self._gravar_linha(linha, valores, codigos)
+
+    def _remover(self, registro: Dict[str, Any]) -> None:
+        if registro.get(self.campo_id) is None:
+            return
+        linha = self._linhas.pop(str(registro[self.campo_id]), None)
+        if linha is None:
+            return
+
+        # Remoção em O(1): a última linha ocupa o lugar da removida
+        ultima = self._tamanho - 1
+        if linha != ultima:
+            self._brutos[linha] = self._brutos[ultima]
+            self._normas[linha] = self._normas[ultima]
+            self._normalizados[:, linha] = self._normalizados[:, ultima]
+            self._codigos[:, linha] = self._codigos[:, ultima]
+            movido = self._ids[ultima]
+            self._ids[linha] = movido
+            self._linhas[movido] = linha
+        self._ids.pop()
+        self._tamanho = ultima
+
+    def similares(self, registro_id: str, limite: int = 10,
+                  filtros: Optional[Dict[str, Any]] = None) -> Optional[List[Tuple[str, float]]]:
+        """
+        Registros mais parecidos com um registro, do mais para o menos parecido
+
+        Args:
+            registro_id (str): ID do registro de referência
+            limite (int): quantidade de vizinhos
+            filtros (Dict): atributo categórico → valor exigido nos vizinhos
+
+        Returns:
+            List[Tuple]: (ID, distância), ou None se o registro não existir
+        """
+        self.garantir_construido()
+        with self._lock:
+            linha = self._linhas.get(str(registro_id))
+            if linha is None:
+                return None
+
+            tamanho = self._tamanho
+            if not (tamanho / FATOR_RENORMALIZACAO <= self._tamanho_normalizacao <= tamanho * FATOR_RENORMALIZACAO):
+                self._normalizar()
+
+            # -2a·b + ||b||² (||a||² é constante e só entra no resultado)
+            distancias = self._distancias[:tamanho]
+            np.einsum("i,ij->j", -2.0 * self._normalizados[:, linha], self._normalizados[:, :tamanho], out=distancias)
+            distancias += self._normas[:tamanho]
+
+            diferentes = self._diferentes[:tamanho]
+            auxiliar = self._auxiliar[:tamanho]
+            for i in range(len(self.campos_categoricos)):
+                np.not_equal(self._codigos[i, :tamanho], self._codigos[i, linha], out=diferentes)
+                if self.peso_categorico == 1.0:
+                    np.add(distancias, diferentes, out=distancias)
+                else:
+                    np.multiply(diferentes, np.float32(self.peso_categorico), out=auxiliar)
+                    distancias += auxiliar
+
+            # Excluir quem não atende aos filtros e o próprio registro
+            for campo, valor in (filtros or {}).items():
+                if valor is None or campo not in self.campos_categoricos:
+                    continue
+                i = self.campos_categoricos.index(campo)
+                np.not_equal(self._codigos[i, :tamanho], self._codigo(i, valor, criar=False), out=diferentes)
+                np.multiply(diferentes, EXCLUIDO, out=auxiliar)
+                distancias += auxiliar
+            distancias[linha] = EXCLUIDO
+
+            quantidade = min(limite, tamanho)
+            if quantidade <= 0:
+                return []
+            if quantidade < tamanho:
+                # k-ésima menor distância e quem está até ela (pode haver empates)
+                limiar = np.partition(distancias, quantidade - 1)[quantidade - 1]
+                candidatos = np.flatnonzero(distancias <= limiar)
+            else:
+                candidatos = np.arange(tamanho)
+            candidatos = candidatos[np.argsort(distancias[candidatos], kind="stable")][:quantidade]
+
+            norma_referencia = float(self._normas[linha])
+            return [
+                (self._ids[i], round(float(np.sqrt(max(float(distancias[i]) + norma_referencia, 0.0))), 4))
+                for i in candidatos if distancias[i] < EXCLUIDO / 2
+            ]